@@ -7,13 +7,15 @@ Powered by Claude (Anthropic) for superior code generation
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from anthropic import Anthropic
+from typing import Dict, Any
 
+from core.agent import BaseAgent
 from core.config import config
+from core.lazy import lazy_singleton
+from core.registry import agent_registry
 
 
-class EngineeringAI:
+class EngineeringAI(BaseAgent):
     """
     Engineering AI Employee
     
@@ -26,18 +28,23 @@ class EngineeringAI:
     - Technical problem-solving
     """
     
+    agent_key = "engineering"
+    name = "Engineering AI"
+    department = "Engineering"
+    specialty = "Full-stack development, architecture, code generation"
+    aliases = ["eng", "engineer", "tech", "technical", "dev", "development"]
+    capabilities = [
+        "code", "coding", "implement", "function", "bug", "debug", "refactor",
+        "review", "architecture", "design", "database", "schema", "api",
+        "endpoint", "frontend", "backend", "component", "react", "next.js",
+        "typescript", "python", "fastapi", "supabase", "sql", "deploy", "test",
+    ]
+    model = "claude-sonnet-4-20250514"  # Best for coding
+    max_tokens = 8192  # Large for code generation
+    
     def __init__(self):
         """Initialize Engineering AI with Claude connection"""
-        self.client = config.get_anthropic_client()
-        self.name = "Engineering AI"
-        self.department = "Engineering"
-        self.specialty = "Full-stack development, architecture, code generation"
-        
-        # Conversation history for context
-        self.conversation_history: List[Dict[str, str]] = []
-        
-        # System prompt - defines this AI's role and capabilities
-        self.system_prompt = self._create_system_prompt()
+        super().__init__()
         
         print(f"⚙️  {self.name} initialized")
         print(f"🏗️  Specialty: {self.specialty}")
@@ -83,84 +90,9 @@ OUTPUT FORMAT:
 Current date: {datetime.now().strftime('%Y-%m-%d')}
 """
     
-    def execute_task(
-        self,
-        task: str,
-        context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        """
-        Execute a technical task
-        
-        Args:
-            task: The engineering task to complete
-            context: Optional additional context (files, requirements, etc.)
-            
-        Returns:
-            Dictionary with code, explanation, and metadata
-        """
-        try:
-            # Add context to the task if provided
-            full_task = task
-            if context:
-                full_task += f"\n\nAdditional Context:\n{context}"
-            
-            # Add task to conversation history
-            self.conversation_history.append({
-                "role": "user",
-                "content": full_task
-            })
-            
-            # Call Claude API
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",  # Best for coding
-                max_tokens=8192,  # Large for code generation
-                system=self.system_prompt,
-                messages=self.conversation_history
-            )
-            
-            # Extract response
-            assistant_message = response.content[0].text
-            
-            # Add to conversation history
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": assistant_message
-            })
-            
-            return {
-                "success": True,
-                "agent": self.name,
-                "department": self.department,
-                "output": assistant_message,
-                "timestamp": datetime.now().isoformat(),
-                "tokens_used": response.usage.input_tokens + response.usage.output_tokens,
-                "model": response.model
-            }
-            
-        except Exception as e:
-            error_message = f"Engineering AI error: {str(e)}"
-            print(f"❌ {error_message}")
-            
-            return {
-                "success": False,
-                "agent": self.name,
-                "department": self.department,
-                "output": error_message,
-                "timestamp": datetime.now().isoformat()
-            }
-    
-    def review_code(self, code: str, filename: str) -> Dict[str, Any]:
-        """
-        Review code for quality, bugs, and improvements
-        
-        Args:
-            code: The code to review
-            filename: Name of the file being reviewed
-            
-        Returns:
-            Review with suggestions and ratings
-        """
-        review_task = f"""Review this code for quality, potential bugs, and improvements:
+    def review_code_task(self, code: str, filename: str) -> str:
+        """Prompt for review_code() (also used by bulk/batch mode)"""
+        return f"""Review this code for quality, potential bugs, and improvements:
 
 File: {filename}
 ```
@@ -174,19 +106,40 @@ Provide:
 4. Best practice violations (if any)
 5. Specific improvement suggestions
 """
-        return self.execute_task(review_task)
     
-    def design_architecture(self, feature_description: str) -> Dict[str, Any]:
+    def review_code(self, code: str, filename: str) -> Dict[str, Any]:
         """
-        Design technical architecture for a feature
+        Review code for quality, bugs, and improvements
         
         Args:
-            feature_description: Description of what needs to be built
+            code: The code to review
+            filename: Name of the file being reviewed
             
         Returns:
-            Architecture design and implementation plan
+            Review with suggestions and ratings
         """
-        architecture_task = f"""Design the technical architecture for this feature:
+        return self.execute_task(self.review_code_task(code, filename))
+    
+    def review_repository(self, root: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Review every new or changed file under a directory
+        
+        Unchanged files (same content hash and review settings as last
+        time) are skipped; the rest are reviewed in parallel.
+        
+        Args:
+            root: Directory to review (e.g., "../apps/beacon/frontend")
+            force: Review every file, ignoring the saved index
+            
+        Returns:
+            Summary with counts, duration and the review of each file
+        """
+        from core.code_review import RepositoryReview
+        return RepositoryReview(root, agent=self).run(force=force)
+    
+    def design_architecture_task(self, feature_description: str) -> str:
+        """Prompt for design_architecture() (also used by bulk/batch mode)"""
+        return f"""Design the technical architecture for this feature:
 
 {feature_description}
 
@@ -198,25 +151,27 @@ Provide:
 5. Technology stack recommendations
 6. Implementation phases
 """
-        return self.execute_task(architecture_task)
     
-    def clear_context(self):
-        """Clear conversation history for fresh context"""
-        self.conversation_history = []
-        print("🧹 Engineering AI context cleared")
-    
-    def get_status(self) -> Dict[str, Any]:
-        """Get current status of Engineering AI"""
-        return {
-            "name": self.name,
-            "department": self.department,
-            "specialty": self.specialty,
-            "conversation_length": len(self.conversation_history),
-            "status": "operational",
-            "ai_provider": "Anthropic Claude Sonnet 4"
-        }
+    def design_architecture(self, feature_description: str) -> Dict[str, Any]:
+        """
+        Design technical architecture for a feature
+        
+        Args:
+            feature_description: Description of what needs to be built
+            
+        Returns:
+            Architecture design and implementation plan
+        """
+        return self.execute_task(self.design_architecture_task(feature_description))
+
 
+# The global Engineering AI instance is created on first use
+# ("from agents.engineering_ai import engineering_ai" still works)
+get_engineering_ai = lazy_singleton(EngineeringAI)
+agent_registry.register(EngineeringAI, get_engineering_ai)
 
-# Create a global Engineering AI instance
-engineering_ai = EngineeringAI()
 
+def __getattr__(name: str):
+    if name == "engineering_ai":
+        return get_engineering_ai()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
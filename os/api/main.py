@@ -0,0 +1,540 @@
+"""
+HTTP Service for Beechwood OS
+PULSE and the AI employees behind one async FastAPI app
+
+Endpoints:
+- GET  /health                                   liveness check
+- GET  /status                                   PULSE status (pool, caches, store...)
+- GET  /metrics                                  Prometheus metrics
+- GET  /v1/agents                                the agent directory
+- POST /v1/pulse/request[/stream]                process_request()
+- POST /v1/pulse/route                           auto_route() (PULSE picks the agent)
+- POST /v1/agents/{agent}/tasks[/stream]         route_to_agent()
+- GET  /v1/agents/{agent}/methods                specialized methods of an agent
+- POST /v1/agents/{agent}/methods/{method}[/stream]
+                                                 review_code(), assess_threat_model()...
+- POST /v1/attachments                           upload context once, pass its ID after
+- GET  /v1/attachments[/{attachment_id}]         stored attachments
+- GET  /v1/sessions[/{session_id}]               session memory use
+- DELETE /v1/sessions/{session_id}               drop a session from memory
+
+Request bodies take an optional session_id. Each session has its own
+conversation with every agent (see core.sessions); without one, the
+agents' own memory is used (shared, and not saved across restarts).
+
+Large context values (files, specs, earlier results) are sent to the
+model once per conversation and referenced by hash afterwards (see
+core.attachments). Upload them to /v1/attachments to send just the ID:
+    {"task": "...", "context": {"protocol": "sha256:..."}}
+
+Streaming endpoints answer with server-sent events:
+    event: text     data: {"text": "..."}      (many)
+    event: result   data: {...result...}       (once, at the end)
+    event: error    data: {"error": "..."}     (instead of result on timeout)
+
+Under load:
+- handlers never block the event loop: model calls take the agents'
+  async paths, and a session's saved memory is read in a worker thread
+- with ANTHROPIC_PREWARM_CONNECTIONS set, the event loop's connection
+  pool is warmed at startup, before the first request
+- at most API_MAX_CONCURRENCY model calls run at once per process; the
+  rest wait their turn (the shared rate limiter still paces the API)
+- every request has API_REQUEST_TIMEOUT seconds, waiting included (504)
+- turns in one session's conversation with an agent are taken one at
+  a time; other sessions and agents work in parallel
+- API_WORKERS processes share the port; each has its own agents and
+  memory, and the conversation store is the place they meet
+
+Run it:
+    python -m api.main
+    (or: uvicorn api.main:app --workers 4)
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from core.attachments import Attachment, UnknownAttachmentError, attachments
+from core.clients import client_registry
+from core.config import config
+from core.rate_limiter import urgent
+from core.registry import agent_registry
+from core.sessions import sessions, use_session
+from core.store import conversation_store
+from pulse.coordinator import get_pulse
+
+
+# Turn locks kept before idle ones are forgotten
+TURN_LOCKS_PRUNE_AT = 10000
+
+
+# ============================================================
+# REQUEST BODIES
+# ============================================================
+
+class PulseRequest(BaseModel):
+    """A message for PULSE"""
+    message: str
+    context: Optional[Dict[str, Any]] = None
+    use_cache: bool = True
+    session_id: Optional[str] = None
+
+
+class TaskRequest(BaseModel):
+    """A free-form task for one agent"""
+    task: str
+    context: Optional[Dict[str, Any]] = None
+    use_cache: bool = True
+    session_id: Optional[str] = None
+
+
+class MethodRequest(BaseModel):
+    """Arguments for a specialized agent method (e.g., code and filename)"""
+    args: Dict[str, Any] = Field(default_factory=dict)
+    use_cache: bool = True
+    session_id: Optional[str] = None
+
+
+class AttachmentRequest(BaseModel):
+    """Context to upload once and pass by ID afterwards"""
+    name: str
+    text: str
+    kind: str = "text"
+
+
+# ============================================================
+# SERVICE
+# ============================================================
+
+class AgentService:
+    """
+    Runs agent calls for the HTTP handlers
+
+    Adds what a shared deployment needs on top of the agents: a cap on
+    concurrent model calls, a deadline per request, and one turn at a
+    time per conversation (agent + session).
+    """
+
+    def __init__(self):
+        """Set up empty state (locks are created inside the event loop)"""
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._turn_locks: Dict[Tuple[str, Optional[str]], asyncio.Lock] = {}
+        self.stats = {"requests": 0, "streams": 0, "timeouts": 0}
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """Semaphore for model calls in flight (API_MAX_CONCURRENCY)"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, config.API_MAX_CONCURRENCY))
+        return self._slots
+
+    def _turn_lock(self, agent: Any, session_id: Optional[str]) -> asyncio.Lock:
+        """Lock that keeps one conversation's turns in order"""
+        key = (agent.agent_key, session_id)
+        lock = self._turn_locks.get(key)
+        if lock is None:
+            # Forget idle locks now and then (one per session would pile up)
+            if len(self._turn_locks) > TURN_LOCKS_PRUNE_AT:
+                self._turn_locks = {k: v for k, v in self._turn_locks.items() if v.locked()}
+            lock = self._turn_locks[key] = asyncio.Lock()
+        return lock
+
+    # ------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------
+
+    def get_agent(self, agent_name: str) -> Any:
+        """Agent by key, alias, name or department (404 if unknown)"""
+        agent = agent_registry.get(agent_name)
+        if agent is None:
+            raise HTTPException(404, f"Unknown agent '{agent_name}'. Available: {agent_registry.names()}")
+        return agent
+
+    def methods(self, agent: Any) -> List[str]:
+        """
+        Specialized methods an agent offers over HTTP
+
+        A method is exposed when the agent has a matching task builder
+        (review_code -> review_code_task), which turns the arguments
+        into a task without running it.
+        """
+        return sorted(
+            name[:-len("_task")] for name in dir(agent)
+            if name.endswith("_task") and not name.startswith("_")
+            and callable(getattr(agent, name[:-len("_task")], None))
+        )
+
+    def build_method_task(self, agent: Any, method: str, args: Dict[str, Any]) -> str:
+        """Task text for agent.<method>(**args) (404/422 on bad input)"""
+        if method not in self.methods(agent):
+            raise HTTPException(404, f"{agent.name} has no method '{method}'. Available: {self.methods(agent)}")
+        try:
+            return getattr(agent, f"{method}_task")(**args)
+        except TypeError as e:
+            raise HTTPException(422, f"Bad arguments for {method}: {e}")
+
+    def check_context(self, context: Optional[Dict[str, Any]]):
+        """404 if the context passes an attachment ID that isn't stored"""
+        try:
+            attachments.split_context(context)
+        except UnknownAttachmentError as e:
+            raise HTTPException(404, f"Unknown attachment {e}. Upload it to /v1/attachments first")
+
+    # ------------------------------------------------------------
+    # Running calls
+    # ------------------------------------------------------------
+
+    async def run(
+        self,
+        agent: Any,
+        call: Callable[[], Awaitable[Dict[str, Any]]],
+        session_id: Optional[str] = None,
+        is_urgent: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run one agent call with the concurrency cap and the deadline
+
+        Args:
+            agent: The agent whose conversation the call uses
+            call: Makes the call (e.g., lambda: agent.execute_task_async(task))
+            session_id: Session whose memory the call uses
+            is_urgent: Skip the rate limit line (emergency work)
+
+        Returns:
+            The agent's result dictionary
+        """
+        self.stats["requests"] += 1
+        return await self._with_deadline(self._locked(agent, call, session_id, is_urgent))
+
+    async def route(
+        self,
+        pulse: Any,
+        message: str,
+        call_for: Callable[[Any], Callable[[], Awaitable[Dict[str, Any]]]],
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Let PULSE pick the agent, then run the call on it
+
+        Classification and the call share one deadline, and both run
+        under the concurrency cap with the session set.
+
+        Args:
+            pulse: The PULSE coordinator
+            message: The request to classify
+            call_for: Given the chosen agent, makes the call
+            session_id: Session whose memory the call uses
+
+        Returns:
+            The agent's result dictionary, with the routing decision
+        """
+        self.stats["requests"] += 1
+
+        async def _routed():
+            async with self.slots:
+                with use_session(session_id):
+                    routing = await pulse.classify_request_async(message)
+            agent = pulse if routing["agent"] == pulse.agent_key else self.get_agent(routing["agent"])
+            result = await self._locked(agent, call_for(agent), session_id)
+            result["routing"] = routing
+            return result
+
+        return await self._with_deadline(_routed())
+
+    async def _locked(
+        self,
+        agent: Any,
+        call: Callable[[], Awaitable[Dict[str, Any]]],
+        session_id: Optional[str],
+        is_urgent: bool = False
+    ) -> Dict[str, Any]:
+        """Make the call in its conversation's turn, under the concurrency cap"""
+        async with self._turn_lock(agent, session_id), self.slots:
+            with use_session(session_id), urgent() if is_urgent else nullcontext():
+                return await call()
+
+    async def _with_deadline(self, work: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Await the work, or give up with a 504 after API_REQUEST_TIMEOUT"""
+        try:
+            return await asyncio.wait_for(work, timeout=config.API_REQUEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise HTTPException(504, f"Request took longer than {config.API_REQUEST_TIMEOUT:g}s")
+
+    async def stream(
+        self,
+        agent: Any,
+        events: AsyncIterator[Dict[str, Any]],
+        session_id: Optional[str] = None,
+        is_urgent: bool = False
+    ) -> AsyncIterator[str]:
+        """
+        Turn an agent's stream events into server-sent events
+
+        The agent's stream runs in its own task and hands events over a
+        queue, so the deadline (covering the whole stream, waiting
+        included) can cancel it cleanly. On timeout an error event is
+        sent instead of the result.
+        """
+        self.stats["streams"] += 1
+        handoff: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def _pump():
+            try:
+                async with self._turn_lock(agent, session_id), self.slots:
+                    with use_session(session_id), urgent() if is_urgent else nullcontext():
+                        async for event in events:
+                            handoff.put_nowait(event)
+            finally:
+                await events.aclose()
+                handoff.put_nowait(done)
+
+        pump = asyncio.ensure_future(_pump())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + config.API_REQUEST_TIMEOUT
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(handoff.get(), timeout=max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    yield _sse("error", {"error": f"Request took longer than {config.API_REQUEST_TIMEOUT:g}s"})
+                    break
+
+                if event is done:
+                    if not pump.cancelled() and pump.exception():
+                        yield _sse("error", {"error": str(pump.exception())})
+                    break
+                if event["type"] == "text":
+                    yield _sse("text", {"text": event["text"]})
+                else:
+                    yield _sse("result", event["result"])
+        finally:
+            # Client gone or deadline passed: stop the model call
+            if not pump.done():
+                pump.cancel()
+                await asyncio.gather(pump, return_exceptions=True)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Service settings and counters"""
+        return {
+            **self.stats,
+            "max_concurrency": config.API_MAX_CONCURRENCY,
+            "request_timeout": config.API_REQUEST_TIMEOUT,
+            "workers": config.API_WORKERS,
+            "turns_in_progress": sum(1 for lock in self._turn_locks.values() if lock.locked()),
+        }
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _event_stream(events: AsyncIterator[str]) -> StreamingResponse:
+    """Streaming response for server-sent events (no proxy buffering)"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Create the global service
+service = AgentService()
+
+
+# ============================================================
+# APP
+# ============================================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm this worker's connection pool on startup; write out pending
+    conversation records and close connections on shutdown
+    """
+    warmed = await client_registry.prewarm_async()
+    if warmed:
+        print(f"🔥 {warmed} API connections warmed")
+    print(f"🚀 Beechwood OS API ready (max {config.API_MAX_CONCURRENCY} concurrent calls per worker)")
+    yield
+    await asyncio.to_thread(conversation_store.flush)
+    client_registry.close()
+    print("👋 Beechwood OS API stopped")
+
+
+app = FastAPI(title="Beechwood OS", description="PULSE and the AI employees over HTTP", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health() -> Dict[str, Any]:
+    return {"status": "ok"}
+
+
+@app.get("/status")
+async def status() -> Dict[str, Any]:
+    return {**get_pulse().get_status(), "api": service.get_status()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    return get_pulse().get_metrics(prometheus=True)
+
+
+@app.get("/v1/agents")
+async def list_agents() -> List[Dict[str, Any]]:
+    return [
+        {**spec.describe(), "methods": service.methods(service.get_agent(spec.key))}
+        for spec in agent_registry.specs()
+    ]
+
+
+# --- PULSE ---
+
+@app.post("/v1/pulse/request")
+async def pulse_request(body: PulseRequest) -> Dict[str, Any]:
+    service.check_context(body.context)
+    pulse = get_pulse()
+    return await service.run(
+        pulse, lambda: pulse.process_request_async(body.message, body.context, body.use_cache), body.session_id
+    )
+
+
+@app.post("/v1/pulse/request/stream")
+async def pulse_request_stream(body: PulseRequest) -> StreamingResponse:
+    service.check_context(body.context)
+    pulse = get_pulse()
+    return _event_stream(service.stream(
+        pulse, pulse.stream_task_async(body.message, body.context, body.use_cache), body.session_id
+    ))
+
+
+@app.post("/v1/pulse/route")
+async def pulse_route(body: PulseRequest) -> Dict[str, Any]:
+    """Let PULSE pick the agent (local classifier first), then run the task"""
+    service.check_context(body.context)
+    pulse = get_pulse()
+
+    def call_for(agent):
+        if agent is pulse:
+            return lambda: pulse.process_request_async(body.message, body.context, body.use_cache)
+        return lambda: agent.execute_task_async(body.message, body.context, body.use_cache)
+
+    return await service.route(pulse, body.message, call_for, body.session_id)
+
+
+# --- Agents ---
+
+@app.post("/v1/agents/{agent_name}/tasks")
+async def agent_task(agent_name: str, body: TaskRequest) -> Dict[str, Any]:
+    agent = service.get_agent(agent_name)
+    service.check_context(body.context)
+    return await service.run(
+        agent, lambda: agent.execute_task_async(body.task, body.context, body.use_cache), body.session_id
+    )
+
+
+@app.post("/v1/agents/{agent_name}/tasks/stream")
+async def agent_task_stream(agent_name: str, body: TaskRequest) -> StreamingResponse:
+    agent = service.get_agent(agent_name)
+    service.check_context(body.context)
+    return _event_stream(service.stream(
+        agent, agent.stream_task_async(body.task, body.context, body.use_cache), body.session_id
+    ))
+
+
+@app.get("/v1/agents/{agent_name}/methods")
+async def agent_methods(agent_name: str) -> List[str]:
+    return service.methods(service.get_agent(agent_name))
+
+
+@app.post("/v1/agents/{agent_name}/methods/{method}")
+async def agent_method(agent_name: str, method: str, body: MethodRequest) -> Dict[str, Any]:
+    agent = service.get_agent(agent_name)
+    task = service.build_method_task(agent, method, body.args)
+    return await service.run(
+        agent,
+        lambda: agent.execute_task_async(task, use_cache=body.use_cache),
+        body.session_id,
+        is_urgent=method in agent.urgent_methods,
+    )
+
+
+@app.post("/v1/agents/{agent_name}/methods/{method}/stream")
+async def agent_method_stream(agent_name: str, method: str, body: MethodRequest) -> StreamingResponse:
+    agent = service.get_agent(agent_name)
+    task = service.build_method_task(agent, method, body.args)
+    return _event_stream(service.stream(
+        agent,
+        agent.stream_task_async(task, use_cache=body.use_cache),
+        body.session_id,
+        is_urgent=method in agent.urgent_methods,
+    ))
+
+
+# --- Attachments ---
+
+@app.post("/v1/attachments")
+async def upload_attachment(body: AttachmentRequest) -> Dict[str, Any]:
+    """Store context by content hash (uploading the same text again is a no-op)"""
+    attachment = Attachment(body.kind, body.name, body.text)
+    attachments.add(attachment)
+    return attachment.describe()
+
+
+@app.get("/v1/attachments")
+async def attachment_status() -> Dict[str, Any]:
+    return attachments.get_status()
+
+
+@app.get("/v1/attachments/{attachment_id}")
+async def get_attachment(attachment_id: str) -> Dict[str, Any]:
+    attachment = attachments.get(attachment_id)
+    if attachment is None:
+        raise HTTPException(404, f"Unknown attachment {attachment_id}")
+    return attachment.describe()
+
+
+# --- Sessions ---
+
+@app.get("/v1/sessions")
+async def list_sessions() -> Dict[str, Any]:
+    return sessions.get_status()
+
+
+@app.get("/v1/sessions/{session_id}")
+async def get_session(session_id: str) -> Dict[str, Any]:
+    status = sessions.get_session_status(session_id)
+    if status is None:
+        raise HTTPException(404, f"Session '{session_id}' is not in memory")
+    return status
+
+
+@app.delete("/v1/sessions/{session_id}")
+async def drop_session(session_id: str) -> Dict[str, Any]:
+    """Free a session's memory (its saved history stays in the store)"""
+    return {"session_id": session_id, "dropped": sessions.drop(session_id)}
+
+
+def main():
+    """Serve the app with uvicorn (API_HOST, API_PORT, API_WORKERS)"""
+    import uvicorn
+
+    uvicorn.run(
+        "api.main:app",
+        host=config.API_HOST,
+        port=config.API_PORT,
+        workers=max(1, config.API_WORKERS),
+        timeout_keep_alive=30,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Fake Model Server for Beechwood OS benchmarks
+A local stand-in for the Anthropic messages endpoint
+
+Speaks just enough of the API for the agents: POST /v1/messages, plain or
+streamed (server-sent events). It never calls a real model; replies are
+filler text. What it does simulate:
+- latency: time before the first token
+- token rate: output tokens per second after that
+- errors: a share of requests fail with 529/429/500
+- usage: input tokens from the request size, and prompt caching -
+  prefixes marked with cache_control are written to the cache, and a
+  later request whose breakpoint (or up to 20 blocks before it) matches
+  a written prefix reads it from cache
+
+Usage:
+    server = FakeModelServer(latency=0.2, tokens_per_second=80)
+    server.start()
+    # point ANTHROPIC_BASE_URL at server.url
+    server.stop()
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# Characters per token the server bills by (independent of core.tokens)
+CHARS_PER_TOKEN = 4
+
+# How far back from a breakpoint the API looks for an earlier cache entry
+CACHE_LOOKBACK_BLOCKS = 20
+
+FILLER_WORDS = ("the", "plan", "ships", "with", "tests", "and", "a", "rollout", "for", "Beacon")
+
+ERROR_BODIES = {
+    429: ("rate_limit_error", "Number of request tokens has exceeded your per-minute rate limit"),
+    500: ("api_error", "Internal server error"),
+    529: ("overloaded_error", "Overloaded"),
+}
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def _blocks(content: Any) -> List[Dict[str, Any]]:
+    """A system prompt or message content as a list of blocks"""
+    if isinstance(content, str):
+        return [{"type": "text", "text": content}]
+    return list(content or [])
+
+
+class FakeModelServer:
+    """Local HTTP server that answers like the messages API"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+        output_tokens: int = 100,
+        error_rate: float = 0.0,
+        error_statuses: Sequence[int] = (529, 429, 500),
+        retry_after: float = 0.0,
+        min_cache_tokens: int = 1024,
+        seed: int = 0,
+        port: int = 0
+    ):
+        """
+        Args:
+            latency: Seconds before the first token
+            tokens_per_second: Output speed after that (0 = instant)
+            output_tokens: Length of each reply
+            error_rate: Share of requests that fail (0-1)
+            error_statuses: Statuses injected errors are picked from
+            retry_after: retry-after header sent with injected errors
+            min_cache_tokens: Shortest prefix that gets cached (the API's
+                              minimum is 1024 tokens for Sonnet/Opus)
+            seed: Random seed (same seed, same injected errors)
+            port: Port to listen on (0 = any free port)
+        """
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.retry_after = retry_after
+        self.min_cache_tokens = min_cache_tokens
+        self.port = port
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cached_prefixes = set()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            "requests": 0, "streamed": 0, "errors_injected": 0, "input_tokens": 0, "output_tokens": 0,
+            "connections": 0,  # TCP connections accepted (keep-alive reuse keeps this low)
+        }
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> "FakeModelServer":
+        """Start serving in a background thread"""
+        server = self
+
+        class Handler(_MessagesHandler):
+            fake = server
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-model-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeModelServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def _count(self, **amounts: int):
+        with self._lock:
+            for key, amount in amounts.items():
+                self.stats[key] += amount
+
+    def should_fail(self) -> Optional[int]:
+        """Status of an injected error for this request, or None"""
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats["errors_injected"] += 1
+                return self._random.choice(self.error_statuses)
+        return None
+
+    def usage(self, body: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Bill a request like the API does with prompt caching
+
+        The prompt is read in order (system blocks, then message blocks)
+        and hashed at every block boundary. The longest cached prefix
+        found from a breakpoint (looking back up to 20 blocks) is a cache
+        read; the rest up to the last breakpoint is written to the cache;
+        the remainder is regular input.
+        """
+        digest = hashlib.sha256(body.get("model", "").encode())
+        total = 0
+        boundaries: List[Tuple[int, str]] = []  # (tokens so far, prefix hash) per block
+        breakpoints: List[int] = []  # indexes into boundaries
+
+        segments = [("system", block) for block in _blocks(body.get("system"))]
+        for message in body.get("messages", []):
+            segments += [(message["role"], block) for block in _blocks(message["content"])]
+
+        for role, block in segments:
+            text = block.get("text", "") if block.get("type") == "text" else json.dumps(block)
+            digest.update(role.encode() + text.encode())
+            total += _tokens(text)
+            boundaries.append((total, digest.copy().hexdigest()))
+            if block.get("cache_control") and total >= self.min_cache_tokens:
+                breakpoints.append(len(boundaries) - 1)
+
+        cache_read = 0
+        with self._lock:
+            for index in breakpoints:
+                for earlier in range(index, max(-1, index - CACHE_LOOKBACK_BLOCKS), -1):
+                    tokens, prefix = boundaries[earlier]
+                    if prefix in self._cached_prefixes:
+                        cache_read = max(cache_read, tokens)
+                        break
+            cache_creation = max(0, boundaries[breakpoints[-1]][0] - cache_read) if breakpoints else 0
+            self._cached_prefixes.update(boundaries[index][1] for index in breakpoints)
+
+        return {
+            "input_tokens": total - cache_read - cache_creation,
+            "cache_creation_input_tokens": cache_creation,
+            "cache_read_input_tokens": cache_read,
+            "output_tokens": min(self.output_tokens, body.get("max_tokens", self.output_tokens)),
+        }
+
+    def reply_chunks(self, output_tokens: int) -> List[str]:
+        """Filler reply, one word per token"""
+        return [f"{FILLER_WORDS[index % len(FILLER_WORDS)]} " for index in range(output_tokens)]
+
+
+class _MessagesHandler(BaseHTTPRequestHandler):
+    """HTTP handler for /v1/messages (keep-alive, chunked streaming)"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # otherwise small replies wait on delayed ACKs
+    fake: FakeModelServer
+
+    def log_message(self, format: str, *args):
+        pass  # keep benchmark output clean
+
+    def handle(self):
+        self.fake._count(connections=1)
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client cancelled mid-reply (e.g., a timed-out stream)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_HEAD(self):
+        # Connection pre-warming
+        self.send_response(200)
+        self.send_header("content-length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+        fake = self.fake
+
+        if not self.path.rstrip("/").endswith("/v1/messages"):
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+            return
+
+        status = fake.should_fail()
+        if status is not None:
+            error_type, message = ERROR_BODIES.get(status, ("api_error", "Injected error"))
+            self._send_json(
+                status,
+                {"type": "error", "error": {"type": error_type, "message": message}},
+                {"retry-after": str(fake.retry_after)},
+            )
+            return
+
+        usage = fake.usage(body)
+        chunks = fake.reply_chunks(usage["output_tokens"])
+        fake._count(requests=1, input_tokens=usage["input_tokens"], output_tokens=usage["output_tokens"])
+
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        message = {
+            "id": f"msg_fake_{fake.stats['requests']}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-fake"),
+            "content": [],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": usage,
+        }
+
+        if body.get("stream"):
+            fake._count(streamed=1)
+            self._stream(message, chunks)
+            return
+
+        if fake.tokens_per_second:
+            time.sleep(len(chunks) / fake.tokens_per_second)
+        message["content"] = [{"type": "text", "text": "".join(chunks)}]
+        self._send_json(200, message)
+
+    def _event(self, name: str, data: Dict[str, Any]):
+        """Write one server-sent event as an HTTP chunk"""
+        payload = f"event: {name}\ndata: {json.dumps(data)}\n\n".encode()
+        self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, message: Dict[str, Any], chunks: List[str]):
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("transfer-encoding", "chunked")
+        self.end_headers()
+
+        usage = message["usage"]
+        start = {**message, "usage": {**usage, "output_tokens": 1}}
+        self._event("message_start", {"type": "message_start", "message": start})
+        self._event("content_block_start", {
+            "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+        })
+
+        delay = 1 / self.fake.tokens_per_second if self.fake.tokens_per_second else 0
+        for chunk in chunks:
+            if delay:
+                time.sleep(delay)
+            self._event("content_block_delta", {
+                "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk},
+            })
+
+        self._event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._event("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": usage["output_tokens"]},
+        })
+        self._event("message_stop", {"type": "message_stop"})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
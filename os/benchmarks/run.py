@@ -0,0 +1,542 @@
+"""
+Benchmark Suite for Beechwood OS
+Measures the framework itself - offline, against FakeModelServer
+
+Suites:
+- overhead: time Beechwood adds on top of a raw HTTP call and the SDK
+- concurrency: throughput and latency as parallel calls increase
+- history: how per-turn tokens (and cost) grow with conversation length,
+  for PULSE and each AI employee
+- errors: success rate, retries and latency with injected API errors
+- sessions: memory held per 1,000 idle sessions - plain dict history vs
+  compact Message records vs the compressed cold tier (no server needed)
+
+Results are written as JSON (default: .beechwood/benchmarks/), with a flat
+"summary" of headline numbers so runs can be compared:
+
+Run from the os/ directory:
+    python -m benchmarks.run
+    python -m benchmarks.run --suite overhead --suite history --quick
+    python -m benchmarks.run --baseline .beechwood/benchmarks/previous.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.fake_server import FakeModelServer
+
+
+BENCHMARK_TASK = (
+    "Review the check-in flow for Beacon: the user taps 'I'm safe', the app sends "
+    "their location to trusted contacts and logs the event. List the risks and fixes."
+)
+
+# Prompt caching price multipliers (relative to a regular input token)
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+SUITE_ORDER = ("overhead", "concurrency", "history", "errors", "sessions")
+
+# Building blocks for synthetic Engineering AI replies (prose plus code)
+REPLY_WORDS = (
+    "component", "state", "hook", "schema", "index", "latency", "retry", "token", "session",
+    "contact", "location", "alert", "queue", "cache", "migration", "endpoint", "payload",
+)
+
+
+def configure(server: FakeModelServer):
+    """
+    Point Beechwood at the fake server and switch off what would skew results
+
+    Must run before any client is built. Rate limits, the response cache
+    and persistence are disabled so the numbers measure the framework,
+    not configured throttles or disk.
+    """
+    os.environ.update({
+        "ANTHROPIC_API_KEY": "benchmark",
+        "ANTHROPIC_BASE_URL": server.url,
+        "ANTHROPIC_PREWARM_CONNECTIONS": "0",
+        "RATE_LIMIT_RPM": "0",
+        "RATE_LIMIT_INPUT_TPM": "0",
+        "RATE_LIMIT_OUTPUT_TPM": "0",
+        "RESPONSE_CACHE_REDIS": "False",
+        "STORE_BACKEND": "none",
+        "HISTORY_SUMMARY_BACKGROUND": "False",
+        "RETRY_BASE_DELAY": "0.01",
+        "RETRY_MAX_DELAY": "0.1",
+    })
+
+
+def latency_stats(samples: Sequence[float]) -> Dict[str, Any]:
+    """Summary of latency samples (seconds in, milliseconds out)"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def percentile(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(percentile(0.5), 3),
+        "p95_ms": round(percentile(0.95), 3),
+        "p99_ms": round(percentile(0.99), 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _timed(fn: Callable[[], Any], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _fresh_agents() -> Dict[str, Any]:
+    """New (non-singleton) instances so runs don't share memory"""
+    from agents.engineering_ai import EngineeringAI
+    from agents.security_ai import SecurityAI
+    from pulse.coordinator import PulseCoordinator
+
+    return {"pulse": PulseCoordinator(), "engineering": EngineeringAI(), "security": SecurityAI()}
+
+
+def bench_overhead(server: FakeModelServer, requests: int) -> Dict[str, Any]:
+    """
+    Framework overhead per call (instant server, tiny replies)
+
+    The same request is sent three ways: a raw HTTP POST, the SDK, and
+    the agent (preflight, cache lookup, rate limiter, resilience, metrics).
+    """
+    import httpx
+    from agents.engineering_ai import EngineeringAI
+    from core.config import config
+
+    server.latency, server.tokens_per_second, server.output_tokens, server.error_rate = 0, 0, 20, 0
+
+    agent = EngineeringAI()
+    params, _ = agent.prepare_standalone_request(BENCHMARK_TASK)
+    headers = {"x-api-key": "benchmark", "anthropic-version": "2023-06-01"}
+
+    with httpx.Client(base_url=server.url) as http:
+        raw = lambda: http.post("/v1/messages", json=params, headers=headers).raise_for_status()
+        sdk = lambda: config.get_anthropic_client(agent.agent_key).messages.create(**params)
+        standalone = lambda: agent.execute_standalone(BENCHMARK_TASK, use_cache=False)
+
+        def conversation():
+            agent.clear_context()
+            agent.execute_task(BENCHMARK_TASK, use_cache=False)
+
+        levels = {"raw_http": raw, "sdk": sdk, "agent_standalone": standalone, "agent_conversation": conversation}
+        results = {}
+        for name, fn in levels.items():
+            _timed(fn, 5)  # warm up connections and caches
+            results[name] = latency_stats(_timed(fn, requests))
+
+    raw_p50 = results["raw_http"]["p50_ms"]
+    results["overhead_ms"] = {
+        "sdk": round(results["sdk"]["p50_ms"] - raw_p50, 3),
+        "agent_standalone": round(results["agent_standalone"]["p50_ms"] - raw_p50, 3),
+        "agent_conversation": round(results["agent_conversation"]["p50_ms"] - raw_p50, 3),
+    }
+    return results
+
+
+def bench_concurrency(
+    server: FakeModelServer,
+    levels: Sequence[int],
+    requests_per_level: int,
+    latency: float
+) -> Dict[str, Any]:
+    """Throughput and latency with N calls in parallel (server latency fixed)"""
+    from agents.engineering_ai import EngineeringAI
+
+    server.latency, server.tokens_per_second, server.output_tokens, server.error_rate = latency, 0, 50, 0
+    agent = EngineeringAI()
+
+    def call(_):
+        started = time.perf_counter()
+        result = agent.execute_standalone(BENCHMARK_TASK, use_cache=False)
+        return time.perf_counter() - started, result["success"]
+
+    rows = []
+    for level in levels:
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            list(executor.map(call, range(level)))  # warm up the pool
+            started = time.perf_counter()
+            outcomes = list(executor.map(call, range(requests_per_level)))
+            elapsed = time.perf_counter() - started
+
+        throughput = requests_per_level / elapsed
+        ideal = level / latency if latency else None
+        rows.append({
+            "concurrency": level,
+            "requests": requests_per_level,
+            "succeeded": sum(1 for _, ok in outcomes if ok),
+            "throughput_rps": round(throughput, 2),
+            "efficiency": round(throughput / ideal, 3) if ideal else None,
+            "latency": latency_stats([seconds for seconds, _ in outcomes]),
+        })
+    return {"server_latency_s": latency, "levels": rows}
+
+
+def bench_history(server: FakeModelServer, turns: int, output_tokens: int) -> Dict[str, Any]:
+    """
+    Per-turn tokens as a conversation grows, for PULSE and each agent
+
+    input_equivalent weighs cache writes and reads by their price
+    multipliers, so it tracks relative cost per turn.
+    """
+    server.latency, server.tokens_per_second, server.output_tokens, server.error_rate = 0, 0, output_tokens, 0
+
+    results = {}
+    for key, agent in _fresh_agents().items():
+        rows = []
+        for turn in range(1, turns + 1):
+            task = f"Turn {turn}. {BENCHMARK_TASK}"
+            before = server.stats["requests"]
+            started = time.perf_counter()
+            if key == "pulse":
+                result = agent.process_request(task, use_cache=False)
+            else:
+                result = agent.execute_task(task, use_cache=False)
+            elapsed = time.perf_counter() - started
+
+            creation = result.get("cache_creation_input_tokens", 0)
+            read = result.get("cache_read_input_tokens", 0)
+            rows.append({
+                "turn": turn,
+                "success": result["success"],
+                "input_tokens": result.get("input_tokens", 0),
+                "cache_creation_input_tokens": creation,
+                "cache_read_input_tokens": read,
+                "output_tokens": result.get("output_tokens", 0),
+                "input_equivalent": round(
+                    result.get("input_tokens", 0) + creation * CACHE_WRITE_MULTIPLIER + read * CACHE_READ_MULTIPLIER, 1
+                ),
+                "history_messages": len(agent.conversation_history),
+                "summarized_turns": agent.conversation.summarized_turns,
+                "api_calls": server.stats["requests"] - before,  # >1 when memory was compacted
+                "latency_ms": round(elapsed * 1000, 3),
+            })
+
+        prompt = [row["input_tokens"] + row["cache_creation_input_tokens"] + row["cache_read_input_tokens"] for row in rows]
+        results[key] = {
+            "token_budget": agent.conversation.token_budget,
+            "first_turn_prompt_tokens": prompt[0],
+            "last_turn_prompt_tokens": prompt[-1],
+            "max_prompt_tokens": max(prompt),
+            "first_turn_input_equivalent": rows[0]["input_equivalent"],
+            "last_turn_input_equivalent": rows[-1]["input_equivalent"],
+            "total_input_equivalent": round(sum(row["input_equivalent"] for row in rows), 1),
+            "turns": rows,
+        }
+    return {"agents": results}
+
+
+def bench_errors(
+    server: FakeModelServer,
+    error_rate: float,
+    requests: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """Success rate, retries and latency while the server injects errors"""
+    from agents.security_ai import SecurityAI
+    from core.resilience import resilience
+
+    server.latency, server.tokens_per_second, server.output_tokens = 0.02, 0, 50
+    server.error_rate = error_rate
+    agent = SecurityAI()
+    before = dict(resilience.get_status(agent.agent_key))
+
+    def call(_):
+        started = time.perf_counter()
+        result = agent.execute_standalone(BENCHMARK_TASK, use_cache=False)
+        return time.perf_counter() - started, result["success"]
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(call, range(requests)))
+    finally:
+        server.error_rate = 0
+
+    after = resilience.get_status(agent.agent_key)
+    succeeded = sum(1 for _, ok in outcomes if ok)
+    return {
+        "error_rate": error_rate,
+        "requests": requests,
+        "concurrency": concurrency,
+        "success_rate": round(succeeded / requests, 4),
+        "errors_injected": server.stats["errors_injected"],
+        "retries": after.get("retries", 0) - before.get("retries", 0),
+        "short_circuited": after.get("short_circuited", 0) - before.get("short_circuited", 0),
+        "circuit": after["circuit"],
+        "latency": latency_stats([seconds for seconds, _ in outcomes]),
+    }
+
+
+def _synthetic_turns(rng: random.Random, turns: int) -> List[tuple]:
+    """(role, content) pairs shaped like an Engineering AI session: short asks, long code-heavy replies"""
+    pairs = []
+    for turn in range(turns):
+        name = f"{rng.choice(REPLY_WORDS).title()}{rng.choice(REPLY_WORDS).title()}{rng.randint(1, 999)}"
+        pairs.append(("user", f"Turn {turn}: implement {name} for Beacon. {BENCHMARK_TASK}"))
+
+        prose = " ".join(rng.choice(REPLY_WORDS) for _ in range(rng.randint(120, 200)))
+        fields = "\n".join(
+            f"  {rng.choice(REPLY_WORDS)}{index}: {rng.choice(('string', 'number', 'boolean'))};"
+            for index in range(rng.randint(8, 20))
+        )
+        body = "\n".join(
+            f"    const {rng.choice(REPLY_WORDS)}{index} = await fetch{name}({rng.randint(0, 10**6)});"
+            for index in range(rng.randint(10, 30))
+        )
+        code = (
+            f"```typescript\nexport interface {name}Props {{\n{fields}\n}}\n\n"
+            f"export async function load{name}(props: {name}Props) {{\n  try {{\n{body}\n"
+            f"  }} catch (error) {{\n    console.error('{name} failed', error);\n  }}\n}}\n```"
+        )
+        pairs.append(("assistant", f"{prose}\n\n{code}\n\nNext steps: {prose[:300]}"))
+    return pairs
+
+
+def bench_sessions(sessions: int, turns: int) -> Dict[str, Any]:
+    """
+    Memory held by idle session histories, three ways
+
+    - dicts: {"role", "content"} dictionaries (the old representation)
+    - records: Conversation with Message records (hot, in use)
+    - cold: the same conversations frozen into the compressed cold tier
+
+    Memory is measured with tracemalloc and scaled to 1,000 sessions.
+    """
+    import gc
+    import tracemalloc
+
+    from core.config import config
+    from core.memory import Conversation
+
+    def measure(build: Callable[[random.Random], Any]) -> Tuple[int, Any]:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            held = build(random.Random(7))  # same seed, same text for every variant
+            gc.collect()
+            used = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        return used, held
+
+    def build_dicts(rng: random.Random):
+        return [
+            [{"role": role, "content": content} for role, content in _synthetic_turns(rng, turns)]
+            for _ in range(sessions)
+        ]
+
+    def build_records(rng: random.Random):
+        conversations = []
+        for _ in range(sessions):
+            conversation = Conversation("engineering", token_budget=0, session_id="")
+            for role, content in _synthetic_turns(rng, turns):
+                conversation.add(role, content)
+            conversations.append(conversation)
+        return conversations
+
+    frozen_timings: List[float] = []
+
+    def build_cold(rng: random.Random):
+        conversations = build_records(rng)
+        for conversation in conversations:
+            started = time.perf_counter()
+            conversation.freeze()
+            frozen_timings.append(time.perf_counter() - started)
+        return conversations
+
+    dict_bytes, held = measure(build_dicts)
+    content_bytes = sum(len(message["content"]) for history in held for message in history)
+    del held
+    record_bytes, held = measure(build_records)
+    del held
+    cold_bytes, cold = measure(build_cold)
+
+    thaw_timings = []
+    for conversation in cold[:200]:
+        started = time.perf_counter()
+        conversation.thaw()
+        thaw_timings.append(time.perf_counter() - started)
+    del cold
+
+    scale = 1000 / sessions
+    per_1000 = lambda used: round(used * scale / 1024, 1)
+    return {
+        "sessions": sessions,
+        "turns_per_session": turns,
+        "codec": config.SESSION_COLD_CODEC,
+        "text_kb_per_1000": per_1000(content_bytes),
+        "dicts_kb_per_1000": per_1000(dict_bytes),
+        "records_kb_per_1000": per_1000(record_bytes),
+        "cold_kb_per_1000": per_1000(cold_bytes),
+        "records_saved_kb_per_1000": per_1000(dict_bytes - record_bytes),
+        "cold_saved_kb_per_1000": per_1000(dict_bytes - cold_bytes),
+        "cold_vs_dicts_ratio": round(dict_bytes / cold_bytes, 2) if cold_bytes else None,
+        "freeze": latency_stats(frozen_timings),
+        "thaw": latency_stats(thaw_timings),
+    }
+
+
+def summarize(suites: Dict[str, Any]) -> Dict[str, float]:
+    """Flat headline numbers (lower is better unless the name says rps/rate)"""
+    summary: Dict[str, float] = {}
+    if "overhead" in suites:
+        for name, overhead in suites["overhead"]["overhead_ms"].items():
+            summary[f"overhead.{name}_ms"] = overhead
+    if "concurrency" in suites:
+        for row in suites["concurrency"]["levels"]:
+            summary[f"concurrency.c{row['concurrency']}_rps"] = row["throughput_rps"]
+            summary[f"concurrency.c{row['concurrency']}_p95_ms"] = row["latency"]["p95_ms"]
+    if "history" in suites:
+        for agent, result in suites["history"]["agents"].items():
+            summary[f"history.{agent}_total_input_equivalent"] = result["total_input_equivalent"]
+            summary[f"history.{agent}_max_prompt_tokens"] = result["max_prompt_tokens"]
+    if "errors" in suites:
+        summary["errors.success_rate"] = suites["errors"]["success_rate"]
+        summary["errors.p95_ms"] = suites["errors"]["latency"]["p95_ms"]
+    if "sessions" in suites:
+        for name in ("dicts", "records", "cold"):
+            summary[f"sessions.{name}_kb_per_1000"] = suites["sessions"][f"{name}_kb_per_1000"]
+    return summary
+
+
+def compare(report: Dict[str, Any], baseline_path: str):
+    """Print the change of every headline number against an earlier run"""
+    previous_report = json.loads(Path(baseline_path).read_text())
+    baseline = previous_report.get("summary", {})
+    print(f"\n📈 Compared with {baseline_path}:")
+    if previous_report.get("sizes") != report["sizes"]:
+        print("   ⚠️  The baseline used different request counts (e.g. --quick) - compare with care")
+    for name, value in report["summary"].items():
+        previous = baseline.get(name)
+        if previous in (None, 0):
+            print(f"   {name}: {value} (new)")
+            continue
+        change = (value - previous) / abs(previous) * 100
+        print(f"   {name}: {previous} -> {value} ({change:+.1f}%)")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(suites: Sequence[str], quick: bool = False) -> Dict[str, Any]:
+    """
+    Run benchmark suites against a fresh fake server
+
+    Args:
+        suites: Names from SUITE_ORDER
+        quick: Fewer requests (a smoke run, e.g. in CI)
+
+    Returns:
+        The report dictionary (also what gets written to disk)
+    """
+    server = FakeModelServer().start()
+    configure(server)
+
+    sizes = {
+        "overhead_requests": 30 if quick else 200,
+        "concurrency_levels": (1, 4, 16) if quick else (1, 2, 4, 8, 16, 32),
+        "concurrency_requests": 32 if quick else 128,
+        "concurrency_latency": 0.05 if quick else 0.2,
+        "history_turns": 12 if quick else 40,
+        "history_output_tokens": 400,
+        "error_rate": 0.2,
+        "error_requests": 40 if quick else 200,
+        "error_concurrency": 4,
+        "sessions": 200 if quick else 1000,
+        "session_turns": 6 if quick else 10,
+    }
+
+    report: Dict[str, Any] = {
+        "benchmark": "beechwood-os",
+        "created_at": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "sizes": {key: list(value) if isinstance(value, tuple) else value for key, value in sizes.items()},
+        "suites": {},
+    }
+
+    try:
+        for name in SUITE_ORDER:
+            if name not in suites:
+                continue
+            print(f"\n⏱️  Running {name} benchmark...")
+            started = time.perf_counter()
+            server.reset_stats()
+            if name == "overhead":
+                result = bench_overhead(server, sizes["overhead_requests"])
+            elif name == "concurrency":
+                result = bench_concurrency(
+                    server, sizes["concurrency_levels"], sizes["concurrency_requests"], sizes["concurrency_latency"]
+                )
+            elif name == "history":
+                result = bench_history(server, sizes["history_turns"], sizes["history_output_tokens"])
+            elif name == "sessions":
+                result = bench_sessions(sizes["sessions"], sizes["session_turns"])
+            else:
+                result = bench_errors(
+                    server, sizes["error_rate"], sizes["error_requests"], sizes["error_concurrency"]
+                )
+            result["duration_s"] = round(time.perf_counter() - started, 2)
+            report["suites"][name] = result
+    finally:
+        server.stop()
+
+    report["summary"] = summarize(report["suites"])
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark Beechwood OS against a local fake model server")
+    parser.add_argument("--suite", action="append", choices=SUITE_ORDER, help="Suite to run (repeatable; default: all)")
+    parser.add_argument("--quick", action="store_true", help="Fewer requests, for a fast smoke run")
+    parser.add_argument("--output", help="Where to write the JSON report")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    report = run(args.suite or SUITE_ORDER, quick=args.quick)
+
+    output = Path(args.output or Path(".beechwood/benchmarks") / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=1))
+
+    print("\n📊 Summary:")
+    for name, value in report["summary"].items():
+        print(f"   {name}: {value}")
+    if args.baseline:
+        compare(report, args.baseline)
+    print(f"\n✅ Report written to {output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
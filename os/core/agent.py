@@ -0,0 +1,667 @@
+"""
+Base AI Employee for Beechwood OS
+
+Every AI employee (and PULSE itself) talks to Claude the same way:
+add the task to memory, call the model, remember the answer, report back.
+This module holds that shared plumbing so each department only has to
+define who it is and what it's good at.
+"""
+
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Any, Tuple
+
+from core.attachments import attachments
+from core.config import config
+from core.memory import Conversation
+from core.metrics import metrics
+from core.rate_limiter import rate_limiter
+from core.resilience import resilience
+from core.response_cache import response_cache
+from core.sessions import current_session, sessions
+from core.store import conversation_store
+from core.prompt_cache import cache_usage, cacheable_messages, cacheable_system
+from core.tokens import estimate_request, preflight_request
+
+
+DEFAULT_MODEL = "claude-sonnet-4-20250514"
+
+
+class BaseAgent:
+    """
+    Base class for AI employees
+
+    Subclasses set:
+    - agent_key: short routing name (e.g., "engineering")
+    - name / department / specialty: who this employee is
+    - aliases / capabilities: other names it answers to, and what it's
+      good at (used by the agent registry and request routing)
+    - model / max_tokens: how it calls Claude
+    - _create_system_prompt(): its "job description"
+
+    Every agent gets a blocking, an async and a streaming execution path
+    that share the same conversation history and result dictionary contract.
+    """
+
+    agent_key: str = ""
+    name: str = "AI Employee"
+    department: str = ""
+    specialty: str = ""
+    aliases: List[str] = []
+    capabilities: List[str] = []
+    model: str = DEFAULT_MODEL
+    max_tokens: int = 8192
+
+    # Key the model's answer is returned under in result dictionaries
+    output_key: str = "output"
+
+    # Specialized methods that skip the rate limit line (see rate_limiter.urgent)
+    urgent_methods: Tuple[str, ...] = ()
+
+    def __init__(self):
+        """Set up memory (the Claude client is only fetched when first needed)"""
+        # Memory used outside of any session (recent turns + running summary;
+        # in memory only, so every run starts fresh)
+        self._conversation = Conversation(self.agent_key)
+
+        # System prompt - defines this AI's role and capabilities
+        self.system_prompt = self._create_system_prompt()
+
+        # Local size estimate of the most recent request
+        self.last_estimate: Dict[str, int] = {}
+
+    @property
+    def conversation(self) -> Conversation:
+        """
+        Conversation memory for the current session
+
+        Recent turns + running summary of older ones. Each session (see
+        core.sessions.use_session) has its own; outside of a session the
+        agent uses its own memory.
+        """
+        session_id = current_session()
+        if session_id is None:
+            return self._conversation
+        return sessions.conversation(self.agent_key, session_id)
+
+    @property
+    def conversation_history(self) -> List[Dict[str, Any]]:
+        """Recent turns kept verbatim (older ones live in the summary)"""
+        return self.conversation.messages
+
+    @conversation_history.setter
+    def conversation_history(self, messages: List[Dict[str, Any]]):
+        self.conversation.messages = messages
+
+    @property
+    def client(self):
+        """Shared Claude client (created on the first call, not at startup)"""
+        return config.get_anthropic_client(self.agent_key)
+
+    @property
+    def async_client(self):
+        """Shared async Claude client for the running event loop"""
+        return config.get_async_anthropic_client(self.agent_key)
+
+    def _create_system_prompt(self) -> str:
+        """Create the system prompt for this agent"""
+        raise NotImplementedError
+
+    def _build_task(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        history: Optional[List[Dict[str, Any]]] = None
+    ) -> Any:
+        """
+        Combine the task with any additional context
+
+        Large context (files, specs, other agents' results) becomes
+        attachments: sent once as content blocks, then referenced by hash
+        while the conversation still holds them (see core.attachments).
+
+        Args:
+            task: The task
+            context: Optional additional context
+            history: Messages the task will follow (defaults to this
+                     conversation's history; [] for standalone tasks)
+
+        Returns:
+            The user turn's content (a string, or content blocks)
+        """
+        if not context:
+            return task
+        if history is None:
+            history = self.conversation_history
+        return attachments.build_content(task, context, history)
+
+    def _build_request(self, messages: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Assemble the parameters for a messages.create call
+
+        With PROMPT_CACHING on, the static system prompt and the
+        conversation prefix are marked cacheable.
+
+        Args:
+            messages: Messages to send (defaults to the conversation history)
+        """
+        # Snapshot so concurrent turns can't change a request mid-flight
+        messages = list(self.conversation_history if messages is None else messages)
+        summary = self.conversation.summary
+
+        if not config.PROMPT_CACHING:
+            system = self.system_prompt
+            if summary:
+                system += f"\n\n{self._summary_text(summary)}"
+            return {
+                "model": self.model,
+                "max_tokens": self.max_tokens,
+                "system": system,
+                "messages": messages,
+            }
+
+        # The summary goes after the static prompt so the prompt stays cached
+        system = cacheable_system(self.system_prompt)
+        if summary:
+            system.append({"type": "text", "text": self._summary_text(summary)})
+
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "system": system,
+            "messages": cacheable_messages(messages),
+        }
+
+    def _summary_text(self, summary: str) -> str:
+        """System prompt section carrying the summary of older turns"""
+        return f"SUMMARY OF EARLIER CONVERSATION:\n{summary}"
+
+    def _prepare_request(self) -> Dict[str, Any]:
+        """
+        Build the request for the current turn and preflight it locally
+
+        Oversized history is trimmed from the request; if the new turn
+        alone is too big, the request is rejected before any network call
+        (and _turn() takes the turn back out of memory).
+        """
+        params, estimate = preflight_request(self._build_request())
+        self.last_estimate = estimate
+        return params
+
+    def estimate_task(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, int]:
+        """
+        Estimate what a task would cost without sending it
+
+        Useful for scheduling: nothing is added to memory.
+
+        Args:
+            task: The task to estimate
+            context: Optional additional context
+
+        Returns:
+            Dictionary with input_tokens, max_output_tokens, total_tokens
+            and context_window
+        """
+        messages = self.conversation_history + [
+            {"role": "user", "content": self._build_task(task, context)}
+        ]
+        return estimate_request(self._build_request(messages))
+
+    def prepare_standalone_request(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        Build the request for one self-contained task without sending it
+
+        Conversation history is neither sent nor changed, so many of these
+        can be packed into one batch job (see core.batch).
+
+        Returns:
+            Tuple of (messages.create parameters, local size estimate)
+        """
+        messages = [{"role": "user", "content": self._build_task(task, context, history=[])}]
+        return preflight_request(self._build_request(messages))
+
+    def _start_turn(self, content: Any):
+        """Add the user's turn to conversation history"""
+        self.conversation.add("user", content)
+
+    @contextmanager
+    def _turn(self, content: Any):
+        """
+        Add the user's turn, and take it back out if the call fails
+
+        Covers errors, timeouts and cancellation (e.g., a client hanging
+        up mid-stream): otherwise the unanswered turn would stay last in
+        history, and the conversation would look mid-turn forever (so
+        its session could never be frozen or evicted).
+        """
+        self._start_turn(content)
+        try:
+            yield
+        except BaseException:
+            self.conversation.discard_last("user")
+            raise
+
+    def _finish_turn(self, assistant_message: str):
+        """Add the assistant's reply and keep memory inside its budget"""
+        self.conversation.add("assistant", assistant_message)
+        self.conversation.maybe_compact()
+        if current_session() is not None:
+            sessions.touch(current_session())
+
+    def _cache_lookup(self, params: Dict[str, Any], use_cache: bool) -> Tuple[Optional[str], Any]:
+        """
+        Check the response cache for this exact request
+
+        Returns:
+            Tuple of (cache key or None, cached response or None)
+        """
+        if not response_cache.enabled:
+            return None, None
+        if not use_cache:
+            response_cache.record_bypass()
+            return None, None
+
+        key = response_cache.make_key(self.agent_key, params)
+        return key, response_cache.get(key)
+
+    def _create_message(self, params: Dict[str, Any], input_tokens: int) -> Any:
+        """One messages.create call, paced by the shared rate limiter"""
+        with rate_limiter.reserve(self.agent_key, input_tokens, params["max_tokens"]) as ticket:
+            response = self.client.messages.create(**params)
+            ticket.usage = response.usage
+        return response
+
+    async def _create_message_async(self, params: Dict[str, Any], input_tokens: int) -> Any:
+        """Async version of _create_message()"""
+        async with rate_limiter.reserve_async(self.agent_key, input_tokens, params["max_tokens"]) as ticket:
+            response = await self.async_client.messages.create(**params)
+            ticket.usage = response.usage
+        return response
+
+    def _send(self, content: Any, use_cache: bool = True) -> Tuple[str, Any]:
+        """
+        Send one user turn to Claude (blocking)
+
+        Returns:
+            Tuple of (assistant message text, raw API response)
+        """
+        # Add task to conversation history (taken back out if anything fails)
+        with self._turn(content):
+            # Call Claude API (after a local size check and a cache lookup)
+            params = self._prepare_request()
+            input_tokens = self.last_estimate["input_tokens"]
+            cache_key, response = self._cache_lookup(params, use_cache)
+            if response is None:
+                response = resilience.call(
+                    self.agent_key, lambda: self._create_message(params, input_tokens)
+                )
+
+            # Extract response and add it to conversation history
+            assistant_message = response.content[0].text
+            self._finish_turn(assistant_message)
+
+        if cache_key and not getattr(response, "cached", False):
+            response_cache.set(cache_key, assistant_message, response.model)
+
+        return assistant_message, response
+
+    async def _send_async(self, content: Any, use_cache: bool = True) -> Tuple[str, Any]:
+        """
+        Send one user turn to Claude without blocking the event loop
+
+        Returns:
+            Tuple of (assistant message text, raw API response)
+        """
+        with self._turn(content):
+            params = self._prepare_request()
+            input_tokens = self.last_estimate["input_tokens"]
+            cache_key, response = None, None
+            if use_cache and response_cache.enabled:
+                cache_key = response_cache.make_key(self.agent_key, params)
+                response = await response_cache.get_async(cache_key)
+            elif not use_cache:
+                response_cache.record_bypass()
+
+            if response is None:
+                response = await resilience.call_async(
+                    self.agent_key, lambda: self._create_message_async(params, input_tokens)
+                )
+
+            assistant_message = response.content[0].text
+            self._finish_turn(assistant_message)
+
+        if cache_key and not getattr(response, "cached", False):
+            await response_cache.set_async(cache_key, assistant_message, response.model)
+
+        return assistant_message, response
+
+    def _result_base(self) -> Dict[str, Any]:
+        """Identity fields included in every result dictionary"""
+        return {
+            "agent": self.name,
+            "department": self.department,
+        }
+
+    def _success_result(self, message: str, response: Any) -> Dict[str, Any]:
+        """Build the result dictionary for a successful call"""
+        return {
+            "success": True,
+            **self._result_base(),
+            self.output_key: message,
+            "timestamp": datetime.now().isoformat(),
+            "tokens_used": response.usage.input_tokens + response.usage.output_tokens,
+            "input_tokens": response.usage.input_tokens,
+            "output_tokens": response.usage.output_tokens,
+            **cache_usage(response),
+            "estimated_input_tokens": self.last_estimate.get("input_tokens"),
+            "cached": getattr(response, "cached", False),
+            "model": response.model
+        }
+
+    def _error_message(self, error: Exception) -> str:
+        """Human-readable error text"""
+        return f"{self.name} error: {str(error)}"
+
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """Build the result dictionary for a failed call"""
+        error_message = self._error_message(error)
+        print(f"❌ {error_message}")
+
+        return {
+            "success": False,
+            **self._result_base(),
+            self.output_key: error_message,
+            "error_type": type(error).__name__,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def _record_result(self, task: str, result: Dict[str, Any], call: Any) -> Dict[str, Any]:
+        """Record a finished call's metrics and save its result (in the background)"""
+        metrics.finish(call, result)
+        session_id = self.conversation.session_id
+        if session_id:
+            conversation_store.record_result(session_id, self.agent_key, task, result)
+        return result
+
+    def execute_task(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Execute a task
+
+        Args:
+            task: The task to complete
+            context: Optional additional context (files, requirements, other
+                     agents' results...; see core.attachments)
+            use_cache: Set False to always call the model (skip the response cache)
+
+        Returns:
+            Dictionary with output and metadata
+        """
+        with metrics.track(self.agent_key, self.model) as call:
+            try:
+                message, response = self._send(self._build_task(task, context), use_cache)
+                result = self._success_result(message, response)
+            except Exception as e:
+                result = self._error_result(e)
+            return self._record_result(task, result, call)
+
+    async def execute_task_async(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Execute a task without blocking the event loop
+
+        Same arguments, history and result dictionary as execute_task().
+        """
+        with metrics.track(self.agent_key, self.model) as call:
+            try:
+                await self.conversation.load_async()
+                message, response = await self._send_async(self._build_task(task, context), use_cache)
+                result = self._success_result(message, response)
+            except Exception as e:
+                result = self._error_result(e)
+            return self._record_result(task, result, call)
+
+    def execute_standalone(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Execute a self-contained task without using conversation memory
+
+        Nothing is read from or added to history, so many of these can
+        run in parallel on the same agent (e.g., reviewing many files).
+
+        Args:
+            task: The task to complete
+            context: Optional additional context
+            use_cache: Set False to skip the response cache
+
+        Returns:
+            The usual result dictionary
+        """
+        with metrics.track(self.agent_key, self.model) as call:
+            try:
+                params, estimate = self.prepare_standalone_request(task, context)
+                cache_key, response = self._cache_lookup(params, use_cache)
+                if response is None:
+                    response = resilience.call(
+                        self.agent_key,
+                        lambda: self._create_message(params, estimate["input_tokens"])
+                    )
+
+                message = response.content[0].text
+                if cache_key and not getattr(response, "cached", False):
+                    response_cache.set(cache_key, message, response.model)
+
+                result = self._success_result(message, response)
+                result["estimated_input_tokens"] = estimate["input_tokens"]
+            except Exception as e:
+                result = self._error_result(e)
+            return self._record_result(task, result, call)
+
+    async def execute_standalone_async(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Async version of execute_standalone()
+
+        Same arguments and result dictionary; conversation memory is not used.
+        """
+        with metrics.track(self.agent_key, self.model) as call:
+            try:
+                params, estimate = self.prepare_standalone_request(task, context)
+                cache_key, response = None, None
+                if use_cache and response_cache.enabled:
+                    cache_key = response_cache.make_key(self.agent_key, params)
+                    response = await response_cache.get_async(cache_key)
+                elif not use_cache:
+                    response_cache.record_bypass()
+
+                if response is None:
+                    response = await resilience.call_async(
+                        self.agent_key,
+                        lambda: self._create_message_async(params, estimate["input_tokens"])
+                    )
+
+                message = response.content[0].text
+                if cache_key and not getattr(response, "cached", False):
+                    await response_cache.set_async(cache_key, message, response.model)
+
+                result = self._success_result(message, response)
+                result["estimated_input_tokens"] = estimate["input_tokens"]
+            except Exception as e:
+                result = self._error_result(e)
+            return self._record_result(task, result, call)
+
+    def _stream_result(
+        self,
+        message: str,
+        response: Any,
+        started: float,
+        first_token_at: Optional[float]
+    ) -> Dict[str, Any]:
+        """Result dictionary for a finished stream (adds timing info)"""
+        result = self._success_result(message, response)
+        result["streamed"] = True
+        result["time_to_first_token"] = (first_token_at - started) if first_token_at else None
+        result["total_time"] = time.monotonic() - started
+        return result
+
+    def stream_task(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a task and stream the answer as it is generated
+
+        Args:
+            task: The task to complete
+            context: Optional additional context
+            use_cache: Set False to skip the response cache
+
+        Yields:
+            {"type": "text", "text": ...} for each text delta, then one
+            {"type": "result", "result": {...}} with the usual result
+            dictionary plus time_to_first_token / total_time (seconds).
+            The full reply is added to conversation history at the end.
+        """
+        started = time.monotonic()
+        first_token_at = None
+        with metrics.track(self.agent_key, self.model) as call:
+            try:
+                with self._turn(self._build_task(task, context)):
+                    params = self._prepare_request()
+                    cache_key, response = self._cache_lookup(params, use_cache)
+
+                    if response is not None:
+                        # Cache hit: the whole answer arrives as one chunk
+                        first_token_at = time.monotonic()
+                        yield {"type": "text", "text": response.content[0].text}
+                    else:
+                        with rate_limiter.reserve(
+                            self.agent_key, self.last_estimate["input_tokens"], params["max_tokens"]
+                        ) as ticket, resilience.stream(
+                            self.agent_key, lambda: self.client.messages.stream(**params)
+                        ) as stream:
+                            for text in stream.text_stream:
+                                if first_token_at is None:
+                                    first_token_at = time.monotonic()
+                                yield {"type": "text", "text": text}
+                            response = stream.get_final_message()
+                            ticket.usage = response.usage
+
+                    assistant_message = "".join(
+                        block.text for block in response.content if block.type == "text"
+                    )
+                    self._finish_turn(assistant_message)
+
+                if cache_key and not getattr(response, "cached", False):
+                    response_cache.set(cache_key, assistant_message, response.model)
+
+                result = self._stream_result(assistant_message, response, started, first_token_at)
+            except Exception as e:
+                result = self._error_result(e)
+
+            yield {"type": "result", "result": self._record_result(task, result, call)}
+
+    async def stream_task_async(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async version of stream_task()
+
+        Yields the same text and result events without blocking the loop.
+        """
+        started = time.monotonic()
+        first_token_at = None
+        with metrics.track(self.agent_key, self.model) as call:
+            try:
+                await self.conversation.load_async()
+                with self._turn(self._build_task(task, context)):
+                    params = self._prepare_request()
+                    cache_key, response = None, None
+                    if use_cache and response_cache.enabled:
+                        cache_key = response_cache.make_key(self.agent_key, params)
+                        response = await response_cache.get_async(cache_key)
+                    elif not use_cache:
+                        response_cache.record_bypass()
+
+                    if response is not None:
+                        first_token_at = time.monotonic()
+                        yield {"type": "text", "text": response.content[0].text}
+                    else:
+                        async with rate_limiter.reserve_async(
+                            self.agent_key, self.last_estimate["input_tokens"], params["max_tokens"]
+                        ) as ticket, resilience.stream_async(
+                            self.agent_key, lambda: self.async_client.messages.stream(**params)
+                        ) as stream:
+                            async for text in stream.text_stream:
+                                if first_token_at is None:
+                                    first_token_at = time.monotonic()
+                                yield {"type": "text", "text": text}
+                            response = await stream.get_final_message()
+                            ticket.usage = response.usage
+
+                    assistant_message = "".join(
+                        block.text for block in response.content if block.type == "text"
+                    )
+                    self._finish_turn(assistant_message)
+
+                if cache_key and not getattr(response, "cached", False):
+                    await response_cache.set_async(cache_key, assistant_message, response.model)
+
+                result = self._stream_result(assistant_message, response, started, first_token_at)
+            except Exception as e:
+                result = self._error_result(e)
+
+            yield {"type": "result", "result": self._record_result(task, result, call)}
+
+    def clear_context(self):
+        """Clear conversation history for fresh context"""
+        self.conversation.clear()
+        print(f"🧹 {self.name} context cleared")
+
+    def _operational_status(self) -> str:
+        """"operational", or "degraded" while the circuit breaker isn't closed"""
+        breaker = resilience.breaker(self.agent_key)
+        return "operational" if breaker.state == breaker.CLOSED else "degraded"
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current status of this agent"""
+        return {
+            "name": self.name,
+            "department": self.department,
+            "specialty": self.specialty,
+            "conversation_length": len(self.conversation_history),
+            "memory": self.conversation.get_status(),
+            "resilience": resilience.get_status(self.agent_key),
+            "status": self._operational_status(),
+            "ai_provider": "Anthropic Claude Sonnet 4"
+        }
@@ -0,0 +1,344 @@
+"""
+Context Attachments for Beechwood OS
+Files, specs and other agents' answers handed to an agent as context
+
+Passing context used to paste the dict's Python repr under the task,
+so a large payload (like Security AI's protocol handed to Engineering
+AI) was re-sent in full with every call. Now each large piece of
+context is an Attachment, identified by a hash of its content:
+
+- the first time a conversation sees it, it goes in as its own content
+  block, ahead of the task (and cacheable, see core.prompt_cache)
+- afterwards the task only references it by hash - the block is
+  already earlier in the conversation
+- once the turn that carried it has been summarized away, it is sent
+  again
+- if preflight trims that turn out of a request (core.tokens), the
+  attachment moves forward into the oldest turn the request keeps
+
+Usage:
+    protocol = security_ai.design_emergency_system("Beacon")
+    engineering_ai.execute_task("Plan the implementation", context={
+        "protocol": attachments.agent_output(protocol),
+        "schema": attachments.file("db/schema.sql"),
+        "deadline": "Friday",  # small values stay inline (as JSON)
+    })
+
+Attachments can also be uploaded once (attachments.add, or
+POST /v1/attachments) and then passed by ID: {"protocol": "sha256:..."}.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from core.config import config
+
+
+# Every attachment block starts with this (used to spot them in history)
+ATTACHMENT_PREFIX = "<attachment "
+
+# Attachment IDs: "sha256:" + the first 16 hex digits of the content hash
+ATTACHMENT_ID_PATTERN = re.compile(r"sha256:[0-9a-f]{16}")
+
+# Result keys an agent's answer may be under (see BaseAgent.output_key)
+AGENT_OUTPUT_KEYS = ("output", "response")
+
+
+class UnknownAttachmentError(KeyError):
+    """Context referenced an attachment ID that isn't stored"""
+    pass
+
+
+class Attachment:
+    """
+    One piece of context, identified by a hash of its content
+
+    Two attachments with the same text have the same ID, whatever
+    they are called, so the text is only ever sent once.
+    """
+
+    __slots__ = ("kind", "name", "text", "id")
+
+    def __init__(self, kind: str, name: str, text: str):
+        """
+        Args:
+            kind: What it is ("file", "spec", "agent_output", "text")
+            name: Label shown to the model (file path, agent name...)
+            text: The content
+        """
+        self.kind = kind
+        self.name = name
+        self.text = text
+        self.id = "sha256:" + hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+    def render(self) -> str:
+        """The content block text sent the first time"""
+        return f'{ATTACHMENT_PREFIX}id="{self.id}" kind="{self.kind}" name="{self.name}">\n{self.text}\n</attachment>'
+
+    def describe(self) -> Dict[str, Any]:
+        return {"id": self.id, "kind": self.kind, "name": self.name, "chars": len(self.text)}
+
+
+def file(path: Union[str, Path], text: Optional[str] = None) -> Attachment:
+    """
+    A source file or document
+
+    Args:
+        path: File path (read from disk unless text is given)
+        text: The file's content, if already loaded
+    """
+    if text is None:
+        text = Path(path).read_text(encoding="utf-8")
+    return Attachment("file", str(path), text)
+
+
+def spec(name: str, text: str) -> Attachment:
+    """A requirements document, protocol or other specification"""
+    return Attachment("spec", name, text)
+
+
+def agent_output(result: Union[Dict[str, Any], str], name: Optional[str] = None) -> Attachment:
+    """
+    Another agent's answer (a result dictionary or its text)
+
+    Args:
+        result: What execute_task() (or a specialized method) returned
+        name: Label (defaults to the agent's name from the result)
+
+    Raises:
+        ValueError: If the result has no answer in it (e.g., it failed)
+    """
+    if isinstance(result, str):
+        return Attachment("agent_output", name or "agent", result)
+
+    if not result.get("success", True):
+        raise ValueError(f"Can't attach a failed result from {result.get('agent', 'an agent')}")
+    text = next((result[key] for key in AGENT_OUTPUT_KEYS if isinstance(result.get(key), str)), None)
+    if text is None:
+        raise ValueError("Result has no output to attach")
+    return Attachment("agent_output", name or result.get("agent", "agent"), text)
+
+
+def _looks_like_result(value: Any) -> bool:
+    """An agent result dictionary (as returned by execute_task)"""
+    return isinstance(value, dict) and "agent" in value and any(key in value for key in AGENT_OUTPUT_KEYS)
+
+
+def _attachment_blocks(message: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Attachment blocks a user message carries, by ID"""
+    content = message["content"]
+    if message["role"] != "user" or isinstance(content, str):
+        return {}
+    blocks = {}
+    for block in content:
+        text = block.get("text", "")
+        if text.startswith(ATTACHMENT_PREFIX):
+            match = ATTACHMENT_ID_PATTERN.search(text, 0, 64)
+            if match:
+                blocks[match.group()] = block
+    return blocks
+
+
+def _sent_ids(history: List[Dict[str, Any]]) -> set:
+    """IDs of attachments already sent in these messages"""
+    sent = set()
+    for message in history:
+        sent.update(_attachment_blocks(message))
+    return sent
+
+
+def _referenced_ids(messages: List[Dict[str, Any]]) -> set:
+    """IDs mentioned outside attachment blocks (tasks that say "provided earlier")"""
+    referenced = set()
+    for message in messages:
+        content = message["content"]
+        blocks = [{"text": content}] if isinstance(content, str) else content
+        for block in blocks:
+            text = block.get("text", "")
+            if not text.startswith(ATTACHMENT_PREFIX):
+                referenced.update(ATTACHMENT_ID_PATTERN.findall(text))
+    return referenced
+
+
+def carry_forward(dropped: List[Dict[str, Any]], messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Keep attachments a trimmed request still refers to
+
+    When old messages are left out of a request, attachment blocks they
+    carried that later turns reference by ID are moved into the first
+    remaining message (so "provided earlier" stays true).
+
+    Args:
+        dropped: Messages just left out of the request
+        messages: The messages still in it (the first is a user turn)
+
+    Returns:
+        The messages to send (the input lists are not changed)
+    """
+    needed = _referenced_ids(messages) - _sent_ids(messages)
+    moved: Dict[str, Dict[str, Any]] = {}
+    for message in dropped:
+        for attachment_id, block in _attachment_blocks(message).items():
+            if attachment_id in needed:
+                moved[attachment_id] = {key: value for key, value in block.items() if key != "cache_control"}
+    if not moved or not messages:
+        return messages
+
+    first = messages[0]
+    content = first["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    return [{**first, "content": list(moved.values()) + list(content)}] + messages[1:]
+
+
+class AttachmentStore:
+    """
+    Content-addressed attachment store, and the context -> content builder
+
+    Holds uploaded attachments (so requests can pass just the ID) up to
+    ATTACHMENT_STORE_MB, least recently used dropped first.
+    """
+
+    # Attachment builders, so callers only need the global instance
+    file = staticmethod(file)
+    spec = staticmethod(spec)
+    agent_output = staticmethod(agent_output)
+
+    def __init__(self):
+        """Set up an empty store"""
+        self._lock = threading.Lock()
+        self._attachments: "OrderedDict[str, Attachment]" = OrderedDict()
+        self._bytes = 0
+
+        self.stats = {
+            "sent": 0,            # attachments sent in full
+            "referenced": 0,      # attachments referenced by ID instead
+            "chars_saved": 0,     # characters not re-sent thanks to references
+        }
+
+    def add(self, attachment: Attachment) -> str:
+        """
+        Keep an attachment so later requests can pass just its ID
+
+        Returns:
+            The attachment's ID
+        """
+        limit = int(config.ATTACHMENT_STORE_MB * 1024 * 1024)
+        with self._lock:
+            if attachment.id in self._attachments:
+                self._attachments.move_to_end(attachment.id)
+                return attachment.id
+
+            self._attachments[attachment.id] = attachment
+            self._bytes += len(attachment.text)
+            while limit and self._bytes > limit and len(self._attachments) > 1:
+                _, dropped = self._attachments.popitem(last=False)
+                self._bytes -= len(dropped.text)
+        return attachment.id
+
+    def get(self, attachment_id: str) -> Optional[Attachment]:
+        """A stored attachment by ID (None if unknown or dropped)"""
+        with self._lock:
+            attachment = self._attachments.get(attachment_id)
+            if attachment is not None:
+                self._attachments.move_to_end(attachment_id)
+            return attachment
+
+    def split_context(self, context: Optional[Dict[str, Any]]) -> Tuple[List[Attachment], Dict[str, Any]]:
+        """
+        Sort context into attachments and small inline values
+
+        - Attachment objects and stored IDs ("sha256:...") are attachments
+        - agent result dictionaries become agent_output attachments
+        - strings of ATTACHMENT_MIN_CHARS or more become text attachments
+        - everything else stays inline
+
+        Returns:
+            Tuple of (attachments, inline values)
+
+        Raises:
+            UnknownAttachmentError: If an ID isn't in the store
+        """
+        found: List[Attachment] = []
+        inline: Dict[str, Any] = {}
+
+        for key, value in (context or {}).items():
+            if isinstance(value, Attachment):
+                found.append(value)
+            elif isinstance(value, str) and ATTACHMENT_ID_PATTERN.fullmatch(value):
+                attachment = self.get(value)
+                if attachment is None:
+                    raise UnknownAttachmentError(value)
+                found.append(attachment)
+            elif _looks_like_result(value):
+                found.append(agent_output(value, name=key))
+            elif isinstance(value, str) and len(value) >= config.ATTACHMENT_MIN_CHARS:
+                found.append(Attachment("text", key, value))
+            else:
+                inline[key] = value
+
+        # The same content under two keys is still one attachment
+        unique = list({attachment.id: attachment for attachment in found}.values())
+        return unique, inline
+
+    def build_content(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        history: Optional[List[Dict[str, Any]]] = None
+    ) -> Any:
+        """
+        Turn a task and its context into the content of a user turn
+
+        Args:
+            task: The task
+            context: Optional context (see split_context)
+            history: Messages the turn will follow (attachments already
+                     sent there are referenced instead of sent again)
+
+        Returns:
+            The task string when there are no attachments, otherwise
+            content blocks: new attachments first, then the task
+        """
+        found, inline = self.split_context(context)
+
+        text = task
+        if found:
+            sent = _sent_ids(history or [])
+            blocks = []
+            lines = []
+            for attachment in found:
+                if attachment.id in sent:
+                    lines.append(f"- {attachment.name} ({attachment.kind}, {attachment.id}) - provided earlier in this conversation")
+                    self.stats["referenced"] += 1
+                    self.stats["chars_saved"] += len(attachment.text)
+                else:
+                    blocks.append({"type": "text", "text": attachment.render()})
+                    lines.append(f"- {attachment.name} ({attachment.kind}, {attachment.id}) - provided above")
+                    self.stats["sent"] += 1
+            text += "\n\nAttachments:\n" + "\n".join(lines)
+
+        if inline:
+            text += "\n\nAdditional Context:\n" + json.dumps(inline, indent=2, default=str)
+
+        if not found:
+            return text
+        return blocks + [{"type": "text", "text": text}]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Stored attachments and how much re-sending was avoided"""
+        with self._lock:
+            return {
+                "stored": len(self._attachments),
+                "stored_bytes": self._bytes,
+                **self.stats,
+            }
+
+
+# Create the global attachment store
+attachments = AttachmentStore()
@@ -0,0 +1,359 @@
+"""
+Bulk Mode for Beechwood OS
+Runs large non-interactive jobs through the Message Batches API
+
+Reviewing every file or threat-modelling a backlog of features doesn't
+need answers in seconds. A batch job packs all of those tasks into one
+submission that Anthropic processes in the background (usually well
+within an hour) at half the price of regular calls.
+
+The job's state (tasks, batch id, collected results) is saved to disk
+after every step, so a crashed script can pick up where it left off:
+
+    job = BatchJob.resume("review-2025-01-15")
+    results = job.wait()
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.config import config
+from core.registry import agent_registry
+from core.resilience import resilience
+
+
+_CUSTOM_ID_PATTERN = re.compile(r"^[a-zA-Z0-9_-]{1,64}$")
+
+# Largest batch the API accepts
+MAX_BATCH_REQUESTS = 100000
+
+
+def _batches(client: Any) -> Any:
+    """The batches resource (GA in newer SDKs, under beta in older ones)"""
+    batches = getattr(client.messages, "batches", None)
+    return batches if batches is not None else client.beta.messages.batches
+
+
+class BatchJob:
+    """
+    A set of agent tasks submitted as one message batch
+
+    Usage:
+        job = BatchJob("frontend-review")
+        job.add_method("engineering", "review_code", code, "App.tsx")
+        job.add("security", "Threat model the check-in feature")
+        job.submit()
+        results = job.wait()   # {custom_id: result dictionary}
+    """
+
+    def __init__(
+        self,
+        job_id: Optional[str] = None,
+        client: Any = None,
+        state_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            job_id: Name for the job (also its state file name)
+            client: Anthropic client to use (default: the shared client)
+            state_dir: Where job state is saved (default: BATCH_STATE_DIR)
+        """
+        self.job_id = job_id or f"batch-{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self._client = client
+        self.state_dir = Path(state_dir or config.BATCH_STATE_DIR)
+
+        self.batch_id: Optional[str] = None
+        self.status = "pending"  # pending -> submitted -> ended -> collected
+        self.tasks: List[Dict[str, Any]] = []
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.request_counts: Dict[str, int] = {}
+        self.created_at = datetime.now().isoformat()
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = config.get_anthropic_client()
+        return self._client
+
+    @property
+    def state_file(self) -> Path:
+        return self.state_dir / f"{self.job_id}.json"
+
+    # ----- Building the job -----
+
+    def _agent(self, agent: Any):
+        """Resolve an agent name (or pass an agent instance through)"""
+        if not isinstance(agent, str):
+            return agent
+        found = agent_registry.get(agent)
+        if found is None:
+            raise ValueError(f"Unknown agent: {agent} (available: {agent_registry.names()})")
+        return found
+
+    def add(
+        self,
+        agent: Any,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        custom_id: Optional[str] = None
+    ) -> str:
+        """
+        Add a task for an agent
+
+        Args:
+            agent: Agent name (e.g., "engineering") or instance
+            task: The task to complete
+            context: Optional additional context
+            custom_id: ID to find the result by (default: task-00000, ...)
+
+        Returns:
+            The task's custom_id
+        """
+        if self.status != "pending":
+            raise RuntimeError(f"Job {self.job_id} was already submitted")
+
+        custom_id = custom_id or f"task-{len(self.tasks):05d}"
+        if not _CUSTOM_ID_PATTERN.match(custom_id):
+            raise ValueError(f"custom_id must be 1-64 letters, digits, '-' or '_': {custom_id!r}")
+        if any(existing["custom_id"] == custom_id for existing in self.tasks):
+            raise ValueError(f"Duplicate custom_id: {custom_id}")
+        if len(self.tasks) >= MAX_BATCH_REQUESTS:
+            raise ValueError(f"A batch holds at most {MAX_BATCH_REQUESTS} requests")
+
+        resolved = self._agent(agent)
+        params, estimate = resolved.prepare_standalone_request(task, context)
+
+        self.tasks.append({
+            "custom_id": custom_id,
+            "agent": resolved.agent_key,
+            "task": task[:200],
+            "params": params,
+            "estimated_input_tokens": estimate["input_tokens"],
+        })
+        return custom_id
+
+    def add_method(self, agent: Any, method: str, *args, custom_id: Optional[str] = None) -> str:
+        """
+        Add a specialized agent method as a task
+
+        Uses the method's prompt builder, e.g. add_method("engineering",
+        "review_code", code, filename) batches review_code(code, filename).
+        """
+        resolved = self._agent(agent)
+        builder = getattr(resolved, f"{method}_task", None)
+        if builder is None:
+            raise ValueError(f"{resolved.name} has no batchable method '{method}'")
+        return self.add(resolved, builder(*args), custom_id=custom_id)
+
+    # ----- Running the job -----
+
+    def submit(self) -> str:
+        """
+        Send the batch (does nothing if it was already submitted)
+
+        Returns:
+            The batch id
+        """
+        if self.batch_id:
+            return self.batch_id
+        if not self.tasks:
+            raise ValueError("Nothing to submit - add tasks first")
+
+        # Save first so a crash during submission still leaves the tasks on disk
+        self.save()
+
+        requests = [{"custom_id": task["custom_id"], "params": task["params"]} for task in self.tasks]
+        batch = resilience.call("batch", lambda: _batches(self.client).create(requests=requests))
+
+        self.batch_id = batch.id
+        self.status = "submitted"
+        self._update_counts(batch)
+        self.save()
+
+        print(f"📦 Batch {self.job_id} submitted: {len(self.tasks)} tasks ({self.batch_id})")
+        return self.batch_id
+
+    def _update_counts(self, batch: Any):
+        counts = batch.request_counts
+        self.request_counts = {
+            name: getattr(counts, name, 0)
+            for name in ("processing", "succeeded", "errored", "canceled", "expired")
+        }
+
+    def poll(self) -> str:
+        """
+        Check on the batch once
+
+        Returns:
+            "submitted" while processing, "ended" when results are ready,
+            "collected" once they've been downloaded
+        """
+        if self.status in ("pending", "collected", "ended"):
+            return self.status
+
+        batch = resilience.call("batch", lambda: _batches(self.client).retrieve(self.batch_id))
+        self._update_counts(batch)
+        if batch.processing_status == "ended":
+            self.status = "ended"
+        self.save()
+        return self.status
+
+    def wait(
+        self,
+        poll_interval: Optional[float] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Submit if needed, wait for the batch to finish and collect results
+
+        Args:
+            poll_interval: Seconds between status checks (default: BATCH_POLL_INTERVAL)
+            timeout: Give up waiting after this many seconds (None = no limit);
+                     the job can be resumed later
+
+        Returns:
+            {custom_id: result dictionary} for every task
+        """
+        poll_interval = config.BATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+        started = time.monotonic()
+
+        self.submit()
+        while self.poll() == "submitted":
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise TimeoutError(
+                    f"Batch {self.job_id} still processing after {timeout:g}s "
+                    f"({self.request_counts}); resume it later with BatchJob.resume('{self.job_id}')"
+                )
+            time.sleep(poll_interval)
+
+        return self.collect()
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """Download results (once) and map them back to result dictionaries"""
+        if self.status == "collected":
+            return self.results
+        if self.status != "ended":
+            raise RuntimeError(f"Batch {self.job_id} has not finished ({self.status})")
+
+        tasks = {task["custom_id"]: task for task in self.tasks}
+        for entry in _batches(self.client).results(self.batch_id):
+            task = tasks.get(entry.custom_id)
+            if task is not None:
+                self.results[entry.custom_id] = self._result(task, entry.result)
+
+        # Requests the API never reported on count as failed
+        for custom_id, task in tasks.items():
+            if custom_id not in self.results:
+                self.results[custom_id] = self._result(task, None)
+
+        self.status = "collected"
+        self.save()
+
+        succeeded = sum(1 for result in self.results.values() if result["success"])
+        print(f"✅ Batch {self.job_id} collected: {succeeded}/{len(self.tasks)} succeeded")
+        return self.results
+
+    def _result(self, task: Dict[str, Any], outcome: Any) -> Dict[str, Any]:
+        """Turn one batch outcome into the agent's usual result dictionary"""
+        agent = self._agent(task["agent"])
+
+        if outcome is not None and outcome.type == "succeeded":
+            message = outcome.message
+            text = "".join(block.text for block in message.content if block.type == "text")
+            result = agent._success_result(text, message)
+            result["estimated_input_tokens"] = task["estimated_input_tokens"]
+        else:
+            if outcome is None:
+                reason = "no result returned"
+            elif outcome.type == "errored":
+                error = getattr(outcome.error, "error", outcome.error)
+                reason = f"{getattr(error, 'type', 'error')}: {getattr(error, 'message', error)}"
+            else:
+                reason = f"request {outcome.type}"
+            result = agent._error_result(RuntimeError(f"batch {reason}"))
+
+        result["custom_id"] = task["custom_id"]
+        result["batch"] = True
+        return result
+
+    def cancel(self):
+        """Ask the API to stop processing the batch"""
+        if self.batch_id and self.status == "submitted":
+            resilience.call("batch", lambda: _batches(self.client).cancel(self.batch_id))
+            print(f"🛑 Batch {self.job_id} cancel requested")
+
+    # ----- Persistence -----
+
+    def save(self):
+        """Write the job's state to disk (atomically)"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        state = {
+            "job_id": self.job_id,
+            "created_at": self.created_at,
+            "batch_id": self.batch_id,
+            "status": self.status,
+            "request_counts": self.request_counts,
+            "tasks": self.tasks,
+            "results": self.results,
+        }
+        temporary = self.state_file.with_suffix(".tmp")
+        temporary.write_text(json.dumps(state, default=str))
+        os.replace(temporary, self.state_file)
+
+    @classmethod
+    def resume(
+        cls,
+        job_id: str,
+        client: Any = None,
+        state_dir: Optional[str] = None
+    ) -> "BatchJob":
+        """
+        Load a job saved by an earlier run
+
+        Call wait() on it to finish: an unsubmitted job is submitted, a
+        running one is polled and finished results are not downloaded twice.
+        """
+        job = cls(job_id, client=client, state_dir=state_dir)
+        if not job.state_file.exists():
+            raise FileNotFoundError(f"No saved batch job '{job_id}' in {job.state_dir}")
+
+        state = json.loads(job.state_file.read_text())
+        job.created_at = state["created_at"]
+        job.batch_id = state["batch_id"]
+        job.status = state["status"]
+        job.request_counts = state.get("request_counts", {})
+        job.tasks = state["tasks"]
+        job.results = state.get("results", {})
+        return job
+
+    @classmethod
+    def list_jobs(cls, state_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Saved jobs with their status (newest first)"""
+        directory = Path(state_dir or config.BATCH_STATE_DIR)
+        jobs = []
+        for path in sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+            state = json.loads(path.read_text())
+            jobs.append({
+                "job_id": state["job_id"],
+                "status": state["status"],
+                "tasks": len(state["tasks"]),
+                "batch_id": state["batch_id"],
+                "request_counts": state.get("request_counts", {}),
+            })
+        return jobs
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "batch_id": self.batch_id,
+            "status": self.status,
+            "tasks": len(self.tasks),
+            "request_counts": self.request_counts,
+            "results": len(self.results),
+        }
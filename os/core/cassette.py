@@ -0,0 +1,494 @@
+"""
+Record & Replay for Beechwood OS
+Re-run whole agent workflows offline, deterministically, in milliseconds
+
+A cassette is a JSON file of API request/response pairs. Plugged in as the
+HTTP transport under the shared Anthropic clients (core.clients), so every
+agent, stream and retry goes through it:
+
+- record: calls go to the API as usual and each exchange is saved -
+  including streamed chunks with their timing, and token usage
+- replay: nothing leaves the process; responses come from the cassette,
+  instantly or with the recorded timing (CASSETTE_REPLAY_SPEED)
+
+Requests are matched by method, path and body (with the "Current date"
+line ignored, so cassettes don't expire). Identical requests are served
+in the order they were recorded. API keys and request headers are never
+written to the cassette. Recordings are kept in memory and written out
+when the use() block ends, or when the process exits.
+
+Usage:
+    CASSETTE_MODE=record python test_beacon_collaboration.py
+    CASSETTE_MODE=replay python test_beacon_collaboration.py
+
+    with cassettes.use(".beechwood/cassettes/beacon.json", mode="replay"):
+        pulse.route_to_agent("security", "...")
+"""
+
+import asyncio
+import atexit
+import codecs
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import httpx
+
+from core.config import config
+
+
+# Response headers worth keeping (the rest are connection details)
+KEPT_HEADERS = ("content-type", "request-id", "retry-after", "x-should-retry")
+
+_DATE_LINE = re.compile(r"Current date: \d{4}-\d{2}-\d{2}")
+
+
+def request_key(method: str, path: str, body: bytes) -> str:
+    """Match key for a request (the date in system prompts is ignored)"""
+    text = body.decode("utf-8", errors="replace")
+    try:
+        text = json.dumps(json.loads(text), sort_keys=True)
+    except ValueError:
+        pass
+    text = _DATE_LINE.sub("Current date: <date>", text)
+    return hashlib.sha256(f"{method} {path} {text}".encode()).hexdigest()
+
+
+def _usage(interaction: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Token usage from a recorded response (plain or streamed), for readability"""
+    response = interaction["response"]
+    try:
+        if "chunks" not in response:
+            return json.loads(response["body"]).get("usage")
+
+        usage: Dict[str, Any] = {}
+        for line in "".join(chunk["data"] for chunk in response["chunks"]).splitlines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if event.get("type") == "message_start":
+                usage.update(event["message"].get("usage", {}))
+            elif event.get("type") == "message_delta":
+                usage.update(event.get("usage", {}))
+        return usage or None
+    except (ValueError, KeyError, AttributeError):
+        return None
+
+
+class CassetteMissError(Exception):
+    """A replayed request has no (more) recorded responses"""
+
+
+class Cassette:
+    """
+    A file of recorded API exchanges
+
+    Usage:
+        cassette = Cassette(".beechwood/cassettes/beacon.json")
+        interaction = cassette.next_for(key)
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.interactions: List[Dict[str, Any]] = []
+        self._served: Dict[str, int] = {}  # key -> how many replayed so far
+        self._unsaved = 0  # interactions recorded since the last save
+        self._saves_at_exit = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if self.path.exists():
+            self.interactions = json.loads(self.path.read_text()).get("interactions", [])
+
+    def save(self):
+        """Write the cassette to disk (atomically), if anything new was recorded"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_suffix(".tmp")
+            temporary.write_text(json.dumps({"version": 1, "interactions": self.interactions}, indent=1))
+            os.replace(temporary, self.path)
+            self._unsaved = 0
+
+    def add(self, interaction: Dict[str, Any]):
+        """
+        Record one exchange (in memory - see save())
+
+        Rewriting the whole file per exchange made long recordings
+        quadratic; instead the cassette is saved once, when its use()
+        block ends or at process exit.
+        """
+        interaction["usage"] = _usage(interaction)
+        with self._lock:
+            if not self._saves_at_exit:
+                atexit.register(self.save)
+                self._saves_at_exit = True
+            self.interactions.append(interaction)
+            self._unsaved += 1
+
+    def next_for(self, key: str) -> Dict[str, Any]:
+        """The next recorded response for a request (in recording order)"""
+        with self._lock:
+            matches = [interaction for interaction in self.interactions if interaction["key"] == key]
+            served = self._served.get(key, 0)
+            if served >= len(matches):
+                raise CassetteMissError(
+                    f"No recorded response left for this request in {self.path} "
+                    f"({len(matches)} recorded, key {key[:12]}) - record the cassette again"
+                )
+            self._served[key] = served + 1
+            return matches[served]
+
+    def rewind(self):
+        """Serve recordings from the start again"""
+        with self._lock:
+            self._served = {}
+
+
+def _request_record(request: httpx.Request, body: bytes) -> Dict[str, Any]:
+    try:
+        parsed: Any = json.loads(body) if body else None
+    except ValueError:
+        parsed = body.decode("utf-8", errors="replace")
+    return {"method": request.method, "path": request.url.path, "body": parsed}
+
+
+def _kept_headers(response: httpx.Response) -> Dict[str, str]:
+    return {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+
+
+def _is_stream(response: httpx.Response) -> bool:
+    return response.headers.get("content-type", "").startswith("text/event-stream")
+
+
+# ----- Recording -----
+
+class _RecordingStream(httpx.SyncByteStream):
+    """Passes streamed bytes through while noting each chunk and its timing"""
+
+    def __init__(self, inner: Any, on_close, started: float):
+        self._inner = inner
+        self._on_close = on_close
+        self._started = started  # when the request was sent
+        # Incremental, so a character split across chunks decodes cleanly
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.chunks: List[Dict[str, Any]] = []
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._inner:
+            self.chunks.append({"t": round(time.monotonic() - self._started, 4), "data": self._decoder.decode(chunk)})
+            yield chunk
+
+    def close(self):
+        self._inner.close()
+        self._on_close(self.chunks)
+
+
+class _AsyncRecordingStream(httpx.AsyncByteStream):
+    def __init__(self, inner: Any, on_close, started: float):
+        self._inner = inner
+        self._on_close = on_close
+        self._started = started
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.chunks: List[Dict[str, Any]] = []
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._inner:
+            self.chunks.append({"t": round(time.monotonic() - self._started, 4), "data": self._decoder.decode(chunk)})
+            yield chunk
+
+    async def aclose(self):
+        await self._inner.aclose()
+        self._on_close(self.chunks)
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Sends requests on and saves every exchange to the cassette"""
+
+    def __init__(self, cassette: Cassette, inner: Optional[httpx.BaseTransport] = None):
+        self.cassette = cassette
+        self.inner = inner or httpx.HTTPTransport()
+
+    def _prepare(self, request: httpx.Request) -> bytes:
+        # Plain (uncompressed) bodies so recorded chunks are readable text
+        request.headers["accept-encoding"] = "identity"
+        return request.read()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        body = self._prepare(request)
+        started = time.monotonic()
+        response = self.inner.handle_request(request)
+        elapsed = round(time.monotonic() - started, 4)
+        record = {"key": request_key(request.method, request.url.path, body), "request": _request_record(request, body)}
+
+        if _is_stream(response):
+            def save(chunks):
+                record["response"] = {
+                    "status": response.status_code, "headers": _kept_headers(response),
+                    "elapsed": elapsed, "chunks": chunks,
+                }
+                self.cassette.add(record)
+
+            return httpx.Response(
+                response.status_code, headers=response.headers,
+                stream=_RecordingStream(response.stream, save, started), extensions=response.extensions,
+            )
+
+        content = response.read()
+        record["response"] = {
+            "status": response.status_code, "headers": _kept_headers(response),
+            "elapsed": elapsed, "body": content.decode("utf-8"),
+        }
+        self.cassette.add(record)
+        return httpx.Response(response.status_code, headers=response.headers, content=content,
+                              extensions=response.extensions)
+
+    def close(self):
+        self.inner.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """Async version of RecordingTransport"""
+
+    def __init__(self, cassette: Cassette, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.cassette = cassette
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.headers["accept-encoding"] = "identity"
+        body = await request.aread()
+        started = time.monotonic()
+        response = await self.inner.handle_async_request(request)
+        elapsed = round(time.monotonic() - started, 4)
+        record = {"key": request_key(request.method, request.url.path, body), "request": _request_record(request, body)}
+
+        if _is_stream(response):
+            def save(chunks):
+                record["response"] = {
+                    "status": response.status_code, "headers": _kept_headers(response),
+                    "elapsed": elapsed, "chunks": chunks,
+                }
+                self.cassette.add(record)
+
+            return httpx.Response(
+                response.status_code, headers=response.headers,
+                stream=_AsyncRecordingStream(response.stream, save, started), extensions=response.extensions,
+            )
+
+        content = await response.aread()
+        record["response"] = {
+            "status": response.status_code, "headers": _kept_headers(response),
+            "elapsed": elapsed, "body": content.decode("utf-8"),
+        }
+        self.cassette.add(record)
+        return httpx.Response(response.status_code, headers=response.headers, content=content,
+                              extensions=response.extensions)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+# ----- Replaying -----
+
+def _miss_response(error: CassetteMissError) -> httpx.Response:
+    """A non-retryable API error, so a miss fails fast instead of being retried"""
+    return httpx.Response(
+        404,
+        headers={"x-should-retry": "false"},
+        json={"type": "error", "error": {"type": "not_found_error", "message": str(error)}},
+    )
+
+
+class _ReplayStream(httpx.SyncByteStream):
+    def __init__(self, chunks: List[Dict[str, Any]], speed: float, offset: float):
+        self._chunks = chunks
+        self._speed = speed
+        self._offset = offset
+
+    def __iter__(self) -> Iterator[bytes]:
+        previous = self._offset
+        for chunk in self._chunks:
+            if self._speed:
+                time.sleep(max(0.0, chunk["t"] - previous) * self._speed)
+            previous = chunk["t"]
+            yield chunk["data"].encode("utf-8")
+
+
+class _AsyncReplayStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: List[Dict[str, Any]], speed: float, offset: float):
+        self._chunks = chunks
+        self._speed = speed
+        self._offset = offset
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        previous = self._offset
+        for chunk in self._chunks:
+            if self._speed:
+                await asyncio.sleep(max(0.0, chunk["t"] - previous) * self._speed)
+            previous = chunk["t"]
+            yield chunk["data"].encode("utf-8")
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """Serves recorded responses; never touches the network"""
+
+    def __init__(self, cassette: Cassette, speed: float = 0.0):
+        """
+        Args:
+            cassette: Recordings to serve
+            speed: 0 = instant, 1.0 = recorded timing, 0.5 = twice as fast
+        """
+        self.cassette = cassette
+        self.speed = speed
+
+    def _lookup(self, request: httpx.Request, body: bytes) -> Dict[str, Any]:
+        return self.cassette.next_for(request_key(request.method, request.url.path, body))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            recorded = self._lookup(request, request.read())["response"]
+        except CassetteMissError as e:
+            return _miss_response(e)
+
+        if self.speed:
+            time.sleep(recorded["elapsed"] * self.speed)
+        if "chunks" in recorded:
+            stream = _ReplayStream(recorded["chunks"], self.speed, recorded["elapsed"])
+            return httpx.Response(recorded["status"], headers=recorded["headers"], stream=stream)
+        return httpx.Response(recorded["status"], headers=recorded["headers"], content=recorded["body"].encode("utf-8"))
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """Async version of ReplayTransport"""
+
+    def __init__(self, cassette: Cassette, speed: float = 0.0):
+        self.cassette = cassette
+        self.speed = speed
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            key = request_key(request.method, request.url.path, await request.aread())
+            recorded = self.cassette.next_for(key)["response"]
+        except CassetteMissError as e:
+            return _miss_response(e)
+
+        if self.speed:
+            await asyncio.sleep(recorded["elapsed"] * self.speed)
+        if "chunks" in recorded:
+            stream = _AsyncReplayStream(recorded["chunks"], self.speed, recorded["elapsed"])
+            return httpx.Response(recorded["status"], headers=recorded["headers"], stream=stream)
+        return httpx.Response(recorded["status"], headers=recorded["headers"], content=recorded["body"].encode("utf-8"))
+
+
+# ----- Plugging into the shared clients -----
+
+class CassetteManager:
+    """
+    Decides which transport the shared Anthropic clients use
+
+    Reads CASSETTE_MODE / CASSETTE_PATH / CASSETTE_REPLAY_SPEED on first
+    use; use() switches cassettes from code (e.g., per test).
+    """
+
+    MODES = ("off", "record", "replay")
+
+    def __init__(self):
+        self._configured = False
+        self.mode = "off"
+        self.speed = 0.0
+        self.cassette: Optional[Cassette] = None
+        self._inner: Any = None  # transport recordings are sent through (tests)
+        self._async_inner: Any = None
+
+    def _configure(self):
+        if self._configured:
+            return
+        self._configured = True
+        mode = config.CASSETTE_MODE.lower()
+        if mode not in self.MODES:
+            raise ValueError(f"CASSETTE_MODE must be one of {self.MODES}, got {mode!r}")
+        self.mode = mode
+        self.speed = config.CASSETTE_REPLAY_SPEED
+        if mode != "off":
+            self.cassette = Cassette(config.CASSETTE_PATH)
+            print(f"📼 Cassette {mode}: {config.CASSETTE_PATH}")
+
+    @property
+    def replaying(self) -> bool:
+        self._configure()
+        return self.mode == "replay"
+
+    def transport(self, limits: Optional[httpx.Limits] = None) -> Optional[httpx.BaseTransport]:
+        """Transport for a new sync client (None = httpx's default)"""
+        self._configure()
+        if self.mode == "record":
+            return RecordingTransport(self.cassette, self._inner or httpx.HTTPTransport(limits=limits))
+        if self.mode == "replay":
+            return ReplayTransport(self.cassette, self.speed)
+        return None
+
+    def async_transport(self, limits: Optional[httpx.Limits] = None) -> Optional[httpx.AsyncBaseTransport]:
+        """Transport for a new async client (None = httpx's default)"""
+        self._configure()
+        if self.mode == "record":
+            return AsyncRecordingTransport(self.cassette, self._async_inner or httpx.AsyncHTTPTransport(limits=limits))
+        if self.mode == "replay":
+            return AsyncReplayTransport(self.cassette, self.speed)
+        return None
+
+    @contextmanager
+    def use(
+        self,
+        path: str,
+        mode: str = "replay",
+        speed: float = 0.0,
+        inner: Any = None,
+        async_inner: Any = None
+    ) -> Iterator[Cassette]:
+        """
+        Record to or replay from a cassette inside a with block
+
+        Args:
+            path: Cassette file
+            mode: "record" or "replay"
+            speed: Replay timing (0 = instant, 1.0 = as recorded)
+            inner / async_inner: Transports to record through (default: the network)
+        """
+        from core.clients import client_registry
+
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}, got {mode!r}")
+
+        self._configure()
+        saved = (self.mode, self.speed, self.cassette, self._inner, self._async_inner)
+        self.mode, self.speed, self.cassette = mode, speed, Cassette(path)
+        self._inner, self._async_inner = inner, async_inner
+        client_registry.close()  # rebuild clients on the new transport
+        cassette = self.cassette
+        try:
+            yield cassette
+        finally:
+            self.mode, self.speed, self.cassette, self._inner, self._async_inner = saved
+            client_registry.close()  # finishes open streams, so they are recorded too
+            cassette.save()
+
+    def get_status(self) -> Dict[str, Any]:
+        self._configure()
+        return {
+            "mode": self.mode,
+            "path": str(self.cassette.path) if self.cassette else None,
+            "interactions": len(self.cassette.interactions) if self.cassette else 0,
+            "replay_speed": self.speed,
+        }
+
+
+# Create the global cassette manager (off unless CASSETTE_MODE is set)
+cassettes = CassetteManager()
@@ -0,0 +1,291 @@
+"""
+Client Registry for Beechwood OS
+Keeps ONE pooled, keep-alive Anthropic connection for the whole process
+
+Without this, PULSE and every AI employee built their own client, which meant
+their own connection pool and their own TLS handshakes. Now they all share.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Dict, Any, Optional
+
+from core.config import config
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of Anthropic clients
+
+    - One httpx connection pool (tunable size + keep-alive)
+    - One base Anthropic client built on that pool
+    - Lightweight per-agent views that only change the timeout
+    - Optional pre-warming at startup so the first request skips the TLS
+      handshake (the sync pool and the event loop's async pool)
+    - Async clients for event-loop callers (one pool per running loop,
+      because async connections can't be shared between loops)
+    - A record/replay transport underneath when a cassette is active
+      (see core.cassette)
+    - Every response's rate-limit headers are passed to the shared
+      rate limiter, so it learns the account's limits
+    """
+
+    def __init__(self):
+        """Set up an empty registry (clients are built on first use)"""
+        self._lock = threading.Lock()
+        self._http_client = None  # httpx.Client, created on first use
+        self._client = None
+        self._agent_clients: Dict[str, Any] = {}
+        self._warmed_connections = 0
+        self._async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._async_pools: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def _limits(self):
+        """Connection pool limits from config"""
+        import httpx
+        return httpx.Limits(
+            max_connections=config.ANTHROPIC_MAX_CONNECTIONS,
+            max_keepalive_connections=config.ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.ANTHROPIC_KEEPALIVE_EXPIRY,
+        )
+
+    def _timeout(self, seconds: float):
+        """Request timeout with a short connect timeout"""
+        import httpx
+        return httpx.Timeout(seconds, connect=config.ANTHROPIC_CONNECT_TIMEOUT)
+
+    def _observe_response(self, response):
+        """httpx response hook: let the rate limiter read the limit headers"""
+        from core.rate_limiter import rate_limiter
+        rate_limiter.observe_headers(response.headers)
+
+    async def _observe_response_async(self, response):
+        """Async version of _observe_response() (httpx needs a coroutine here)"""
+        self._observe_response(response)
+
+    def _build_client(self):
+        """Create the shared HTTP pool and the base Anthropic client"""
+        import httpx
+        from anthropic import Anthropic
+        from core.cassette import cassettes
+
+        config.warn_if_incomplete()
+
+        self._http_client = httpx.Client(
+            limits=self._limits(),
+            timeout=self._timeout(config.ANTHROPIC_TIMEOUT),
+            transport=cassettes.transport(self._limits()),
+            event_hooks={"response": [self._observe_response]},
+        )
+        self._client = Anthropic(
+            api_key=self._api_key(),
+            base_url=config.ANTHROPIC_BASE_URL or None,
+            http_client=self._http_client,
+            timeout=self._timeout(config.ANTHROPIC_TIMEOUT),
+            max_retries=0,  # retries are handled by core.resilience
+        )
+
+    def _should_prewarm(self) -> bool:
+        """Pre-warming is on (and there's a real pool - not a cassette)"""
+        from core.cassette import cassettes
+        return config.ANTHROPIC_PREWARM_CONNECTIONS > 0 and cassettes.mode == "off"
+
+    def warm_up(self) -> bool:
+        """
+        Start warming the sync pool at startup, if ANTHROPIC_PREWARM_CONNECTIONS > 0
+
+        Runs in the background so startup isn't blocked. Event-loop
+        callers should also await prewarm_async() on their loop.
+
+        Returns:
+            True if warming was started
+        """
+        if not self._should_prewarm():
+            return False
+        threading.Thread(
+            target=self.prewarm,
+            args=(config.ANTHROPIC_PREWARM_CONNECTIONS,),
+            daemon=True,
+        ).start()
+        return True
+
+    def _api_key(self) -> str:
+        """The API key (replaying a cassette works without one)"""
+        from core.cassette import cassettes
+        if not config.ANTHROPIC_API_KEY and cassettes.replaying:
+            return "cassette-replay"
+        return config.ANTHROPIC_API_KEY
+
+    def get_client(self, agent: Optional[str] = None):
+        """
+        Get the shared Anthropic client
+
+        Args:
+            agent: Optional agent name (e.g., "pulse", "engineering").
+                   The returned client uses that agent's timeout but the
+                   same underlying connection pool.
+
+        Returns:
+            An Anthropic client
+        """
+        with self._lock:
+            if self._client is None:
+                self._build_client()
+
+            if not agent:
+                return self._client
+
+            key = agent.lower()
+            if key not in self._agent_clients:
+                # with_options() copies the client but re-uses its http pool
+                self._agent_clients[key] = self._client.with_options(
+                    timeout=self._timeout(config.get_agent_timeout(key))
+                )
+            return self._agent_clients[key]
+
+    def get_async_client(self, agent: Optional[str] = None):
+        """
+        Get the shared AsyncAnthropic client for the running event loop
+
+        Args:
+            agent: Optional agent name; applies that agent's timeout
+
+        Returns:
+            An AsyncAnthropic client
+        """
+        import httpx
+        from anthropic import AsyncAnthropic
+        from core.cassette import cassettes
+
+        loop = asyncio.get_running_loop()
+        key = agent.lower() if agent else ""
+
+        with self._lock:
+            clients = self._async_clients.get(loop)
+            if clients is None:
+                config.warn_if_incomplete()
+                http_client = httpx.AsyncClient(
+                    limits=self._limits(),
+                    timeout=self._timeout(config.ANTHROPIC_TIMEOUT),
+                    transport=cassettes.async_transport(self._limits()),
+                    event_hooks={"response": [self._observe_response_async]},
+                )
+                clients = {
+                    "": AsyncAnthropic(
+                        api_key=self._api_key(),
+                        base_url=config.ANTHROPIC_BASE_URL or None,
+                        http_client=http_client,
+                        timeout=self._timeout(config.ANTHROPIC_TIMEOUT),
+                        max_retries=0,
+                    )
+                }
+                self._async_clients[loop] = clients
+                self._async_pools[loop] = http_client
+
+            if key not in clients:
+                clients[key] = clients[""].with_options(
+                    timeout=self._timeout(config.get_agent_timeout(key))
+                )
+            return clients[key]
+
+    def prewarm(self, connections: Optional[int] = None) -> int:
+        """
+        Open connections to the API ahead of time
+
+        Sends cheap concurrent HEAD requests so the pool holds live TLS
+        connections before the first real request arrives.
+
+        Args:
+            connections: How many connections to open (defaults to config)
+
+        Returns:
+            Number of connections that were opened successfully
+        """
+        client = self.get_client()
+        count = connections or config.ANTHROPIC_PREWARM_CONNECTIONS or 1
+        count = min(count, config.ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS)
+        url = str(client.base_url)
+
+        opened = []
+
+        import httpx
+
+        def _open():
+            try:
+                self._http_client.head(url)
+                opened.append(1)
+            except httpx.HTTPError:
+                pass
+
+        threads = [threading.Thread(target=_open, daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._warmed_connections += len(opened)
+        return len(opened)
+
+    async def prewarm_async(self, connections: Optional[int] = None) -> int:
+        """
+        Open connections in the running event loop's async pool
+
+        Async version of prewarm(); does nothing unless
+        ANTHROPIC_PREWARM_CONNECTIONS > 0 or a count is given.
+
+        Args:
+            connections: How many connections to open (defaults to config)
+
+        Returns:
+            Number of connections that were opened successfully
+        """
+        import httpx
+
+        count = connections or (config.ANTHROPIC_PREWARM_CONNECTIONS if self._should_prewarm() else 0)
+        if not count:
+            return 0
+        count = min(count, config.ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS)
+
+        client = self.get_async_client()
+        http_client = self._async_pools[asyncio.get_running_loop()]
+        url = str(client.base_url)
+
+        async def _open() -> int:
+            try:
+                await http_client.head(url)
+                return 1
+            except httpx.HTTPError:
+                return 0
+
+        opened = sum(await asyncio.gather(*(_open() for _ in range(count))))
+        self._warmed_connections += opened
+        return opened
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current pool settings and usage"""
+        return {
+            "initialized": self._client is not None,
+            "max_connections": config.ANTHROPIC_MAX_CONNECTIONS,
+            "max_keepalive_connections": config.ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry": config.ANTHROPIC_KEEPALIVE_EXPIRY,
+            "agent_clients": sorted(self._agent_clients.keys()),
+            "async_event_loops": len(self._async_clients),
+            "warmed_connections": self._warmed_connections,
+        }
+
+    def close(self):
+        """Close the shared connection pool"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            self._client = None
+            self._agent_clients = {}
+            self._async_clients = weakref.WeakKeyDictionary()
+            self._async_pools = weakref.WeakKeyDictionary()
+            self._warmed_connections = 0
+
+
+# Create a global client registry
+client_registry = ClientRegistry()
@@ -0,0 +1,259 @@
+"""
+Repository Code Review for Beechwood OS
+Reviews a whole codebase with Engineering AI - and only what changed
+
+Each file is content-hashed. The on-disk index remembers the hash and the
+review settings (model, prompts) each review was made with, so a re-run
+only sends files that are new or edited (or everything, if the settings
+changed). Files are reviewed in parallel, each as a standalone request,
+so reviews don't pile up in Engineering AI's conversation memory.
+
+Run from the os/ directory:
+    python -m core.code_review ../apps/beacon/frontend
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from core.config import config
+
+
+# Source files worth reviewing (by extension)
+DEFAULT_EXTENSIONS = (
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs",
+    ".css", ".scss", ".html", ".sql", ".sh", ".go", ".rs", ".java",
+)
+
+# Directories that hold generated or third-party code
+SKIPPED_DIRECTORIES = {
+    ".git", ".beechwood", "node_modules", "__pycache__", ".next", "dist",
+    "build", "coverage", ".venv", "venv", ".pytest_cache", ".mypy_cache",
+}
+
+# Save the index after this many finished reviews (so a crash loses little)
+SAVE_EVERY = 10
+
+_DATE_LINE = re.compile(r"Current date: .*")
+
+
+def file_hash(content: bytes) -> str:
+    """Content hash of a file"""
+    return hashlib.sha256(content).hexdigest()
+
+
+class RepositoryReview:
+    """
+    Incremental, parallel review of a directory tree
+
+    Usage:
+        review = RepositoryReview("../apps/beacon/frontend")
+        summary = review.run()
+        summary["results"]["components/AddContactModal.tsx"]["review"]
+    """
+
+    def __init__(
+        self,
+        root: str,
+        agent: Any = None,
+        extensions: Sequence[str] = DEFAULT_EXTENSIONS,
+        index_path: Optional[str] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        """
+        Args:
+            root: Directory to review
+            agent: Reviewer (default: Engineering AI)
+            extensions: File extensions to include
+            index_path: Where the review index is stored (default: one
+                        file per root in REVIEW_INDEX_DIR)
+            max_concurrency: Reviews running at once (default: REVIEW_MAX_CONCURRENCY)
+        """
+        self.root = Path(root).resolve()
+        self._agent = agent
+        self.extensions = tuple(extensions)
+        self.max_concurrency = max_concurrency or config.REVIEW_MAX_CONCURRENCY
+
+        if index_path is None:
+            slug = re.sub(r"[^A-Za-z0-9]+", "-", self.root.name).strip("-") or "root"
+            root_id = hashlib.sha256(str(self.root).encode()).hexdigest()[:8]
+            index_path = Path(config.REVIEW_INDEX_DIR) / f"{slug}-{root_id}.json"
+        self.index_path = Path(index_path)
+
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def agent(self):
+        if self._agent is None:
+            from agents.engineering_ai import get_engineering_ai
+            self._agent = get_engineering_ai()
+        return self._agent
+
+    def review_fingerprint(self) -> str:
+        """
+        Hash of everything besides the file that shapes a review
+
+        Model, max_tokens, system prompt and review prompt. The date line
+        in the system prompt is ignored so reviews don't expire daily.
+        """
+        agent = self.agent
+        settings = {
+            "model": agent.model,
+            "max_tokens": agent.max_tokens,
+            "system": _DATE_LINE.sub("", agent.system_prompt),
+            "prompt": agent.review_code_task("{code}", "{filename}"),
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+    def walk(self) -> Iterator[Path]:
+        """Reviewable files under root (sorted, generated code skipped)"""
+        for directory, subdirectories, files in os.walk(self.root):
+            subdirectories[:] = sorted(d for d in subdirectories if d not in SKIPPED_DIRECTORIES)
+            for name in sorted(files):
+                if name.endswith(self.extensions):
+                    yield Path(directory) / name
+
+    def _read(self, path: Path) -> Optional[bytes]:
+        """File content, or None if it's too big or not text"""
+        if path.stat().st_size > config.REVIEW_MAX_FILE_BYTES:
+            return None
+        content = path.read_bytes()
+        if b"\0" in content[:1024]:
+            return None
+        return content
+
+    def load_index(self):
+        if self.index_path.exists():
+            state = json.loads(self.index_path.read_text())
+            self.index = state.get("files", {})
+
+    def save_index(self):
+        """Write the index to disk (atomically)"""
+        with self._lock:
+            state = {
+                "root": str(self.root),
+                "updated_at": datetime.now().isoformat(),
+                "files": self.index,
+            }
+            payload = json.dumps(state, indent=1)
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.index_path.with_suffix(".tmp")
+        temporary.write_text(payload)
+        os.replace(temporary, self.index_path)
+
+    def _review_file(self, relative: str, content: bytes, digest: str, fingerprint: str) -> Dict[str, Any]:
+        """Review one file and record the outcome in the index"""
+        code = content.decode("utf-8", errors="replace")
+        result = self.agent.execute_standalone(self.agent.review_code_task(code, relative))
+
+        entry = {
+            "hash": digest,
+            "params": fingerprint,
+            "success": result["success"],
+            "review": result.get("output"),
+            "tokens_used": result.get("tokens_used", 0),
+            "reviewed_at": datetime.now().isoformat(),
+        }
+        with self._lock:
+            self.index[relative] = entry
+        return entry
+
+    def run(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Review every new or changed file
+
+        Args:
+            force: Review everything, ignoring the index
+
+        Returns:
+            Summary with counts, duration and results per file
+        """
+        started = time.monotonic()
+        self.load_index()
+        fingerprint = self.review_fingerprint()
+
+        seen: List[str] = []
+        pending = []
+        skipped = oversized = 0
+
+        for path in self.walk():
+            relative = path.relative_to(self.root).as_posix()
+            content = self._read(path)
+            if content is None:
+                oversized += 1
+                continue
+            seen.append(relative)
+
+            digest = file_hash(content)
+            entry = self.index.get(relative)
+            if (not force and entry and entry["success"]
+                    and entry["hash"] == digest and entry["params"] == fingerprint):
+                skipped += 1
+                continue
+            pending.append((relative, content, digest))
+
+        # Forget files that no longer exist
+        current = set(seen)
+        removed = [relative for relative in self.index if relative not in current]
+        for relative in removed:
+            del self.index[relative]
+
+        print(f"🔍 Reviewing {len(pending)} of {len(seen)} files in {self.root} "
+              f"({skipped} unchanged, {len(removed)} removed)")
+
+        failed = 0
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                futures = {
+                    executor.submit(self._review_file, relative, content, digest, fingerprint): relative
+                    for relative, content, digest in pending
+                }
+                for finished, future in enumerate(as_completed(futures), start=1):
+                    entry = future.result()
+                    if not entry["success"]:
+                        failed += 1
+                    print(f"   {'✅' if entry['success'] else '❌'} [{finished}/{len(pending)}] {futures[future]}")
+                    if finished % SAVE_EVERY == 0:
+                        self.save_index()
+
+        self.save_index()
+        duration = time.monotonic() - started
+        print(f"✅ Review finished in {duration:.1f}s: {len(pending) - failed} reviewed, "
+              f"{skipped} skipped, {failed} failed")
+
+        return {
+            "root": str(self.root),
+            "files": len(seen),
+            "reviewed": len(pending) - failed,
+            "skipped": skipped,
+            "failed": failed,
+            "removed": len(removed),
+            "too_large_or_binary": oversized,
+            "duration": round(duration, 2),
+            "index_path": str(self.index_path),
+            "results": dict(self.index),
+        }
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Review a directory with Engineering AI (only changed files)")
+    parser.add_argument("root", help="Directory to review")
+    parser.add_argument("--force", action="store_true", help="Review every file, ignoring the index")
+    parser.add_argument("--concurrency", type=int, default=None, help="Reviews running at once")
+    args = parser.parse_args(argv)
+
+    RepositoryReview(args.root, max_concurrency=args.concurrency).run(force=args.force)
+
+
+if __name__ == "__main__":
+    main()
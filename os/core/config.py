@@ -1,14 +1,61 @@
 """
 Configuration Manager for Beechwood OS
 Loads environment variables and provides them to the system
+
+Importing this module has no side effects: the .env file is only read the
+first time a setting is looked at, and nothing is validated or printed
+until a client is actually needed.
 """
 
 import os
-from dotenv import load_dotenv
-from typing import Optional
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+_env_lock = threading.Lock()
+_env_loaded = False
+
+
+def load_environment():
+    """Load environment variables from the .env file (once per process)"""
+    global _env_loaded
+    if _env_loaded:
+        return
+    
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _env_loaded = True
+
+
+def _flag(value: str) -> bool:
+    """Parse a "True"/"False" environment value"""
+    return value == "True"
+
+
+class Setting:
+    """
+    A configuration value read from the environment on first access
+    
+    Works like a plain class attribute: Config.NAME and config.NAME both
+    return the parsed value, and assigning config.NAME = ... overrides it.
+    """
+    
+    _UNSET = object()
+    
+    def __init__(self, env_var: str, default: str, cast: Callable[[str], Any] = str):
+        self.env_var = env_var
+        self.default = default
+        self.cast = cast
+        self._value = self._UNSET
+    
+    def __get__(self, obj, owner=None):
+        if self._value is self._UNSET:
+            load_environment()
+            self._value = self.cast(os.getenv(self.env_var, self.default))
+        return self._value
 
-# Load environment variables from .env file
-load_dotenv()
 
 class Config:
     """
@@ -17,26 +64,145 @@ class Config:
     """
     
     # Supabase Configuration
-    SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
-    SUPABASE_ANON_KEY: str = os.getenv("SUPABASE_ANON_KEY", "")
-    SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY", "")
+    SUPABASE_URL: str = Setting("SUPABASE_URL", "")
+    SUPABASE_ANON_KEY: str = Setting("SUPABASE_ANON_KEY", "")
+    SUPABASE_SERVICE_KEY: str = Setting("SUPABASE_SERVICE_KEY", "")
     
     # Upstash Redis Configuration
-    UPSTASH_REDIS_REST_URL: str = os.getenv("UPSTASH_REDIS_REST_URL", "")
-    UPSTASH_REDIS_REST_TOKEN: str = os.getenv("UPSTASH_REDIS_REST_TOKEN", "")
+    UPSTASH_REDIS_REST_URL: str = Setting("UPSTASH_REDIS_REST_URL", "")
+    UPSTASH_REDIS_REST_TOKEN: str = Setting("UPSTASH_REDIS_REST_TOKEN", "")
+    REDIS_URL: str = Setting("REDIS_URL", "")  # e.g. a local Redis for development
     
     # AI Provider Configuration
-    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
-    ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
+    OPENAI_API_KEY: str = Setting("OPENAI_API_KEY", "")
+    ANTHROPIC_API_KEY: str = Setting("ANTHROPIC_API_KEY", "")
+    ANTHROPIC_BASE_URL: str = Setting("ANTHROPIC_BASE_URL", "")  # empty = api.anthropic.com
+    
+    # Anthropic Connection Pool (shared by PULSE and every AI employee)
+    ANTHROPIC_MAX_CONNECTIONS: int = Setting("ANTHROPIC_MAX_CONNECTIONS", "100", int)
+    ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS: int = Setting("ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS", "20", int)
+    ANTHROPIC_KEEPALIVE_EXPIRY: float = Setting("ANTHROPIC_KEEPALIVE_EXPIRY", "60", float)
+    ANTHROPIC_CONNECT_TIMEOUT: float = Setting("ANTHROPIC_CONNECT_TIMEOUT", "10", float)
+    ANTHROPIC_TIMEOUT: float = Setting("ANTHROPIC_TIMEOUT", "600", float)
+    ANTHROPIC_PREWARM_CONNECTIONS: int = Setting("ANTHROPIC_PREWARM_CONNECTIONS", "0", int)
+    
+    # Per-agent request timeouts in seconds
+    # Override with ANTHROPIC_TIMEOUT_<AGENT>, e.g. ANTHROPIC_TIMEOUT_PULSE=60
+    AGENT_TIMEOUTS: Dict[str, float] = {
+        "pulse": 120.0,
+        "engineering": 600.0,
+        "security": 600.0,
+    }
+    
+    # Prompt caching (cache system prompts + conversation prefix)
+    PROMPT_CACHING: bool = Setting("PROMPT_CACHING", "True", _flag)
+    
+    # Conversation memory (verbatim history budget + rolling summary)
+    # Override per agent with HISTORY_TOKEN_BUDGET_<AGENT>; 0 = unlimited
+    HISTORY_TOKEN_BUDGET: int = Setting("HISTORY_TOKEN_BUDGET", "24000", int)
+    HISTORY_TOKEN_BUDGETS: Dict[str, int] = {
+        "pulse": 16000,
+        "engineering": 32000,
+        "security": 32000,
+    }
+    HISTORY_SUMMARY_MODEL: str = Setting("HISTORY_SUMMARY_MODEL", "claude-3-5-haiku-20241022")
+    HISTORY_SUMMARY_MAX_TOKENS: int = Setting("HISTORY_SUMMARY_MAX_TOKENS", "1024", int)
+    HISTORY_SUMMARY_BACKGROUND: bool = Setting("HISTORY_SUMMARY_BACKGROUND", "True", _flag)
+    
+    # Context attachments (core.attachments): sent once per conversation, then referenced by hash
+    ATTACHMENT_MIN_CHARS: int = Setting("ATTACHMENT_MIN_CHARS", "1000", int)  # longer context strings become attachments
+    ATTACHMENT_STORE_MB: float = Setting("ATTACHMENT_STORE_MB", "64", float)  # uploaded attachments kept in memory
+    
+    # Request preflight (local token estimate before every call)
+    PREFLIGHT_SAFETY_MARGIN: float = Setting("PREFLIGHT_SAFETY_MARGIN", "1.1", float)
+    
+    # Response cache (identical requests are answered from cache)
+    RESPONSE_CACHE_ENABLED: bool = Setting("RESPONSE_CACHE_ENABLED", "True", _flag)
+    RESPONSE_CACHE_TTL: int = Setting("RESPONSE_CACHE_TTL", "86400", int)  # seconds, 0 = no expiry
+    RESPONSE_CACHE_MAX_ENTRIES: int = Setting("RESPONSE_CACHE_MAX_ENTRIES", "1000", int)
+    RESPONSE_CACHE_REDIS: bool = Setting("RESPONSE_CACHE_REDIS", "False", _flag)
+    
+    # Fuzzy cache (near-duplicate PULSE requests) - off by default: a
+    # reworded question can still mean something else
+    FUZZY_CACHE_ENABLED: bool = Setting("FUZZY_CACHE_ENABLED", "False", _flag)
+    FUZZY_CACHE_THRESHOLD: float = Setting("FUZZY_CACHE_THRESHOLD", "0.8", float)  # Jaccard similarity
+    FUZZY_CACHE_MAX_ENTRIES: int = Setting("FUZZY_CACHE_MAX_ENTRIES", "500", int)
+    FUZZY_CACHE_TTL: int = Setting("FUZZY_CACHE_TTL", "86400", int)
+    FUZZY_CACHE_AUDIT_SIZE: int = Setting("FUZZY_CACHE_AUDIT_SIZE", "200", int)
+    
+    # Multi-agent fan-out (PulseCoordinator.route_many)
+    ROUTE_MAX_CONCURRENCY: int = Setting("ROUTE_MAX_CONCURRENCY", "4", int)
+    ROUTE_TASK_TIMEOUT: float = Setting("ROUTE_TASK_TIMEOUT", "0", float)  # 0 = no limit
+    
+    # Resilience (retries with backoff, circuit breakers, hedged requests)
+    RETRY_MAX_RETRIES: int = Setting("RETRY_MAX_RETRIES", "3", int)
+    RETRY_BASE_DELAY: float = Setting("RETRY_BASE_DELAY", "1.0", float)  # seconds
+    RETRY_MAX_DELAY: float = Setting("RETRY_MAX_DELAY", "30", float)
+    CIRCUIT_FAILURE_THRESHOLD: int = Setting("CIRCUIT_FAILURE_THRESHOLD", "5", int)
+    CIRCUIT_RESET_TIMEOUT: float = Setting("CIRCUIT_RESET_TIMEOUT", "30", float)
+    HEDGE_DELAY: float = Setting("HEDGE_DELAY", "0", float)  # 0 = no hedged requests
+    
+    # Account rate limits shared by every agent (0 = not set: learned from
+    # the API's rate-limit headers when RATE_LIMIT_FROM_HEADERS is on)
+    RATE_LIMIT_RPM: int = Setting("RATE_LIMIT_RPM", "0", int)
+    RATE_LIMIT_INPUT_TPM: int = Setting("RATE_LIMIT_INPUT_TPM", "0", int)
+    RATE_LIMIT_OUTPUT_TPM: int = Setting("RATE_LIMIT_OUTPUT_TPM", "0", int)
+    RATE_LIMIT_FROM_HEADERS: bool = Setting("RATE_LIMIT_FROM_HEADERS", "True", _flag)
+    RATE_LIMIT_OUTPUT_ESTIMATE: int = Setting("RATE_LIMIT_OUTPUT_ESTIMATE", "1024", int)  # output reserved before an agent's average is known
+    
+    # Priority task queue (PulseCoordinator.submit_task)
+    TASK_QUEUE_WORKERS: int = Setting("TASK_QUEUE_WORKERS", "4", int)
+    TASK_QUEUE_RESERVED_WORKERS: int = Setting("TASK_QUEUE_RESERVED_WORKERS", "1", int)  # EMERGENCY only
+    TASK_QUEUE_MAX_DEPTH: int = Setting("TASK_QUEUE_MAX_DEPTH", "100", int)
+    
+    # Bulk mode (Message Batches API)
+    BATCH_STATE_DIR: str = Setting("BATCH_STATE_DIR", ".beechwood/batches")
+    BATCH_POLL_INTERVAL: float = Setting("BATCH_POLL_INTERVAL", "30", float)  # seconds
+    
+    # Repository code review (core.code_review)
+    REVIEW_INDEX_DIR: str = Setting("REVIEW_INDEX_DIR", ".beechwood/reviews")
+    REVIEW_MAX_CONCURRENCY: int = Setting("REVIEW_MAX_CONCURRENCY", "4", int)
+    REVIEW_MAX_FILE_BYTES: int = Setting("REVIEW_MAX_FILE_BYTES", "100000", int)
+    
+    # Conversation & task store ("sqlite", "supabase" or "none")
+    STORE_BACKEND: str = Setting("STORE_BACKEND", "sqlite")
+    STORE_SQLITE_PATH: str = Setting("STORE_SQLITE_PATH", ".beechwood/beechwood.db")
+    STORE_BATCH_SIZE: int = Setting("STORE_BATCH_SIZE", "100", int)  # records per write
+    STORE_FLUSH_INTERVAL: float = Setting("STORE_FLUSH_INTERVAL", "0.5", float)  # seconds
+    STORE_HISTORY_LOAD_LIMIT: int = Setting("STORE_HISTORY_LOAD_LIMIT", "50", int)  # turns reloaded per session
+    
+    # Record & replay of API calls ("off", "record" or "replay")
+    CASSETTE_MODE: str = Setting("CASSETTE_MODE", "off")
+    CASSETTE_PATH: str = Setting("CASSETTE_PATH", ".beechwood/cassettes/session.json")
+    CASSETTE_REPLAY_SPEED: float = Setting("CASSETTE_REPLAY_SPEED", "0", float)  # 0 = instant, 1 = as recorded
+    
+    # Per-session agent memory (core.sessions)
+    SESSION_IDLE_TIMEOUT: float = Setting("SESSION_IDLE_TIMEOUT", "1800", float)  # seconds unused before eviction (0 = never)
+    SESSION_MAX_SESSIONS: int = Setting("SESSION_MAX_SESSIONS", "10000", int)  # resident sessions (0 = unlimited)
+    SESSION_MEMORY_LIMIT_MB: float = Setting("SESSION_MEMORY_LIMIT_MB", "512", float)  # all sessions together (0 = unlimited)
+    SESSION_COLD_AFTER: float = Setting("SESSION_COLD_AFTER", "300", float)  # seconds unused before compressing (0 = never)
+    SESSION_COLD_CODEC: str = Setting("SESSION_COLD_CODEC", "zlib")  # "zlib" or "zstd" (needs zstandard)
+    
+    # HTTP service (api.main)
+    API_HOST: str = Setting("API_HOST", "0.0.0.0")
+    API_PORT: int = Setting("API_PORT", "8000", int)
+    API_WORKERS: int = Setting("API_WORKERS", "1", int)  # processes (each has its own agents and memory)
+    API_MAX_CONCURRENCY: int = Setting("API_MAX_CONCURRENCY", "16", int)  # model calls in flight per process
+    API_REQUEST_TIMEOUT: float = Setting("API_REQUEST_TIMEOUT", "300", float)  # seconds
+    
+    # Intent router (local department classifier, LLM only when unsure)
+    INTENT_ROUTER_THRESHOLD: float = Setting("INTENT_ROUTER_THRESHOLD", "0.6", float)
+    INTENT_ROUTER_LLM_FALLBACK: bool = Setting("INTENT_ROUTER_LLM_FALLBACK", "True", _flag)
+    INTENT_ROUTER_MODEL: str = Setting("INTENT_ROUTER_MODEL", "claude-3-5-haiku-20241022")
     
     # Environment Settings
-    ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
-    DEBUG: bool = os.getenv("DEBUG", "True") == "True"
+    ENVIRONMENT: str = Setting("ENVIRONMENT", "development")
+    DEBUG: bool = Setting("DEBUG", "True", _flag)
     
     # PULSE Configuration
-    PULSE_VERSION: str = os.getenv("PULSE_VERSION", "0.1.0")
-    PULSE_NAME: str = os.getenv("PULSE_NAME", "PULSE")
-    COMPANY_NAME: str = os.getenv("COMPANY_NAME", "Beechwood Corporation")
+    PULSE_VERSION: str = Setting("PULSE_VERSION", "0.1.0")
+    PULSE_NAME: str = Setting("PULSE_NAME", "PULSE")
+    COMPANY_NAME: str = Setting("COMPANY_NAME", "Beechwood Corporation")
     
     @classmethod
     def validate(cls) -> bool:
@@ -61,13 +227,67 @@ class Config:
         return True
     
     @classmethod
-    def get_anthropic_client(cls):
+    def warn_if_incomplete(cls):
+        """Validate once per process and warn if something is missing"""
+        if getattr(cls, "_validated", False):
+            return
+        cls._validated = True
+        
+        if not cls.validate():
+            print("⚠️  Warning: Some configuration values are missing")
+    
+    @classmethod
+    def get_agent_timeout(cls, agent: Optional[str] = None) -> float:
+        """
+        Get the request timeout (seconds) for an agent
+        Environment overrides win over the AGENT_TIMEOUTS defaults
+        """
+        if not agent:
+            return cls.ANTHROPIC_TIMEOUT
+        
+        load_environment()
+        override = os.getenv(f"ANTHROPIC_TIMEOUT_{agent.upper()}")
+        if override:
+            return float(override)
+        
+        return cls.AGENT_TIMEOUTS.get(agent.lower(), cls.ANTHROPIC_TIMEOUT)
+    
+    @classmethod
+    def get_history_token_budget(cls, agent: Optional[str] = None) -> int:
+        """
+        Get the conversation memory budget (estimated tokens) for an agent
+        Environment overrides win over the HISTORY_TOKEN_BUDGETS defaults
+        """
+        if not agent:
+            return cls.HISTORY_TOKEN_BUDGET
+        
+        load_environment()
+        override = os.getenv(f"HISTORY_TOKEN_BUDGET_{agent.upper()}")
+        if override:
+            return int(override)
+        
+        return cls.HISTORY_TOKEN_BUDGETS.get(agent.lower(), cls.HISTORY_TOKEN_BUDGET)
+    
+    @classmethod
+    def get_anthropic_client(cls, agent: Optional[str] = None):
         """
-        Create and return an Anthropic client
+        Return the shared Anthropic client
         This is what PULSE and AI employees use to "think"
+        
+        Every caller gets a view of the same pooled, keep-alive connection.
+        Passing an agent name applies that agent's timeout.
         """
-        from anthropic import Anthropic
-        return Anthropic(api_key=cls.ANTHROPIC_API_KEY)
+        from core.clients import client_registry
+        return client_registry.get_client(agent)
+    
+    @classmethod
+    def get_async_anthropic_client(cls, agent: Optional[str] = None):
+        """
+        Return the shared AsyncAnthropic client for the running event loop
+        Use this from async code (must be called inside an event loop)
+        """
+        from core.clients import client_registry
+        return client_registry.get_async_client(agent)
     
     @classmethod
     def get_openai_client(cls):
@@ -88,8 +308,5 @@ class Config:
 
 
 # Create a global config instance
+# (validation now happens when the first API client is created)
 config = Config()
-
-# Validate on import
-if not config.validate():
-    print("⚠️  Warning: Some configuration values are missing")
\ No newline at end of file
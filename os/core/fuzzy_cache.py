@@ -0,0 +1,351 @@
+"""
+Fuzzy (near-duplicate) Request Cache for Beechwood OS
+Answers reworded versions of questions PULSE has already answered
+
+"What's BEACON's status?" and "what is beacon's status" are different
+strings, so the exact response cache misses them. Here each request is
+broken into character shingles and indexed with MinHash + LSH (all local,
+no external service). A new request that is similar enough to a cached one
+(Jaccard similarity above the threshold) gets that answer.
+
+Small edits can flip a question's meaning ("should we use Redis" vs
+"should we not use Redis", "top 3 risks" vs "top 10 risks", "due
+Friday" vs "due Monday") while keeping it similar, so a hit is also
+refused when the two requests differ in their numbers, negation or
+time words. The cache is off by default
+(FUZZY_CACHE_ENABLED).
+
+Every fuzzy hit is logged for auditing; callers can report a hit that was
+wrong, which evicts the entry and counts toward the false-hit rate.
+"""
+
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from core.config import config
+
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16  # 16 bands x 4 rows: likely candidates from ~0.5 similarity up
+ROWS_PER_BAND = NUM_PERMUTATIONS // LSH_BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Words that flip a request's meaning (apostrophes are dropped by normalize)
+NEGATION_WORDS = frozenset({
+    "no", "not", "never", "none", "nothing", "nobody", "neither", "nor", "without", "cannot",
+    "dont", "doesnt", "didnt", "isnt", "arent", "wasnt", "werent", "wont", "wouldnt",
+    "cant", "couldnt", "shouldnt", "havent", "hasnt", "hadnt", "mustnt", "stop", "except",
+})
+
+NUMBER_WORDS = frozenset({
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "eleven", "twelve", "fifteen", "twenty", "thirty", "fifty", "hundred", "thousand", "million",
+    "first", "second", "third", "half", "dozen", "single", "double", "twice",
+})
+
+# Dates and relative times ("the plan for Friday" is not "the plan for Monday")
+TIME_WORDS = frozenset({
+    "today", "tonight", "tomorrow", "yesterday", "next", "last", "previous",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    "january", "february", "march", "april", "may", "june", "july", "august",
+    "september", "october", "november", "december", "q1", "q2", "q3", "q4",
+})
+
+# "what's" -> "what is" (so contractions don't count as rewording)
+_IS_CONTRACTION = re.compile(r"\b(what|how|where|who|when|why|that|there|here)'s\b")
+
+_rng = random.Random(1337)  # fixed seed so signatures are stable across runs
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def normalize(text: str) -> str:
+    """Lowercase, expand common contractions, drop possessives and punctuation"""
+    text = _IS_CONTRACTION.sub(r"\1 is", text.lower().replace("\u2019", "'"))
+    text = re.sub(r"'re\b", " are", text)
+    text = re.sub(r"'s\b", "", text)
+    text = text.replace("'", "")
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def shingles(text: str) -> Set[str]:
+    """Character shingles of the normalized text"""
+    text = normalize(text)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def guard_words(text: str) -> frozenset:
+    """Numbers, negation and time words in a request (these must match exactly for a hit)"""
+    return frozenset(
+        word for word in normalize(text).split()
+        if word.isdigit() or word in NUMBER_WORDS or word in NEGATION_WORDS or word in TIME_WORDS
+        or any(char.isdigit() for char in word)  # 3pm, q4, 2fa...
+    )
+
+
+def minhash(shingle_set: Set[str]) -> Tuple[int, ...]:
+    """MinHash signature of a shingle set"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "big")
+        for s in shingle_set
+    ]
+    if not hashes:
+        return tuple([_MAX_HASH] * NUM_PERMUTATIONS)
+
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Exact Jaccard similarity of two sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class FuzzyEntry:
+    """One cached request/answer pair"""
+
+    __slots__ = ("entry_id", "scope", "request", "shingles", "guards", "signature", "answer", "model", "expires_at")
+
+    def __init__(self, entry_id, scope, request, shingle_set, signature, answer, model, expires_at):
+        self.entry_id = entry_id
+        self.scope = scope
+        self.request = request
+        self.shingles = shingle_set
+        self.guards = guard_words(request)
+        self.signature = signature
+        self.answer = answer
+        self.model = model
+        self.expires_at = expires_at
+
+
+class FuzzyCache:
+    """
+    Similarity-based cache
+
+    Entries are grouped by a scope (e.g., agent + session + conversation
+    summary), so a reworded question only matches answers given in the
+    same conversational context.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[int] = None
+    ):
+        # None means "use config" (read on first use, not at import)
+        self._threshold = threshold
+        self._max_entries = max_entries
+        self._ttl = ttl
+
+        self._entries: "OrderedDict[int, FuzzyEntry]" = OrderedDict()
+        self._buckets: Dict[Tuple, Set[int]] = {}
+        self._next_id = 0
+        self._next_audit_id = 1
+        self._lock = threading.Lock()
+
+        self._audit_log: Optional[Deque[Dict[str, Any]]] = None
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "exact_hits": 0,
+            "misses": 0,
+            "false_hits": 0,
+            "writes": 0,
+        }
+
+    @property
+    def threshold(self) -> float:
+        return config.FUZZY_CACHE_THRESHOLD if self._threshold is None else self._threshold
+
+    @property
+    def max_entries(self) -> int:
+        return config.FUZZY_CACHE_MAX_ENTRIES if self._max_entries is None else self._max_entries
+
+    @property
+    def ttl(self) -> int:
+        return config.FUZZY_CACHE_TTL if self._ttl is None else self._ttl
+
+    @property
+    def audit_log(self) -> Deque[Dict[str, Any]]:
+        """Recent fuzzy hits (bounded by FUZZY_CACHE_AUDIT_SIZE)"""
+        if self._audit_log is None:
+            self._audit_log = deque(maxlen=config.FUZZY_CACHE_AUDIT_SIZE)
+        return self._audit_log
+
+    def _band_keys(self, scope: str, signature: Tuple[int, ...]) -> List[Tuple]:
+        """LSH bucket keys for a signature"""
+        return [
+            (scope, band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+            for band in range(LSH_BANDS)
+        ]
+
+    def _remove(self, entry_id: int):
+        """Drop an entry and its LSH buckets (lock must be held)"""
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in self._band_keys(entry.scope, entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def lookup(self, scope: str, request: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer for a near-duplicate request
+
+        Args:
+            scope: Context the request was made in
+            request: The request text
+
+        Returns:
+            Dictionary with answer, model, similarity, matched_request and
+            audit_id - or None on a miss
+        """
+        request_shingles = shingles(request)
+        request_guards = guard_words(request)
+        signature = minhash(request_shingles)
+        now = time.monotonic()
+
+        with self._lock:
+            self.stats["lookups"] += 1
+
+            candidates: Set[int] = set()
+            for key in self._band_keys(scope, signature):
+                candidates |= self._buckets.get(key, set())
+
+            best, best_similarity = None, 0.0
+            for entry_id in candidates:
+                entry = self._entries.get(entry_id)
+                if entry is None:
+                    continue
+                if entry.expires_at and entry.expires_at < now:
+                    self._remove(entry_id)
+                    continue
+                if entry.guards != request_guards:
+                    continue  # different numbers or negation: a different question
+
+                similarity = jaccard(request_shingles, entry.shingles)
+                if similarity > best_similarity:
+                    best, best_similarity = entry, similarity
+
+            if best is None or best_similarity < self.threshold:
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(best.entry_id)
+            self.stats["hits"] += 1
+            if best_similarity == 1.0:
+                self.stats["exact_hits"] += 1
+
+            audit = {
+                "audit_id": self._next_audit_id,
+                "entry_id": best.entry_id,
+                "request": request,
+                "matched_request": best.request,
+                "similarity": round(best_similarity, 3),
+                "timestamp": time.time(),
+                "false_hit": False,
+            }
+            self.audit_log.append(audit)
+            self._next_audit_id += 1
+
+            return {
+                "answer": best.answer,
+                "model": best.model,
+                "similarity": audit["similarity"],
+                "matched_request": best.request,
+                "audit_id": audit["audit_id"],
+            }
+
+    def store(self, scope: str, request: str, answer: str, model: str):
+        """Remember an answer for future near-duplicates"""
+        request_shingles = shingles(request)
+        signature = minhash(request_shingles)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+
+            self._entries[entry_id] = FuzzyEntry(
+                entry_id,
+                scope,
+                request,
+                request_shingles,
+                signature,
+                answer,
+                model,
+                time.monotonic() + self.ttl if self.ttl else 0,
+            )
+            for key in self._band_keys(scope, signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+
+            self.stats["writes"] += 1
+
+    def report_false_hit(self, audit_id: int) -> bool:
+        """
+        Mark a fuzzy hit as wrong
+
+        The matched entry is evicted so it can't be served again.
+
+        Returns:
+            True if the audit record was found
+        """
+        with self._lock:
+            for audit in self.audit_log:
+                if audit["audit_id"] == audit_id and not audit["false_hit"]:
+                    audit["false_hit"] = True
+                    self.stats["false_hits"] += 1
+                    self._remove(audit["entry_id"])
+                    return True
+        return False
+
+    def clear(self):
+        """Forget all entries (stats and audit log are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate, false-hit rate and size"""
+        lookups = self.stats["lookups"]
+        hits = self.stats["hits"]
+        return {
+            "enabled": config.FUZZY_CACHE_ENABLED,
+            "threshold": self.threshold,
+            **self.stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "false_hit_rate": round(self.stats["false_hits"] / hits, 3) if hits else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def get_audit_log(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent fuzzy hits, newest first"""
+        return list(reversed(self.audit_log))[:limit]
+
+
+# Create a global fuzzy cache (used by PULSE)
+fuzzy_cache = FuzzyCache()
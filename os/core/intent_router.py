@@ -0,0 +1,143 @@
+"""
+Intent Router for Beechwood OS
+Decides which department should handle a request - locally, with no LLM call
+
+Each agent declares its capabilities (keywords and short phrases). We turn
+those into a tiny TF-IDF model: words only one department claims count
+more than words every department shares. A request is scored against each
+department in microseconds. Only when the evidence is weak or split does
+PULSE fall back to asking Claude.
+"""
+
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from core.registry import AgentRegistry
+
+
+_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9.+#&-]*")
+
+# Confidence = best score / (total score + PRIOR_MASS). The prior keeps a
+# single weak keyword from looking like a confident decision.
+PRIOR_MASS = 1.0
+
+
+def _stem(word: str) -> str:
+    """Very light stemming so "alerts"/"alerting"/"alerted" match "alert" """
+    word = word.strip(".-")
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def terms(text: str) -> List[str]:
+    """Stemmed words plus adjacent-word phrases"""
+    words = [_stem(word) for word in _WORD_PATTERN.findall(text.lower())]
+    words = [word for word in words if word]
+    phrases = [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return words + phrases
+
+
+class IntentRouter:
+    """
+    Local classifier over the agents' declared capabilities
+
+    Usage:
+        router = IntentRouter(agent_registry, fallback_agent=PulseCoordinator)
+        router.classify("Review the login API for SQL injection")
+        -> {"agent": "security", "confidence": 0.71, "scores": {...}}
+    """
+
+    def __init__(self, registry: AgentRegistry, fallback_agent: Any = None):
+        """
+        Args:
+            registry: Where the departments come from
+            fallback_agent: Agent class that handles everything else (PULSE);
+                            its capabilities are scored too
+        """
+        self.registry = registry
+        self.fallback_agent = fallback_agent
+        self.fallback_key = getattr(fallback_agent, "agent_key", "pulse")
+
+        self._weights: Dict[str, Dict[str, float]] = {}
+        self._built_for: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _profiles(self) -> Dict[str, List[str]]:
+        """Capability vocabulary per agent key"""
+        profiles = {}
+        for spec in self.registry.specs():
+            profiles[spec.key] = [spec.key, *spec.aliases, *spec.capabilities, spec.specialty]
+        if self.fallback_agent is not None:
+            agent = self.fallback_agent
+            profiles[self.fallback_key] = [agent.agent_key, *agent.aliases, *agent.capabilities]
+        return profiles
+
+    def _build(self):
+        """Precompute TF-IDF weights for every (agent, term) pair"""
+        documents = {
+            key: set(term for entry in vocabulary for term in terms(entry))
+            for key, vocabulary in self._profiles().items()
+        }
+
+        document_count = len(documents)
+        frequency: Dict[str, int] = {}
+        for document in documents.values():
+            for term in document:
+                frequency[term] = frequency.get(term, 0) + 1
+
+        weights: Dict[str, Dict[str, float]] = {}
+        for key, document in documents.items():
+            for term in document:
+                idf = math.log((1 + document_count) / (1 + frequency[term])) + 1
+                weights.setdefault(term, {})[key] = idf
+
+        self._weights = weights
+        self._built_for = self.registry.version
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        """
+        Pick the department for a request
+
+        Args:
+            text: The request text
+
+        Returns:
+            Dictionary with agent (key), confidence (0-1), scores per agent
+            and matched terms
+        """
+        if self._built_for != self.registry.version:
+            with self._lock:
+                if self._built_for != self.registry.version:
+                    self._build()
+
+        scores: Dict[str, float] = {}
+        matched: List[str] = []
+        for term in terms(text):
+            term_weights = self._weights.get(term)
+            if not term_weights:
+                continue
+            matched.append(term)
+            for key, weight in term_weights.items():
+                scores[key] = scores.get(key, 0.0) + weight
+
+        if not scores:
+            return {
+                "agent": self.fallback_key,
+                "confidence": 0.0,
+                "scores": {},
+                "matched_terms": [],
+            }
+
+        best = max(scores, key=scores.get)
+        confidence = scores[best] / (sum(scores.values()) + PRIOR_MASS)
+
+        return {
+            "agent": best,
+            "confidence": round(confidence, 3),
+            "scores": {key: round(score, 3) for key, score in scores.items()},
+            "matched_terms": matched,
+        }
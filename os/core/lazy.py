@@ -0,0 +1,37 @@
+"""
+Lazy singletons for Beechwood OS
+
+PULSE and the AI employees used to be built the moment their module was
+imported. Now each module exposes a getter that builds the instance on
+first use, so importing is cheap and needs no credentials.
+"""
+
+import threading
+from typing import Callable, TypeVar
+
+
+T = TypeVar("T")
+
+
+def lazy_singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Wrap a factory so it runs once, on first call (thread-safe)
+
+    Args:
+        factory: Builds the instance (e.g., the EngineeringAI class)
+
+    Returns:
+        A getter that always returns the same instance
+    """
+    lock = threading.Lock()
+    holder = []
+
+    def get() -> T:
+        if not holder:
+            with lock:
+                if not holder:
+                    holder.append(factory())
+        return holder[0]
+
+    get.__doc__ = f"Get the shared {getattr(factory, '__name__', 'instance')} (created on first use)"
+    return get
@@ -0,0 +1,482 @@
+"""
+Conversation Memory for Beechwood OS
+Keeps each agent's memory inside a token budget
+
+Without a limit, every turn resends the whole conversation, so each call
+costs more than the last. Here the newest turns stay word-for-word while
+older turns are folded into a running summary written by a cheaper model
+(in the background, so nobody waits for it).
+
+Memory is also saved to the conversation store (core.store) and read back
+the first time a session is used after a restart.
+
+In memory, turns are compact Message records (no per-message dict), and a
+conversation that sits idle can be frozen: its turns and summary are
+compressed into one blob (the "cold tier") and unpacked on next use.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import config
+from core.metrics import metrics
+from core.rate_limiter import rate_limiter
+from core.resilience import resilience
+from core.store import conversation_store
+from core.tokens import content_text, estimate_message_tokens, estimate_tokens
+
+
+SUMMARY_PROMPT = """You maintain the running memory of an AI employee at {company}.
+
+Merge the EXISTING SUMMARY and the NEW CONVERSATION TURNS into one updated summary.
+Keep decisions, requirements, names, file paths, open questions and commitments.
+Drop pleasantries and anything superseded. Write compact bullet points, at most {max_words} words."""
+
+# Characters kept per message when we have to summarize without the model
+FALLBACK_SNIPPET_CHARS = 200
+
+# Rough in-memory cost of one message beyond its text
+# (a Message record, the content string's header and a list slot)
+MESSAGE_OVERHEAD_BYTES = 120
+
+# zlib level for frozen conversations (1 = fastest, 9 = smallest)
+COLD_ZLIB_LEVEL = 6
+
+
+class Message:
+    """
+    One conversation turn
+
+    A __slots__ record instead of a {"role", "content"} dict: about a
+    quarter of the size, and roles are interned so every turn shares the
+    same two strings. Reads like a dict (message["role"]) for the helpers
+    that take either; to_dict() gives the API's format.
+    """
+
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: Any):
+        self.role = sys.intern(role)
+        self.content = content
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "role":
+            return self.role
+        if key == "content":
+            return self.content
+        raise KeyError(key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"role": self.role, "content": self.content}
+
+
+def message_bytes(message: Any) -> int:
+    """Approximate memory held by one message (for session accounting)"""
+    return MESSAGE_OVERHEAD_BYTES + len(content_text(message["content"]))
+
+
+_zstd_warned = False
+
+
+def _cold_codec() -> str:
+    """Codec for frozen conversations: zstd if configured and installed, else zlib"""
+    global _zstd_warned
+    if config.SESSION_COLD_CODEC.lower() != "zstd":
+        return "zlib"
+    try:
+        import zstandard  # noqa: F401
+        return "zstd"
+    except ImportError:
+        if not _zstd_warned:
+            _zstd_warned = True
+            print("⚠️  SESSION_COLD_CODEC=zstd but zstandard is not installed, using zlib")
+        return "zlib"
+
+
+def compress_state(messages: List[Message], summary: str) -> Tuple[str, bytes]:
+    """Pack turns and summary into one compressed blob"""
+    payload = json.dumps({"summary": summary, "messages": [[m.role, m.content] for m in messages]}).encode()
+    codec = _cold_codec()
+    if codec == "zstd":
+        import zstandard
+        return codec, zstandard.ZstdCompressor().compress(payload)
+    return codec, zlib.compress(payload, COLD_ZLIB_LEVEL)
+
+
+def decompress_state(codec: str, blob: bytes) -> Tuple[List[Message], str]:
+    """Unpack a blob from compress_state()"""
+    if codec == "zstd":
+        import zstandard
+        payload = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        payload = zlib.decompress(blob)
+    state = json.loads(payload)
+    return [Message(role, content) for role, content in state["messages"]], state["summary"]
+
+
+class Conversation:
+    """
+    One agent's conversation memory
+
+    - messages: recent turns, sent verbatim
+    - summary: running summary of everything older
+
+    Saved state is loaded lazily: nothing is read from the store until
+    the messages or summary are first used.
+    """
+
+    def __init__(
+        self,
+        agent_key: str = "",
+        token_budget: Optional[int] = None,
+        session_id: Optional[str] = None
+    ):
+        """
+        Args:
+            agent_key: Which agent owns this memory (for its budget and client)
+            token_budget: Max estimated tokens of verbatim history
+                          (defaults to the agent's configured budget, 0 = unlimited)
+            session_id: Key the memory is saved under in the conversation
+                        store (None or empty = kept in memory only)
+        """
+        self.agent_key = agent_key
+        self.session_id = session_id or ""
+        self.token_budget = (
+            token_budget if token_budget is not None
+            else config.get_history_token_budget(agent_key)
+        )
+        self._messages: List[Message] = []
+        self._summary = ""
+        self.summarized_turns = 0
+
+        # Approximate memory held (kept up to date on every change)
+        self.size_bytes = 0
+
+        # Frozen state: (codec, compressed turns + summary) while cold
+        self._cold: Optional[Tuple[str, bytes]] = None
+        self._incompressible_size = -1
+
+        self._lock = threading.RLock()
+        self._compacting = False
+
+        # Persistence bookkeeping: messages[i] is turn number first_seq + i
+        # in the store, and the first `persisted` messages are saved already
+        self._loaded = not self.session_id
+        self._first_seq = 0
+        self._persisted = 0
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        """Recent turns as {"role", "content"} dictionaries (a snapshot)"""
+        self._ensure_loaded()
+        return [message.to_dict() for message in self._messages]
+
+    @messages.setter
+    def messages(self, messages: List[Dict[str, Any]]):
+        with self._lock:
+            self._loaded = True
+            self._cold = None
+            self._messages = [Message(message["role"], message["content"]) for message in messages]
+            self._persisted = 0
+            self._resize()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._messages)
+
+    @property
+    def summary(self) -> str:
+        self._ensure_loaded()
+        return self._summary
+
+    def _ensure_loaded(self):
+        """Unfreeze, or read this session's saved summary and recent turns (first use only)"""
+        if self._loaded and self._cold is None:
+            return
+        with self._lock:
+            if self._cold is not None:
+                self.thaw()
+            if self._loaded:
+                return
+            self._loaded = True
+
+            try:
+                state = conversation_store.load_history(self.session_id)
+            except Exception as e:
+                print(f"⚠️  Could not load saved memory for {self.session_id}: {str(e)}")
+                return
+
+            turns = state["turns"]
+            # The verbatim history has to start with a user turn
+            while turns and turns[0]["role"] != "user":
+                turns = turns[1:]
+
+            self._messages = [Message(turn["role"], turn["content"]) for turn in turns]
+            self._first_seq = turns[0]["seq"] if turns else state["next_seq"]
+            self._persisted = len(self._messages)
+            self._summary = state["summary"]
+            self.summarized_turns = state["summarized_turns"]
+            self._resize()
+
+    async def load_async(self):
+        """
+        Load (or unfreeze) in a worker thread, so an event loop never
+        waits on the store - first use of a session reads from SQLite or
+        Supabase, and may wait for that session's queued writes first
+        """
+        if self._loaded and self._cold is None:
+            return
+        await asyncio.to_thread(self._ensure_loaded)
+
+    def _resize(self):
+        """Recount size_bytes from scratch (after bulk changes)"""
+        self.size_bytes = sum(message_bytes(message) for message in self._messages) + len(self._summary)
+
+    @property
+    def resident_messages(self) -> int:
+        """Messages held unpacked in memory right now (does not trigger a load)"""
+        return len(self._messages)
+
+    @property
+    def busy(self) -> bool:
+        """True mid-turn (a user turn awaits its reply) or while summarizing"""
+        return self._compacting or bool(self._messages and self._messages[-1].role == "user")
+
+    @property
+    def cold(self) -> bool:
+        """True while frozen (compressed until next use)"""
+        return self._cold is not None
+
+    def freeze(self) -> int:
+        """
+        Compress turns and summary into the cold tier until next use
+
+        Skipped mid-turn, while summarizing, for empty or not-yet-loaded
+        memory, and when compressing wouldn't make it smaller.
+
+        Returns:
+            Bytes saved (0 if nothing was frozen)
+        """
+        with self._lock:
+            if self._cold is not None or not self._loaded or self.busy or not (self._messages or self._summary):
+                return 0
+            if self.size_bytes == self._incompressible_size:
+                return 0  # tried at this size already
+
+            before = self.size_bytes
+            cold = compress_state(self._messages, self._summary)
+            if len(cold[1]) + MESSAGE_OVERHEAD_BYTES >= before:
+                self._incompressible_size = before  # tiny history, nothing to gain
+                return 0
+
+            self._cold = cold
+            self._messages = []
+            self._summary = ""
+            self.size_bytes = len(cold[1]) + MESSAGE_OVERHEAD_BYTES
+            return before - self.size_bytes
+
+    def thaw(self):
+        """Unpack frozen turns and summary (called on first use after freeze())"""
+        with self._lock:
+            if self._cold is None:
+                return
+            self._messages, self._summary = decompress_state(*self._cold)
+            self._cold = None
+            self._resize()
+
+    def _persist(self):
+        """Queue every not-yet-saved message for the store"""
+        new_turns = [
+            (self._first_seq + index, message.role, message.content)
+            for index, message in enumerate(self._messages[self._persisted:], start=self._persisted)
+        ]
+        self._persisted = len(self._messages)
+        if new_turns:
+            conversation_store.record_turns(self.session_id, self.agent_key, new_turns)
+
+    def _persist_session(self):
+        """Queue the summary and where the verbatim history now starts"""
+        conversation_store.record_session(
+            self.session_id, self.agent_key, self._summary, self.summarized_turns, self._first_seq
+        )
+
+    def add(self, role: str, content: Any):
+        """Add a message to memory (saved once the assistant has replied)"""
+        with self._lock:
+            self._ensure_loaded()
+            message = Message(role, content)
+            self._messages.append(message)
+            self.size_bytes += message_bytes(message)
+            if role == "assistant" and self.session_id:
+                self._persist()
+
+    def discard_last(self, role: str):
+        """Remove the newest message if it has the given role (e.g., a rejected task)"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._messages and self._messages[-1].role == role:
+                self.size_bytes -= message_bytes(self._messages.pop())
+                self._persisted = min(self._persisted, len(self._messages))
+
+    def clear(self):
+        """Forget everything, including the summary"""
+        with self._lock:
+            self._ensure_loaded()
+            self._first_seq += len(self._messages)
+            self._messages = []
+            self._persisted = 0
+            self._summary = ""
+            self.summarized_turns = 0
+            self.size_bytes = 0
+            if self.session_id:
+                self._persist_session()
+
+    def estimated_tokens(self) -> int:
+        """Estimated tokens for the verbatim history plus the summary"""
+        self._ensure_loaded()
+        return estimate_message_tokens(self._messages) + estimate_tokens(self._summary)
+
+    def _split_point(self) -> int:
+        """
+        Find how many of the oldest messages to compact
+
+        Recent messages worth up to half the budget stay verbatim. The
+        remaining history always starts with a user turn.
+        """
+        keep_tokens = self.token_budget // 2
+        kept = 0
+        messages = self._messages
+        cut = len(messages)
+
+        # Walk backwards keeping recent turns (always keep the newest pair)
+        while cut > 0:
+            cost = estimate_message_tokens([messages[cut - 1]])
+            if len(messages) - cut >= 2 and kept + cost > keep_tokens:
+                break
+            kept += cost
+            cut -= 1
+
+        # Never start the verbatim history on an assistant turn
+        while cut < len(messages) and messages[cut].role != "user":
+            cut += 1
+
+        return cut
+
+    def maybe_compact(self, background: Optional[bool] = None):
+        """
+        Compact older turns into the summary if memory is over budget
+
+        Args:
+            background: Summarize in a background thread
+                        (defaults to HISTORY_SUMMARY_BACKGROUND)
+        """
+        if not self.token_budget:
+            return
+
+        with self._lock:
+            if self._compacting or self.estimated_tokens() <= self.token_budget:
+                return
+
+            cut = self._split_point()
+            if cut == 0:
+                return
+
+            self._compacting = True
+            old_messages = self._messages[:cut]
+            old_summary = self._summary
+
+        if background is None:
+            background = config.HISTORY_SUMMARY_BACKGROUND
+
+        if background:
+            threading.Thread(
+                target=self._compact,
+                args=(old_messages, old_summary),
+                daemon=True,
+            ).start()
+        else:
+            self._compact(old_messages, old_summary)
+
+    def _compact(self, old_messages: List[Message], old_summary: str):
+        """Summarize old_messages and swap them out of the verbatim history"""
+        try:
+            new_summary = self._summarize(old_messages, old_summary)
+
+            with self._lock:
+                # Only apply if those messages are still at the front
+                # (clear() or a reload may have happened meanwhile)
+                cut = len(old_messages)
+                if len(self._messages) < cut or any(a is not b for a, b in zip(self._messages, old_messages)):
+                    return
+
+                self._messages = self._messages[cut:]
+                self._first_seq += cut
+                self._persisted = max(self._persisted - cut, 0)
+                self._summary = new_summary
+                self.summarized_turns += cut
+                self._resize()
+                if self.session_id:
+                    self._persist_session()
+        finally:
+            self._compacting = False
+
+    def _summarize(self, old_messages: List[Message], old_summary: str) -> str:
+        """Ask the summary model for an updated summary (local fallback on error)"""
+        transcript = "\n\n".join(
+            f"{message.role.upper()}: {content_text(message.content)}"
+            for message in old_messages
+        )
+        max_words = max(config.HISTORY_SUMMARY_MAX_TOKENS * 3 // 4, 50)
+
+        # Summary calls get their own breaker and metrics label
+        key = f"{self.agent_key}:summary"
+        content = f"EXISTING SUMMARY:\n{old_summary or '(none)'}\n\nNEW CONVERSATION TURNS:\n{transcript}"
+
+        def _create():
+            client = config.get_anthropic_client(self.agent_key)
+            # Summaries spend from the same account limits as the agents
+            with rate_limiter.reserve(
+                self.agent_key, estimate_tokens(content), config.HISTORY_SUMMARY_MAX_TOKENS
+            ) as ticket:
+                response = client.messages.create(
+                    model=config.HISTORY_SUMMARY_MODEL,
+                    max_tokens=config.HISTORY_SUMMARY_MAX_TOKENS,
+                    system=SUMMARY_PROMPT.format(company=config.COMPANY_NAME, max_words=max_words),
+                    messages=[{"role": "user", "content": content}]
+                )
+                ticket.usage = response.usage
+            return response
+
+        try:
+            with metrics.track(key, config.HISTORY_SUMMARY_MODEL) as call:
+                response = metrics.finish_response(call, resilience.call(key, _create))
+            return response.content[0].text
+        except Exception as e:
+            print(f"⚠️  Memory summary failed, using local fallback: {str(e)}")
+            return self._fallback_summary(old_messages, old_summary)
+
+    def _fallback_summary(self, old_messages: List[Message], old_summary: str) -> str:
+        """Crude local summary: the start of each message, capped in size"""
+        lines = [old_summary] if old_summary else []
+        for message in old_messages:
+            snippet = content_text(message.content)[:FALLBACK_SNIPPET_CHARS].replace("\n", " ")
+            lines.append(f"- {message.role}: {snippet}")
+
+        max_chars = int(config.HISTORY_SUMMARY_MAX_TOKENS * 4)
+        return "\n".join(lines)[-max_chars:]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Memory usage summary"""
+        return {
+            "session_id": self.session_id,
+            "messages": len(self),
+            "memory_bytes": self.size_bytes,
+            "estimated_tokens": self.estimated_tokens(),
+            "token_budget": self.token_budget,
+            "summarized_turns": self.summarized_turns,
+            "has_summary": bool(self.summary),
+        }
@@ -0,0 +1,349 @@
+"""
+Metrics for Beechwood OS
+Where time and tokens go, for every model call
+
+Every agent call (execute_task, process_request, route_to_agent, streams
+and standalone tasks) records:
+- request latency and time-to-first-token histograms
+- input, output and prompt-cache tokens
+- successes, errors (by exception type) and calls answered from cache
+- retries, breaker rejections and hedges from the resilience layer
+- calls in flight right now
+
+Everything is labeled by agent and model. Read it as a dictionary with
+metrics.get_metrics(), or scrape metrics.render() - the Prometheus text
+format - from a /metrics endpoint.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Histogram buckets (seconds) - agent calls range from under a second to minutes
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+TTFT_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 30)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Shared label handling for counters, gauges and histograms"""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """A number that only goes up (requests, tokens, errors)"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]):
+        super().__init__(name, help_text, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self.values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}"
+            for key, value in values
+        ]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{**dict(zip(self.labels, key)), "value": value} for key, value in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    """A number that goes up and down (calls in flight)"""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (latency) in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> [count per bucket (not cumulative), sum, count]
+        self.series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self.series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            series = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self.series.items())
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_number(round(total, 6))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+    def _quantile(self, counts: List[int], count: int, q: float) -> Optional[float]:
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not count:
+            return None
+        rank = q * count
+        cumulative = 0
+        lower = 0.0
+        for bound, bucket_count in zip(self.buckets, counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if bound == math.inf:
+                    return lower
+                return round(lower + (bound - lower) * (rank - cumulative) / bucket_count, 4)
+            cumulative += bucket_count
+            lower = bound if bound != math.inf else lower
+        return lower
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            series = [(key, [*counts], total, count) for key, (counts, total, count) in sorted(self.series.items())]
+        return [
+            {
+                **dict(zip(self.labels, key)),
+                "count": count,
+                "sum": round(total, 4),
+                "avg": round(total / count, 4) if count else None,
+                "p50": self._quantile(counts, count, 0.5),
+                "p95": self._quantile(counts, count, 0.95),
+                "p99": self._quantile(counts, count, 0.99),
+            }
+            for key, counts, total, count in series
+        ]
+
+
+class CallTimer:
+    """One agent call being measured (see Metrics.track)"""
+
+    __slots__ = ("agent", "model", "started", "finished")
+
+    def __init__(self, agent: str, model: str):
+        self.agent = agent
+        self.model = model
+        self.started = time.monotonic()
+        self.finished = False
+
+
+class Metrics:
+    """
+    Metrics for every agent call
+
+    Usage:
+        with metrics.track("engineering", "claude-sonnet-4-20250514") as call:
+            result = ...  # make the call
+            metrics.finish(call, result)
+
+        metrics.get_metrics()   # dictionary
+        metrics.render()        # Prometheus text format
+    """
+
+    def __init__(self):
+        labels = ("agent", "model")
+
+        self.requests = Counter(
+            "beechwood_requests_total", "Agent calls by outcome (success, error, cached)", labels + ("status",)
+        )
+        self.latency = Histogram(
+            "beechwood_request_duration_seconds", "Agent call latency", labels, LATENCY_BUCKETS
+        )
+        self.time_to_first_token = Histogram(
+            "beechwood_time_to_first_token_seconds", "Time until the first streamed text", labels, TTFT_BUCKETS
+        )
+        self.tokens = Counter(
+            "beechwood_tokens_total",
+            "Tokens billed (input, output, cache_creation, cache_read)",
+            labels + ("type",),
+        )
+        self.errors = Counter(
+            "beechwood_errors_total", "Failed agent calls by exception type", labels + ("error",)
+        )
+        self.resilience_events = Counter(
+            "beechwood_resilience_events_total",
+            "Retries, failures, breaker rejections and hedges per agent (and dropped store writes)",
+            ("agent", "event"),
+        )
+        self.in_flight = Gauge(
+            "beechwood_requests_in_flight", "Agent calls currently running", labels
+        )
+
+        self._all = (
+            self.requests, self.latency, self.time_to_first_token,
+            self.tokens, self.errors, self.resilience_events, self.in_flight,
+        )
+
+    @contextmanager
+    def track(self, agent: str, model: str) -> Iterator[CallTimer]:
+        """
+        Measure one call (counts as in flight until the block exits)
+
+        Pass the result dictionary to finish() inside the block. If the
+        block exits without one (exception, abandoned stream), the call
+        is recorded as an error.
+        """
+        call = CallTimer(agent, model)
+        self.in_flight.inc(agent=agent, model=model)
+        try:
+            yield call
+        except BaseException as e:
+            if not call.finished:
+                # A closed stream or cancelled task isn't a provider error
+                cancelled = isinstance(e, GeneratorExit) or type(e).__name__ == "CancelledError"
+                self._record_error(call, "Cancelled" if cancelled else type(e).__name__)
+            raise
+        finally:
+            self.in_flight.dec(agent=agent, model=model)
+            if not call.finished:
+                self._record_error(call, "Cancelled")
+
+    def _record_error(self, call: CallTimer, error: str):
+        call.finished = True
+        duration = time.monotonic() - call.started
+        self.latency.observe(duration, agent=call.agent, model=call.model)
+        self.requests.inc(agent=call.agent, model=call.model, status="error")
+        self.errors.inc(agent=call.agent, model=call.model, error=error)
+
+    def finish(self, call: CallTimer, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Record a finished call from its result dictionary
+
+        Returns:
+            The result (unchanged)
+        """
+        if call.finished:
+            return result
+        if not result.get("success"):
+            self._record_error(call, result.get("error_type", "Error"))
+            return result
+
+        call.finished = True
+        model = result.get("model") or call.model
+        self.record_success(call.agent, model, result, time.monotonic() - call.started)
+        return result
+
+    def finish_response(self, call: CallTimer, response: Any) -> Any:
+        """
+        Record a finished raw API call from its response
+
+        For helper calls that don't build a result dictionary (memory
+        summaries, routing). Returns the response unchanged.
+        """
+        usage = response.usage
+        self.finish(call, {
+            "success": True,
+            "model": response.model,
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+            "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        })
+        return response
+
+    def record_success(self, agent: str, model: str, result: Dict[str, Any], duration: float):
+        """Record a successful call (also used for answers served without track())"""
+        labels = {"agent": agent, "model": model}
+        self.latency.observe(duration, **labels)
+
+        if result.get("time_to_first_token") is not None:
+            self.time_to_first_token.observe(result["time_to_first_token"], **labels)
+
+        # Cached answers cost nothing, so they add no tokens
+        if result.get("cached") or result.get("fuzzy_match"):
+            self.requests.inc(status="cached", **labels)
+            return
+
+        self.requests.inc(status="success", **labels)
+        for kind in ("input", "output", "cache_creation", "cache_read"):
+            field = f"{kind}_tokens" if kind in ("input", "output") else f"{kind}_input_tokens"
+            count = result.get(field) or 0
+            if count:
+                self.tokens.inc(count, type=kind, **labels)
+
+    def record_resilience_event(self, agent: str, event: str):
+        """Count a retry, failure, breaker rejection, hedge or dropped store write"""
+        self.resilience_events.inc(agent=agent, event=event)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        All metrics as a dictionary
+
+        Returns:
+            {metric name: list of series}; histogram series include
+            count, sum, avg and estimated p50/p95/p99
+        """
+        return {metric.name: metric.snapshot() for metric in self._all}
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._all:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Forget everything (tests, or after a deploy)"""
+        self.__init__()
+
+
+# Create the global metrics registry
+metrics = Metrics()
+
+
+def get_metrics() -> Dict[str, Any]:
+    """Shortcut for metrics.get_metrics()"""
+    return metrics.get_metrics()
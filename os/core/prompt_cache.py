@@ -0,0 +1,92 @@
+"""
+Prompt Cache helpers for Beechwood OS
+Marks the static parts of every request so Claude can reuse them
+
+Each call resends the agent's system prompt and the whole conversation so
+far. Both are identical to the previous call's prefix, so we mark them with
+cache_control and the API reads them from cache instead of reprocessing them.
+Context attachments (core.attachments) sent ahead of a task get a
+breakpoint of their own, so the same attachment with a different task
+(e.g., one spec handed to many standalone reviews) is read from cache.
+(Prefixes shorter than the model's minimum cacheable length are simply not
+cached - marking them is harmless.)
+"""
+
+from typing import Any, Dict, List
+
+from core.attachments import ATTACHMENT_PREFIX
+
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def cacheable_system(system_prompt: str) -> List[Dict[str, Any]]:
+    """
+    Turn a system prompt string into a cacheable system block
+
+    Args:
+        system_prompt: The agent's static system prompt
+
+    Returns:
+        System blocks with a cache breakpoint at the end
+    """
+    return [{
+        "type": "text",
+        "text": system_prompt,
+        "cache_control": CACHE_CONTROL,
+    }]
+
+
+def _with_breakpoint(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a message and put a cache breakpoint on its last content block"""
+    content = message["content"]
+
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = [dict(block) for block in content]
+
+    blocks[-1]["cache_control"] = CACHE_CONTROL
+
+    # Also cache up to the last attachment, if the task comes after it
+    attachment_blocks = [
+        index for index, block in enumerate(blocks[:-1])
+        if block.get("text", "").startswith(ATTACHMENT_PREFIX)
+    ]
+    if attachment_blocks:
+        blocks[attachment_blocks[-1]]["cache_control"] = CACHE_CONTROL
+    return {"role": message["role"], "content": blocks}
+
+
+def cacheable_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Mark the conversation so its prefix is cached for the next turn
+
+    The breakpoint goes on the newest message: this call writes the whole
+    conversation to cache, and the next call (same prefix + new turns)
+    reads it back. History entries themselves are never modified.
+    Attachments in the newest message get a second breakpoint.
+
+    Args:
+        messages: Conversation history (oldest first)
+
+    Returns:
+        A new message list ready to send
+    """
+    if not messages:
+        return []
+    return list(messages[:-1]) + [_with_breakpoint(messages[-1])]
+
+
+def cache_usage(response: Any) -> Dict[str, int]:
+    """
+    Read cache token counts from an API response
+
+    Returns:
+        Dictionary with cache_creation_input_tokens and cache_read_input_tokens
+    """
+    usage = response.usage
+    return {
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+    }
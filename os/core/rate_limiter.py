@@ -0,0 +1,435 @@
+"""
+Rate Limiter for Beechwood OS
+One shared view of the account's API limits for every agent in the process
+
+Anthropic limits an account by requests per minute (RPM), input tokens
+per minute (ITPM) and output tokens per minute (OTPM). PULSE, Engineering
+AI and Security AI all spend from the same allowance, so every model call
+reserves from three token buckets here before it is sent:
+
+- 1 request
+- its estimated input tokens (from the local preflight estimate)
+- its expected output: the agent's recent average output (at most
+  max_tokens). Reserving the full max_tokens would let a single 8192
+  token call drain a whole entry-tier output bucket, and calls that
+  could run side by side would be sent one at a time.
+
+When the response arrives the reservation is settled against the real
+usage: unused tokens flow back into the buckets, and longer-than-expected
+answers are charged the difference.
+
+Limits come from config (RATE_LIMIT_*). Any that aren't set are learned
+from the API's anthropic-ratelimit-*-limit response headers (see
+observe_headers), so the limiter follows the account's real tier. With
+neither, nothing is limited. Calls that don't fit
+wait in line instead of failing with a 429. Waiting agents take turns
+(round robin), so one busy agent can't starve the others - except that
+calls made inside urgent() (emergency work) go to the front of the line.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from core.config import config
+
+
+# How often waiters that aren't first in line re-check (seconds)
+POLL_INTERVAL = 0.05
+
+# Weight of the newest call in an agent's average output
+OUTPUT_AVERAGE_WEIGHT = 0.2
+
+# Response header -> bucket name, for limits learned from the API
+LIMIT_HEADERS = {
+    "anthropic-ratelimit-requests-limit": "requests",
+    "anthropic-ratelimit-input-tokens-limit": "input_tokens",
+    "anthropic-ratelimit-output-tokens-limit": "output_tokens",
+}
+
+# True while running emergency work (follows threads' and tasks' context)
+_urgent: ContextVar[bool] = ContextVar("rate_limit_urgent", default=False)
+
+
+@contextmanager
+def urgent():
+    """
+    Let model calls made inside this block skip the rate limit line
+
+    Usage:
+        with urgent():
+            security_ai.design_emergency_system(...)
+    """
+    token = _urgent.set(True)
+    try:
+        yield
+    finally:
+        _urgent.reset(token)
+
+
+def is_urgent() -> bool:
+    """True inside an urgent() block"""
+    return _urgent.get()
+
+
+class TokenBucket:
+    """
+    Bucket that refills continuously up to a per-minute limit
+
+    Starts full, so a quiet process can burst up to the full limit.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def resize(self, per_minute: int):
+        """Change the limit, keeping what has been spent"""
+        self._refill(time.monotonic())
+        spent = self.capacity - self.tokens
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity - spent
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount tokens are available (0 = available now)"""
+        self._refill(now)
+        missing = amount - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float):
+        self.tokens -= amount
+
+    def give_back(self, amount: float):
+        """Return unused tokens (a negative amount charges extra usage)"""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateTicket:
+    """One reservation: what a call asked for and what it really used"""
+
+    __slots__ = ("agent", "input_tokens", "output_tokens", "urgent", "enqueued_at", "granted", "settled", "usage")
+
+    def __init__(self, agent: str, input_tokens: int, output_tokens: int):
+        self.agent = agent
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.urgent = is_urgent()
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.settled = False
+
+        # Set to the response's usage so the reservation can be corrected
+        self.usage: Any = None
+
+
+class RateLimiter:
+    """
+    Process-wide RPM/ITPM/OTPM scheduler
+
+    Usage:
+        with rate_limiter.reserve("engineering", input_tokens, max_tokens) as ticket:
+            response = client.messages.create(**params)
+            ticket.usage = response.usage
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        input_tokens_per_minute: Optional[int] = None,
+        output_tokens_per_minute: Optional[int] = None
+    ):
+        """
+        Args:
+            requests_per_minute: RPM limit (default: RATE_LIMIT_RPM)
+            input_tokens_per_minute: ITPM limit (default: RATE_LIMIT_INPUT_TPM)
+            output_tokens_per_minute: OTPM limit (default: RATE_LIMIT_OUTPUT_TPM)
+            A limit of 0 turns that bucket off.
+        """
+        self._limits = (requests_per_minute, input_tokens_per_minute, output_tokens_per_minute)
+        self._buckets: Optional[Dict[str, TokenBucket]] = None
+        self._learned: set = set()  # buckets whose limit comes from response headers
+        self._average_output: Dict[str, float] = {}  # per agent
+        self._condition = threading.Condition()
+
+        # Waiting tickets per agent, and the order agents take turns in
+        self._queues: Dict[str, Deque[RateTicket]] = {}
+        self._turns: "OrderedDict[str, None]" = OrderedDict()
+        self._waiting = 0
+        self._urgent_waiting: Deque[RateTicket] = deque()
+
+        self.stats = {
+            "granted": 0,
+            "waited": 0,
+            "total_wait": 0.0,
+            "max_wait": 0.0,
+            "max_queue_depth": 0,
+        }
+        self._agent_stats: Dict[str, Dict[str, Any]] = {}
+
+    def _configured_limits(self) -> Dict[str, int]:
+        """Limits from the constructor or config (0 = not set)"""
+        rpm, itpm, otpm = self._limits
+        return {
+            "requests": config.RATE_LIMIT_RPM if rpm is None else rpm,
+            "input_tokens": config.RATE_LIMIT_INPUT_TPM if itpm is None else itpm,
+            "output_tokens": config.RATE_LIMIT_OUTPUT_TPM if otpm is None else otpm,
+        }
+
+    @property
+    def buckets(self) -> Dict[str, TokenBucket]:
+        """Enabled buckets (built from config on first use)"""
+        if self._buckets is None:
+            self._buckets = {
+                name: TokenBucket(limit) for name, limit in self._configured_limits().items() if limit > 0
+            }
+        return self._buckets
+
+    def observe_headers(self, headers: Any):
+        """
+        Learn the account's limits from an API response's headers
+
+        Only limits that weren't configured are taken from the headers
+        (a configured limit can be lower on purpose, e.g., to leave room
+        for other processes). Called for every response by core.clients.
+        """
+        if not config.RATE_LIMIT_FROM_HEADERS:
+            return
+        configured = self._configured_limits()
+        for header, name in LIMIT_HEADERS.items():
+            value = headers.get(header)
+            if not value or configured[name] > 0:
+                continue
+            try:
+                limit = int(value)
+            except ValueError:
+                continue
+            with self._condition:
+                bucket = self.buckets.get(name)
+                if bucket is None:
+                    self.buckets[name] = TokenBucket(limit)
+                    self._learned.add(name)
+                elif bucket.capacity != limit:
+                    bucket.resize(limit)
+                self._condition.notify_all()
+
+    def expected_output(self, agent: str, max_tokens: int) -> int:
+        """Output tokens to reserve for a call: the agent's average so far, at most max_tokens"""
+        average = self._average_output.get(agent, config.RATE_LIMIT_OUTPUT_ESTIMATE)
+        return max(1, min(max_tokens, int(average)))
+
+    def _amounts(self, ticket: RateTicket) -> List[Tuple[TokenBucket, float]]:
+        """What a ticket takes from each bucket (never more than a full bucket)"""
+        wanted = {
+            "requests": 1,
+            "input_tokens": ticket.input_tokens,
+            "output_tokens": ticket.output_tokens,
+        }
+        return [
+            (bucket, min(wanted[name], bucket.capacity))
+            for name, bucket in self.buckets.items()
+        ]
+
+    def _enqueue(self, ticket: RateTicket):
+        """Join the line (condition lock must be held)"""
+        self._queues.setdefault(ticket.agent, deque()).append(ticket)
+        self._turns.setdefault(ticket.agent, None)
+        if ticket.urgent:
+            self._urgent_waiting.append(ticket)
+        self._waiting += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._waiting)
+
+    def _dequeue(self, ticket: RateTicket):
+        """Leave the line (condition lock must be held)"""
+        queue = self._queues.get(ticket.agent)
+        if not queue or ticket not in queue:
+            return
+        queue.remove(ticket)
+        self._waiting -= 1
+        if ticket.urgent:
+            self._urgent_waiting.remove(ticket)
+
+        # This agent goes to the back of the rotation (or leaves it)
+        self._turns.pop(ticket.agent, None)
+        if queue:
+            self._turns[ticket.agent] = None
+
+    def _next_ticket(self) -> Optional[RateTicket]:
+        """Whose turn it is: the oldest urgent ticket, else the oldest ticket of the next agent in rotation"""
+        if self._urgent_waiting:
+            return self._urgent_waiting[0]
+        for agent in self._turns:
+            return self._queues[agent][0]
+        return None
+
+    def _try_grant(self, ticket: RateTicket) -> float:
+        """
+        Grant the ticket if it's its turn and the buckets allow it
+
+        Returns:
+            0 if granted, otherwise seconds to wait before trying again
+        """
+        if self._next_ticket() is not ticket:
+            return POLL_INTERVAL
+
+        now = time.monotonic()
+        amounts = self._amounts(ticket)
+        wait = max([bucket.wait_time(amount, now) for bucket, amount in amounts] + [0.0])
+        if wait > 0:
+            return wait
+
+        for bucket, amount in amounts:
+            bucket.take(amount)
+        self._dequeue(ticket)
+        ticket.granted = True
+
+        waited = now - ticket.enqueued_at
+        agent_stats = self._agent_stats.setdefault(
+            ticket.agent, {"granted": 0, "waited": 0, "total_wait": 0.0}
+        )
+        for stats in (self.stats, agent_stats):
+            stats["granted"] += 1
+            stats["total_wait"] += waited
+            if waited > POLL_INTERVAL / 10:
+                stats["waited"] += 1
+        self.stats["max_wait"] = max(self.stats["max_wait"], waited)
+
+        self._condition.notify_all()
+        return 0.0
+
+    def acquire(self, agent: str, input_tokens: int, max_tokens: int) -> RateTicket:
+        """
+        Wait (blocking) until a call fits in the rate limits
+
+        Args:
+            agent: Agent key (for fair sharing)
+            input_tokens: Estimated input tokens
+            max_tokens: The call's max_tokens (the output reserved is the
+                        agent's expected output, capped at this)
+
+        Returns:
+            The granted ticket - pass it to settle() when the call is done
+        """
+        ticket = RateTicket(agent, input_tokens, self.expected_output(agent, max_tokens))
+        with self._condition:
+            self._enqueue(ticket)
+            while True:
+                wait = self._try_grant(ticket)
+                if wait == 0:
+                    return ticket
+                self._condition.wait(wait)
+
+    async def acquire_async(self, agent: str, input_tokens: int, max_tokens: int) -> RateTicket:
+        """acquire() that waits without blocking the event loop"""
+        ticket = RateTicket(agent, input_tokens, self.expected_output(agent, max_tokens))
+        with self._condition:
+            self._enqueue(ticket)
+
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_grant(ticket)
+                if wait == 0:
+                    return ticket
+                await asyncio.sleep(min(wait, POLL_INTERVAL))
+        finally:
+            # Cancelled while waiting: give up our place in line
+            if not ticket.granted:
+                with self._condition:
+                    self._dequeue(ticket)
+                    self._condition.notify_all()
+
+    def settle(self, ticket: RateTicket):
+        """
+        Correct a reservation with the real usage
+
+        Without usage (the call failed) the input estimate stays charged
+        and the whole output reservation is returned. With usage, the
+        agent's average output is updated for its next reservation.
+        """
+        if ticket.settled:
+            return
+        ticket.settled = True
+
+        usage = ticket.usage
+        if usage is None:
+            used_input, used_output = ticket.input_tokens, 0
+        else:
+            # Cache reads don't count toward the input token limit
+            used_input = usage.input_tokens + (getattr(usage, "cache_creation_input_tokens", 0) or 0)
+            used_output = usage.output_tokens
+
+        with self._condition:
+            if usage is not None:
+                average = self._average_output.get(ticket.agent)
+                self._average_output[ticket.agent] = used_output if average is None else (
+                    average + OUTPUT_AVERAGE_WEIGHT * (used_output - average)
+                )
+            buckets = self.buckets
+            if "input_tokens" in buckets:
+                buckets["input_tokens"].give_back(ticket.input_tokens - used_input)
+            if "output_tokens" in buckets:
+                buckets["output_tokens"].give_back(ticket.output_tokens - used_output)
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, agent: str, input_tokens: int, max_tokens: int):
+        """acquire() ... settle() around a blocking call"""
+        ticket = self.acquire(agent, input_tokens, max_tokens)
+        try:
+            yield ticket
+        finally:
+            self.settle(ticket)
+
+    @asynccontextmanager
+    async def reserve_async(self, agent: str, input_tokens: int, max_tokens: int):
+        """acquire_async() ... settle() around an async call"""
+        ticket = await self.acquire_async(agent, input_tokens, max_tokens)
+        try:
+            yield ticket
+        finally:
+            self.settle(ticket)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times and bucket levels"""
+        with self._condition:
+            now = time.monotonic()
+            for bucket in self.buckets.values():
+                bucket.wait_time(0, now)  # refill so levels are current
+
+            granted = self.stats["granted"]
+            return {
+                "queue_depth": self._waiting,
+                "urgent_queued": len(self._urgent_waiting),
+                "queued_by_agent": {
+                    agent: len(queue) for agent, queue in self._queues.items() if queue
+                },
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.stats.items()},
+                "avg_wait": round(self.stats["total_wait"] / granted, 3) if granted else 0.0,
+                "agents": {
+                    agent: {**stats, "total_wait": round(stats["total_wait"], 3)}
+                    for agent, stats in self._agent_stats.items()
+                },
+                "available": {
+                    name: int(bucket.tokens) for name, bucket in self.buckets.items()
+                },
+                "limits_per_minute": {
+                    name: int(bucket.capacity) for name, bucket in self.buckets.items()
+                },
+                "limits_from_headers": sorted(self._learned),
+                "expected_output": {agent: int(average) for agent, average in self._average_output.items()},
+            }
+
+
+# Create the global rate limiter (shared by all agents in this process)
+rate_limiter = RateLimiter()
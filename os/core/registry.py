@@ -0,0 +1,158 @@
+"""
+Agent Registry for Beechwood OS
+The company directory: which AI employees exist and how to reach them
+
+Each agent module registers its class once (name, aliases, capabilities)
+when it's imported. PULSE discovers every module in the agents package on
+first lookup, so adding a department means dropping a module into
+os/agents - no edits to the coordinator.
+"""
+
+import importlib
+import pkgutil
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+class AgentSpec:
+    """Directory entry for one AI employee"""
+
+    def __init__(
+        self,
+        key: str,
+        name: str,
+        department: str,
+        specialty: str,
+        aliases: List[str],
+        capabilities: List[str],
+        factory: Callable[[], Any]
+    ):
+        self.key = key
+        self.name = name
+        self.department = department
+        self.specialty = specialty
+        self.aliases = aliases
+        self.capabilities = capabilities
+        self.factory = factory
+
+    def describe(self) -> Dict[str, Any]:
+        """Public description (no instance is created)"""
+        return {
+            "key": self.key,
+            "name": self.name,
+            "department": self.department,
+            "specialty": self.specialty,
+            "aliases": list(self.aliases),
+            "capabilities": list(self.capabilities),
+        }
+
+
+class AgentRegistry:
+    """
+    Registry of AI employees with a precomputed routing table
+
+    Lookups by key, alias, display name or department are a single dict
+    access. Agent instances are still created lazily by their factories.
+    """
+
+    def __init__(self, package: str = "agents"):
+        """
+        Args:
+            package: Package scanned for agent modules by discover()
+        """
+        self.package = package
+        self._specs: Dict[str, AgentSpec] = {}
+        self._routes: Dict[str, str] = {}
+        self._discovered = False
+        self._lock = threading.RLock()
+
+        # Bumped on every registration so routing tables know to rebuild
+        self.version = 0
+
+    def register(self, agent_class: Any, factory: Optional[Callable[[], Any]] = None) -> AgentSpec:
+        """
+        Register an agent class
+
+        Args:
+            agent_class: A BaseAgent subclass (reads agent_key, name,
+                         department, specialty, aliases, capabilities)
+            factory: Returns the agent instance (defaults to the class itself)
+
+        Returns:
+            The registered AgentSpec
+        """
+        spec = AgentSpec(
+            key=agent_class.agent_key,
+            name=agent_class.name,
+            department=agent_class.department,
+            specialty=agent_class.specialty,
+            aliases=list(getattr(agent_class, "aliases", [])),
+            capabilities=list(getattr(agent_class, "capabilities", [])),
+            factory=factory or agent_class,
+        )
+
+        with self._lock:
+            self._specs[spec.key] = spec
+
+            # Every way of naming the agent maps straight to its key
+            for route in [spec.key, spec.name, spec.department, *spec.aliases]:
+                if route:
+                    self._routes[route.lower()] = spec.key
+
+            self.version += 1
+
+        return spec
+
+    def discover(self, force: bool = False):
+        """
+        Import every module in the agents package (once)
+
+        Modules register themselves on import, so this fills the directory.
+        """
+        if self._discovered and not force:
+            return
+
+        with self._lock:
+            if self._discovered and not force:
+                return
+
+            package = importlib.import_module(self.package)
+            for module in pkgutil.iter_modules(package.__path__):
+                if not module.name.startswith("_"):
+                    importlib.import_module(f"{self.package}.{module.name}")
+
+            self._discovered = True
+
+    def resolve(self, agent_name: str) -> Optional[AgentSpec]:
+        """Find an agent's directory entry by key, alias, name or department"""
+        self.discover()
+        key = self._routes.get(agent_name.strip().lower())
+        return self._specs.get(key) if key else None
+
+    def get(self, agent_name: str) -> Optional[Any]:
+        """
+        Get an agent instance by name
+
+        Returns:
+            The agent (created on first use), or None if unknown
+        """
+        spec = self.resolve(agent_name)
+        return spec.factory() if spec else None
+
+    def names(self) -> List[str]:
+        """Keys of all registered agents"""
+        self.discover()
+        return list(self._specs.keys())
+
+    def specs(self) -> List[AgentSpec]:
+        """Directory entries of all registered agents"""
+        self.discover()
+        return list(self._specs.values())
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Descriptions of all registered agents"""
+        return [spec.describe() for spec in self.specs()]
+
+
+# Create the global agent registry
+agent_registry = AgentRegistry()
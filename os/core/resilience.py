@@ -0,0 +1,495 @@
+"""
+Resilience Layer for Beechwood OS
+Keeps a hiccup at the provider from failing a whole task
+
+- Retries: overloaded (529), rate limited (429), server errors and
+  timeouts are retried with jittered exponential backoff. If the API
+  says how long to wait (retry-after), we wait at least that long.
+- Circuit breakers: one per agent. After repeated failures the breaker
+  "opens" and calls fail fast for a while instead of piling onto an
+  unhealthy provider. Then a single probe call decides whether to close it.
+- Hedged requests (optional): if a call is slower than HEDGE_DELAY, a
+  second identical call is started and whichever answers first wins.
+  This trims tail latency at the cost of some duplicate tokens.
+
+Errors that retrying can't fix (bad request, auth) are raised right away.
+"""
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.config import config
+from core.metrics import metrics
+
+
+# HTTP statuses worth retrying (529 = Anthropic "overloaded")
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the API while an agent's breaker is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(
+            f"{name} circuit breaker is open (provider unhealthy), retry in {retry_in:.0f}s"
+        )
+
+
+def is_retryable(error: Exception) -> bool:
+    """True if the same request might succeed when tried again"""
+    headers = _headers(error)
+    if headers.get("x-should-retry") == "false":
+        return False
+
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+
+    try:
+        import anthropic
+        # APITimeoutError is a subclass of APIConnectionError
+        return isinstance(error, anthropic.APIConnectionError)
+    except ImportError:
+        return False
+
+
+def _headers(error: Exception) -> Dict[str, str]:
+    """Response headers of an API error (empty if there was no response)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    return headers if headers is not None else {}
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    How long the API asked us to wait, in seconds
+
+    Reads retry-after-ms, then retry-after (seconds or an HTTP date).
+    """
+    headers = _headers(error)
+
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, wait_hint: Optional[float] = None) -> float:
+    """
+    Seconds to wait before retry number attempt + 1
+
+    Exponential backoff with jitter (half fixed, half random) so many
+    callers that failed together don't all retry at the same instant.
+
+    Args:
+        attempt: 0 for the first retry, 1 for the second, ...
+        wait_hint: Server-provided retry-after, used as a minimum
+    """
+    ceiling = min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * (2 ** attempt))
+    delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+    if wait_hint is not None:
+        delay = max(delay, min(wait_hint, config.RETRY_MAX_DELAY))
+    return delay
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker
+
+    closed    -> calls go through; failures are counted
+    open      -> calls fail fast with CircuitOpenError
+    half_open -> after reset_timeout, one probe call is let through;
+                 success closes the breaker, failure re-opens it
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            name: Shown in errors and status (e.g., "engineering")
+            failure_threshold: Consecutive failures that open the breaker
+                               (default: CIRCUIT_FAILURE_THRESHOLD)
+            reset_timeout: Seconds to stay open before probing
+                           (default: CIRCUIT_RESET_TIMEOUT)
+        """
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def failure_threshold(self) -> int:
+        if self._failure_threshold is None:
+            return config.CIRCUIT_FAILURE_THRESHOLD
+        return self._failure_threshold
+
+    @property
+    def reset_timeout(self) -> float:
+        if self._reset_timeout is None:
+            return config.CIRCUIT_RESET_TIMEOUT
+        return self._reset_timeout
+
+    @property
+    def state(self) -> str:
+        """Current state (an open breaker past its timeout reports half_open)"""
+        if self._state == self.OPEN and self._retry_in() <= 0:
+            return self.HALF_OPEN
+        return self._state
+
+    def _retry_in(self) -> float:
+        return self._opened_at + self.reset_timeout - time.monotonic()
+
+    def before_call(self):
+        """Raise CircuitOpenError if this call should not be made"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if self._retry_in() > 0:
+                    raise CircuitOpenError(self.name, self._retry_in())
+                self._state = self.HALF_OPEN
+
+            if self._state == self.HALF_OPEN:
+                # Only one probe at a time while we find out if it recovered
+                if self._probe_in_flight:
+                    raise CircuitOpenError(self.name, 0)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        """The provider answered - close the breaker"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """The provider failed - count it, and open the breaker if needed"""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                    print(f"⚡ {self.name} circuit breaker opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """
+        A call ended without a verdict (cancelled or interrupted)
+
+        The breaker keeps its state; if that call was the half-open
+        probe, the next call may probe instead.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def reset(self):
+        """Force the breaker closed"""
+        self.record_success()
+
+    def get_status(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self._failures,
+            "times_opened": self._times_opened,
+            "retry_in": round(max(0.0, self._retry_in()), 1) if state == self.OPEN else 0.0,
+        }
+
+
+class Resilience:
+    """
+    Retry + circuit breaker + hedging around model calls, per agent
+
+    Usage:
+        response = resilience.call("engineering", lambda: client.messages.create(**params))
+        response = await resilience.call_async("security", lambda: async_client.messages.create(**params))
+
+        with resilience.stream("pulse", lambda: client.messages.stream(**params)) as stream:
+            ...
+    """
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        """The circuit breaker for an agent (created on first use)"""
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(key)
+                self._stats[key] = {
+                    "calls": 0,
+                    "retries": 0,
+                    "failures": 0,
+                    "short_circuited": 0,
+                    "hedges": 0,
+                    "hedge_wins": 0,
+                }
+            return self._breakers[key]
+
+    def _count(self, key: str, stat: str):
+        with self._lock:
+            self._stats[key][stat] += 1
+        if stat != "calls":
+            metrics.record_resilience_event(key, stat)
+
+    def _before_attempt(self, key: str, breaker: CircuitBreaker):
+        self._count(key, "calls")
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            self._count(key, "short_circuited")
+            raise
+
+    def _after_failure(
+        self,
+        key: str,
+        breaker: CircuitBreaker,
+        error: Exception,
+        attempt: int,
+        retryable: Callable[[Exception], bool] = is_retryable
+    ) -> Optional[float]:
+        """
+        Record a failed attempt and decide whether to retry
+
+        Returns:
+            Seconds to wait before retrying, or None to give up
+        """
+        if not retryable(error):
+            # The provider is healthy, the request itself was bad
+            breaker.record_success()
+            return None
+
+        breaker.record_failure()
+        self._count(key, "failures")
+
+        if attempt >= config.RETRY_MAX_RETRIES or breaker.state == CircuitBreaker.OPEN:
+            return None
+
+        delay = backoff_delay(attempt, retry_after(error))
+        self._count(key, "retries")
+        reason = getattr(error, "status_code", None) or type(error).__name__
+        print(f"🔁 {key} call failed ({reason}), retry {attempt + 1}/{config.RETRY_MAX_RETRIES} in {delay:.1f}s")
+        return delay
+
+    def call(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        hedge: bool = True,
+        retryable: Callable[[Exception], bool] = is_retryable
+    ) -> Any:
+        """
+        Run a blocking API call with retries and the agent's breaker
+
+        Args:
+            key: Agent key (one breaker per agent)
+            fn: Makes the call; invoked again for each attempt
+            hedge: Allow a hedged duplicate if HEDGE_DELAY is set
+            retryable: Which errors are worth another attempt
+                       (default: is_retryable, for model API errors)
+
+        Returns:
+            Whatever fn returns
+        """
+        breaker = self.breaker(key)
+        attempt = 0
+
+        while True:
+            self._before_attempt(key, breaker)
+            try:
+                result = self._hedged(key, fn) if hedge else fn()
+            except Exception as error:
+                delay = self._after_failure(key, breaker, error, attempt, retryable)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Interrupted: otherwise a half-open probe would never finish
+                breaker.release_probe()
+                raise
+
+            breaker.record_success()
+            return result
+
+    async def call_async(self, key: str, fn: Callable[[], Awaitable[Any]], hedge: bool = True) -> Any:
+        """Async version of call(); fn returns a new awaitable per attempt"""
+        breaker = self.breaker(key)
+        attempt = 0
+
+        while True:
+            self._before_attempt(key, breaker)
+            try:
+                result = await (self._hedged_async(key, fn) if hedge else fn())
+            except Exception as error:
+                delay = self._after_failure(key, breaker, error, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled (e.g., a request deadline): free the half-open probe
+                breaker.release_probe()
+                raise
+
+            breaker.record_success()
+            return result
+
+    def _hedged(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn, starting a duplicate if the first is slower than HEDGE_DELAY"""
+        delay = config.HEDGE_DELAY
+        if delay <= 0:
+            return fn()
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="hedge")
+        # Attempts run in a copy of our context, so they keep urgent() and the session
+        first = self._executor.submit(contextvars.copy_context().run, fn)
+
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        self._count(key, "hedges")
+        second = self._executor.submit(contextvars.copy_context().run, fn)
+
+        # First success wins; only fail if both attempts fail.
+        # (A losing thread can't be interrupted; its answer is discarded.)
+        pending, error = {first, second}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self._count(key, "hedge_wins")
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _hedged_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of _hedged(); the losing request is cancelled"""
+        delay = config.HEDGE_DELAY
+        if delay <= 0:
+            return await fn()
+
+        first = asyncio.ensure_future(fn())
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return first.result()
+
+            self._count(key, "hedges")
+            second = asyncio.ensure_future(fn())
+            tasks.add(second)
+
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._count(key, "hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    @contextmanager
+    def stream(self, key: str, open_stream: Callable[[], Any]):
+        """
+        Open a streaming call with retries and the agent's breaker
+
+        Only opening the stream is retried: once text has been sent to
+        the caller, a failure mid-stream is raised as-is.
+
+        Args:
+            key: Agent key
+            open_stream: Returns a stream manager, e.g.
+                         lambda: client.messages.stream(**params)
+        """
+        def _open():
+            manager = open_stream()
+            return manager, manager.__enter__()
+
+        manager, stream = self.call(key, _open, hedge=False)
+        try:
+            yield stream
+        finally:
+            manager.__exit__(None, None, None)
+
+    @asynccontextmanager
+    async def stream_async(self, key: str, open_stream: Callable[[], Any]):
+        """Async version of stream()"""
+        async def _open():
+            manager = open_stream()
+            return manager, await manager.__aenter__()
+
+        manager, stream = await self.call_async(key, _open, hedge=False)
+        try:
+            yield stream
+        finally:
+            await manager.__aexit__(None, None, None)
+
+    def get_status(self, key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Breaker state and retry counters
+
+        Args:
+            key: One agent's status, or all agents when omitted
+        """
+        if key is not None:
+            breaker = self.breaker(key)
+            return {"circuit": breaker.get_status(), **self._stats[key]}
+
+        return {name: self.get_status(name) for name in list(self._breakers)}
+
+
+# Create the global resilience layer (shared by all agents)
+resilience = Resilience()
@@ -0,0 +1,278 @@
+"""
+Response Cache for Beechwood OS
+Remembers answers to identical requests so we don't pay for them twice
+
+Re-running the same script or asking Security AI about the same feature
+again produces exactly the same request. The cache key covers everything
+that affects the answer (agent, model, system prompt, messages, params),
+so a hit is only ever served for a byte-for-byte identical request.
+
+Tiers:
+- Memory: per-process LRU with TTL (always on when caching is enabled)
+- Redis: optional shared tier (Upstash REST, or any redis-py style client,
+  e.g. a local Redis at REDIS_URL)
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+from core.config import config
+
+
+KEY_PREFIX = "beechwood:response:"
+
+
+class CachedMessage:
+    """
+    Stand-in for an API response served from cache
+
+    Has the same attributes the agents read from a real response
+    (content, usage, model). Usage is zero because nothing was spent.
+    """
+
+    cached = True
+
+    def __init__(self, text: str, model: str):
+        self.content = [SimpleNamespace(type="text", text=text)]
+        self.model = model
+        self.usage = SimpleNamespace(
+            input_tokens=0,
+            output_tokens=0,
+            cache_creation_input_tokens=0,
+            cache_read_input_tokens=0,
+        )
+
+
+class MemoryCache:
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int):
+        with self._lock:
+            expires_at = time.monotonic() + ttl if ttl else 0
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    """
+    Content-addressed cache for agent calls
+
+    Usage:
+        key = response_cache.make_key("engineering", params)
+        hit = response_cache.get(key)
+        ...
+        response_cache.set(key, text, model)
+    """
+
+    def __init__(self, redis_client: Any = None):
+        """
+        Args:
+            redis_client: Optional Redis-like client with get(key) and
+                          set(key, value, ex=seconds). When omitted, one is
+                          built from config on first use (if enabled).
+        """
+        self._memory: Optional[MemoryCache] = None
+        self._redis = redis_client
+        self._redis_checked = redis_client is not None
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "hits": 0,
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "writes": 0,
+            "redis_errors": 0,
+        }
+
+    @property
+    def memory(self) -> MemoryCache:
+        """The in-process tier (sized from config on first use)"""
+        if self._memory is None:
+            with self._lock:
+                if self._memory is None:
+                    self._memory = MemoryCache(config.RESPONSE_CACHE_MAX_ENTRIES)
+        return self._memory
+
+    @property
+    def enabled(self) -> bool:
+        return config.RESPONSE_CACHE_ENABLED
+
+    @property
+    def redis(self):
+        """The Redis tier client (built from config on first use), or None"""
+        if not self._redis_checked:
+            with self._lock:
+                if not self._redis_checked:
+                    self._redis = self._connect_redis()
+                    self._redis_checked = True
+        return self._redis
+
+    def _connect_redis(self):
+        """Build a Redis client from config (Upstash REST first, then REDIS_URL)"""
+        if not config.RESPONSE_CACHE_REDIS:
+            return None
+
+        try:
+            if config.UPSTASH_REDIS_REST_URL and config.UPSTASH_REDIS_REST_TOKEN:
+                from upstash_redis import Redis
+                return Redis(url=config.UPSTASH_REDIS_REST_URL, token=config.UPSTASH_REDIS_REST_TOKEN)
+
+            if config.REDIS_URL:
+                import redis
+                return redis.Redis.from_url(config.REDIS_URL)
+        except Exception as e:
+            print(f"⚠️  Response cache: Redis unavailable, using memory only ({str(e)})")
+
+        return None
+
+    def make_key(self, agent: str, params: Dict[str, Any]) -> str:
+        """
+        Build the cache key for a request
+
+        Args:
+            agent: Agent key (e.g., "security")
+            params: The exact messages.create parameters
+
+        Returns:
+            Hex digest that identifies the request
+        """
+        other = {k: v for k, v in params.items() if k not in ("system", "messages", "model")}
+        system_hash = hashlib.sha256(
+            json.dumps(params.get("system"), sort_keys=True).encode()
+        ).hexdigest()
+
+        payload = json.dumps({
+            "agent": agent,
+            "model": params.get("model"),
+            "system": system_hash,
+            "messages": params.get("messages"),
+            "params": other,
+        }, sort_keys=True, default=str)
+
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedMessage]:
+        """Look a request up in memory, then Redis"""
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["hits"] += 1
+            self.stats["memory_hits"] += 1
+            return CachedMessage(value["text"], value["model"])
+
+        value = self._redis_get(key)
+        if value is not None:
+            # Promote to the memory tier for next time
+            self.memory.set(key, value, config.RESPONSE_CACHE_TTL)
+            self.stats["hits"] += 1
+            self.stats["redis_hits"] += 1
+            return CachedMessage(value["text"], value["model"])
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, text: str, model: str, ttl: Optional[int] = None):
+        """Store an answer in every tier"""
+        ttl = config.RESPONSE_CACHE_TTL if ttl is None else ttl
+        value = {"text": text, "model": model}
+
+        self.memory.set(key, value, ttl)
+        self._redis_set(key, value, ttl)
+        self.stats["writes"] += 1
+
+    async def get_async(self, key: str) -> Optional[CachedMessage]:
+        """get() that keeps Redis round trips off the event loop"""
+        if self.redis is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: str, text: str, model: str, ttl: Optional[int] = None):
+        """set() that keeps Redis round trips off the event loop"""
+        if self.redis is None:
+            return self.set(key, text, model, ttl)
+        await asyncio.to_thread(self.set, key, text, model, ttl)
+
+    def record_bypass(self):
+        """Count a call that skipped the cache on purpose"""
+        self.stats["bypassed"] += 1
+
+    def _redis_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(KEY_PREFIX + key)
+            if raw is None:
+                return None
+            if isinstance(raw, bytes):
+                raw = raw.decode()
+            return json.loads(raw)
+        except Exception:
+            self.stats["redis_errors"] += 1
+            return None
+
+    def _redis_set(self, key: str, value: Dict[str, Any], ttl: int):
+        if self.redis is None:
+            return
+        try:
+            if ttl:
+                self.redis.set(KEY_PREFIX + key, json.dumps(value), ex=ttl)
+            else:
+                self.redis.set(KEY_PREFIX + key, json.dumps(value))
+        except Exception:
+            self.stats["redis_errors"] += 1
+
+    def clear(self):
+        """Empty the memory tier (Redis entries expire on their own)"""
+        self.memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier info"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "enabled": self.enabled,
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "redis_tier": self._redis is not None,
+            "ttl": config.RESPONSE_CACHE_TTL,
+        }
+
+
+# Create a global response cache
+response_cache = ResponseCache()
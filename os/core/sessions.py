@@ -0,0 +1,288 @@
+"""
+Session Memory for Beechwood OS
+Gives every user session its own conversation with each agent
+
+PULSE and the AI employees are shared, process-wide objects. Their
+memory is not: each session ID gets its own Conversation per agent, so
+concurrent users never see (or overwrite) each other's context.
+
+Usage:
+    with use_session("ceo-laptop"):
+        pulse.process_request("Where are we on Beacon?")
+        engineering_ai.review_code(code, "app.tsx")
+
+Code that never picks a session uses the agent's own memory (the single
+shared conversation the agents always had); it is not managed here.
+
+Resident sessions are kept in check:
+- sessions unused for SESSION_COLD_AFTER seconds are frozen: their
+  turns are compressed (zlib, or zstd) and unpacked on next use
+- sessions unused for SESSION_IDLE_TIMEOUT seconds are evicted
+- past SESSION_MEMORY_LIMIT_MB, the least recently used sessions are
+  frozen first and evicted once frozen; past SESSION_MAX_SESSIONS they
+  are evicted
+Evicting only drops the in-memory copy. Turns are already in the
+conversation store (core.store), so a returning session is read back on
+first use. A session in the middle of a turn is never frozen or evicted.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from core.config import config
+from core.memory import Conversation
+
+
+# Session in use for the current request (follows tasks and copied contexts)
+_current_session: ContextVar[Optional[str]] = ContextVar("session_id", default=None)
+
+# Sessions used within this many seconds are not evicted (they may be
+# between looking up their memory and adding the first turn)
+EVICTION_GRACE_SECONDS = 1.0
+
+# Without memory pressure, look for idle sessions at most this often (seconds)
+SWEEP_INTERVAL = 1.0
+
+# How many of the largest sessions get_status() lists
+STATUS_TOP_SESSIONS = 20
+
+
+@contextmanager
+def use_session(session_id: Optional[str]):
+    """
+    Make agent calls inside this block use one session's memory
+
+    Args:
+        session_id: Session to use (None = the agents' own memory)
+    """
+    token = _current_session.set(session_id or None)
+    try:
+        yield
+    finally:
+        _current_session.reset(token)
+
+
+def current_session() -> Optional[str]:
+    """Session ID in use right now (None = outside of any session)"""
+    return _current_session.get()
+
+
+class SessionState:
+    """One session's conversations (one per agent) and its bookkeeping"""
+
+    __slots__ = ("session_id", "conversations", "last_used", "size_bytes")
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.conversations: Dict[str, Conversation] = {}
+        self.last_used = time.monotonic()
+        self.size_bytes = 0  # as of the last finished turn
+
+    @property
+    def busy(self) -> bool:
+        return any(conversation.busy for conversation in self.conversations.values())
+
+    @property
+    def cold(self) -> bool:
+        return any(conversation.cold for conversation in self.conversations.values())
+
+    def measure(self) -> int:
+        """Current memory held by all of this session's conversations"""
+        return sum(conversation.size_bytes for conversation in self.conversations.values())
+
+    def describe(self, now: float) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "memory_bytes": self.measure(),
+            "cold": self.cold,
+            "idle_seconds": round(now - self.last_used, 1),
+            "agents": {
+                agent_key: {"messages": conversation.resident_messages, "memory_bytes": conversation.size_bytes}
+                for agent_key, conversation in self.conversations.items()
+            },
+        }
+
+
+class SessionManager:
+    """
+    Thread-safe map of session ID -> per-agent conversations
+
+    Sessions are kept in least-recently-used order, so eviction looks at
+    the oldest first and stops at the first one it has to keep.
+    """
+
+    def __init__(self):
+        """Set up an empty session table"""
+        self._lock = threading.RLock()
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._total_bytes = 0  # sum of SessionState.size_bytes
+        self._next_sweep = 0.0
+
+        self.stats = {
+            "sessions_created": 0,
+            "dropped": 0,
+            "evicted_idle": 0,
+            "evicted_lru": 0,
+            "frozen": 0,
+            "thawed": 0,
+            "saved_bytes": 0,  # memory given back by freezing, all time
+        }
+
+    def _store_key(self, session_id: str, agent_key: str) -> str:
+        """Key a conversation is saved under in the conversation store"""
+        return f"{session_id}:{agent_key}"
+
+    def conversation(self, agent_key: str, session_id: str) -> Conversation:
+        """
+        An agent's conversation in a session (created on first use)
+
+        Args:
+            agent_key: The agent
+            session_id: The session
+
+        Returns:
+            The Conversation to read from and add turns to
+        """
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = SessionState(session_id)
+                self._sessions[session_id] = state
+                self.stats["sessions_created"] += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            state.last_used = time.monotonic()
+
+            conversation = state.conversations.get(agent_key)
+            if conversation is None:
+                conversation = Conversation(agent_key, session_id=self._store_key(session_id, agent_key))
+                state.conversations[agent_key] = conversation
+            elif conversation.cold:
+                # Back in use: unpack now so the memory count stays right
+                conversation.thaw()
+                size = state.measure()
+                self._total_bytes += size - state.size_bytes
+                state.size_bytes = size
+                self.stats["thawed"] += 1
+            return conversation
+
+    def touch(self, session_id: str):
+        """
+        Update a session's memory count after a turn and enforce the limits
+
+        Called by the agents once a reply has been added.
+        """
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is not None:
+                size = state.measure()
+                self._total_bytes += size - state.size_bytes
+                state.size_bytes = size
+            self._evict(keep=session_id)
+
+    def _evict(self, keep: Optional[str] = None):
+        """
+        Freeze or evict sessions, oldest first (lock held)
+
+        - idle past SESSION_IDLE_TIMEOUT: evicted
+        - over SESSION_MAX_SESSIONS: evicted
+        - over SESSION_MEMORY_LIMIT_MB: frozen, or evicted if already frozen
+        - idle past SESSION_COLD_AFTER: frozen
+
+        Without memory pressure the scan runs at most once per
+        SWEEP_INTERVAL, so a turn doesn't pay for walking every cold session.
+        """
+        now = time.monotonic()
+        idle_timeout = config.SESSION_IDLE_TIMEOUT
+        cold_after = config.SESSION_COLD_AFTER
+        max_sessions = config.SESSION_MAX_SESSIONS
+        memory_limit = int(config.SESSION_MEMORY_LIMIT_MB * 1024 * 1024)
+
+        over_count = lambda: bool(max_sessions) and len(self._sessions) > max_sessions
+        over_memory = lambda: bool(memory_limit) and self._total_bytes > memory_limit
+
+        if now < self._next_sweep and not over_count() and not over_memory():
+            return
+        self._next_sweep = now + SWEEP_INTERVAL
+
+        for session_id in list(self._sessions):
+            state = self._sessions[session_id]
+            idle = now - state.last_used
+
+            expired = bool(idle_timeout) and idle > idle_timeout
+            stale = bool(cold_after) and idle > cold_after
+            if not (expired or stale or over_count() or over_memory()):
+                break  # everything after this one is newer
+
+            # The caller's session and sessions mid-turn stay as they are
+            if session_id == keep or idle < EVICTION_GRACE_SECONDS or state.busy:
+                continue
+
+            if expired:
+                self._remove(session_id, "evicted_idle")
+            elif over_count() or (over_memory() and state.cold):
+                self._remove(session_id, "evicted_lru")
+            elif not state.cold:
+                self._freeze(state)
+
+    def _freeze(self, state: SessionState):
+        """Compress a session's conversations into the cold tier (lock held)"""
+        saved = sum(conversation.freeze() for conversation in state.conversations.values())
+        if saved:
+            size = state.measure()
+            self._total_bytes += size - state.size_bytes
+            state.size_bytes = size
+            self.stats["frozen"] += 1
+            self.stats["saved_bytes"] += saved
+
+    def _remove(self, session_id: str, reason: str):
+        """Drop a session from memory (lock held)"""
+        state = self._sessions.pop(session_id)
+        self._total_bytes -= state.size_bytes
+        self.stats[reason] += 1
+
+    def drop(self, session_id: str) -> bool:
+        """
+        Evict a session now (e.g., the user logged out)
+
+        Returns:
+            True if the session was resident
+        """
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._remove(session_id, "dropped")
+            return True
+
+    def get_session_status(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Memory held by one session, per agent (None if not resident)"""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            return state.describe(time.monotonic()) if state else None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Resident sessions, memory used against the limits, and the largest sessions"""
+        with self._lock:
+            now = time.monotonic()
+            sessions: List[Dict[str, Any]] = [state.describe(now) for state in self._sessions.values()]
+            stats = dict(self.stats)
+
+        sessions.sort(key=lambda session: session["memory_bytes"], reverse=True)
+        return {
+            "resident_sessions": len(sessions),
+            "cold_sessions": sum(1 for session in sessions if session["cold"]),
+            "memory_bytes": sum(session["memory_bytes"] for session in sessions),
+            "memory_limit_bytes": int(config.SESSION_MEMORY_LIMIT_MB * 1024 * 1024),
+            "max_sessions": config.SESSION_MAX_SESSIONS,
+            "idle_timeout": config.SESSION_IDLE_TIMEOUT,
+            **stats,
+            "largest": sessions[:STATUS_TOP_SESSIONS],
+        }
+
+
+# Create the global session manager (shared by all agents in this process)
+sessions = SessionManager()
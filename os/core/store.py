@@ -0,0 +1,533 @@
+"""
+Conversation & Task Store for Beechwood OS
+Keeps sessions, turns and task results across restarts
+
+Backends:
+- SQLite (default): a local file, zero setup
+- Supabase (Postgres): shared storage for deployed PULSE instances
+  (create the tables with POSTGRES_SCHEMA below)
+
+Writes are write-behind: agents drop records into an in-memory queue and
+a background thread writes them in batches, so saving never adds latency
+to a request. A session's history is read back lazily, the first time
+the conversation is used after a restart.
+
+Only sessions (core.sessions.use_session, or session_id in the HTTP API)
+are saved. The agents' own memory, used outside of any session, is not:
+scripts start from a clean slate on every run.
+"""
+
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.config import config
+from core.metrics import metrics
+from core.resilience import is_retryable, resilience
+
+# Retry/breaker key for backend writes (see core.resilience)
+STORE_KEY = "store"
+
+
+def is_transient(error: Exception) -> bool:
+    """True if a failed backend write might succeed when tried again"""
+    if isinstance(error, sqlite3.OperationalError):
+        return True  # database locked or busy, disk I/O
+    try:
+        import httpx
+        if isinstance(error, httpx.TransportError):
+            return True  # Supabase unreachable or timed out
+    except ImportError:
+        pass
+    return is_retryable(error)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    agent TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    summarized_turns INTEGER NOT NULL DEFAULT 0,
+    history_start INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS turns (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    agent TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+CREATE TABLE IF NOT EXISTS task_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    task TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS task_results_session ON task_results (session_id, id);
+"""
+
+# Run once in the Supabase SQL editor
+POSTGRES_SCHEMA = """
+create table if not exists beechwood_sessions (
+    session_id text primary key,
+    agent text not null,
+    summary text not null default '',
+    summarized_turns integer not null default 0,
+    history_start integer not null default 0,
+    updated_at timestamptz not null
+);
+create table if not exists beechwood_turns (
+    session_id text not null,
+    seq integer not null,
+    agent text not null,
+    role text not null,
+    content jsonb not null,
+    created_at timestamptz not null,
+    primary key (session_id, seq)
+);
+create table if not exists beechwood_task_results (
+    id bigserial primary key,
+    session_id text not null,
+    agent text not null,
+    task text not null,
+    success boolean not null,
+    result jsonb not null,
+    created_at timestamptz not null
+);
+create index if not exists beechwood_task_results_session on beechwood_task_results (session_id, id);
+"""
+
+
+class SQLiteBackend:
+    """Local file storage"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SQLITE_SCHEMA)
+        self._lock = threading.Lock()
+
+    def write_batch(self, sessions: List[Dict], turns: List[Dict], results: List[Dict]):
+        """Write one batch of records in a single transaction"""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO sessions (session_id, agent, summary, summarized_turns, history_start, updated_at) "
+                "VALUES (:session_id, :agent, :summary, :summarized_turns, :history_start, :updated_at) "
+                "ON CONFLICT(session_id) DO UPDATE SET summary = excluded.summary, "
+                "summarized_turns = excluded.summarized_turns, history_start = excluded.history_start, "
+                "updated_at = excluded.updated_at",
+                sessions,
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO turns (session_id, seq, agent, role, content, created_at) "
+                "VALUES (:session_id, :seq, :agent, :role, :content, :created_at)",
+                [{**turn, "content": json.dumps(turn["content"])} for turn in turns],
+            )
+            self._connection.executemany(
+                "INSERT INTO task_results (session_id, agent, task, success, result, created_at) "
+                "VALUES (:session_id, :agent, :task, :success, :result, :created_at)",
+                [{**result, "result": json.dumps(result["result"], default=str)} for result in results],
+            )
+
+    def load_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT session_id, agent, summary, summarized_turns, history_start, updated_at "
+                "FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("session_id", "agent", "summary", "summarized_turns", "history_start", "updated_at")
+        return dict(zip(keys, row))
+
+    def load_turns(self, session_id: str, start: int, limit: int) -> List[Dict[str, Any]]:
+        """The newest turns at or after seq start, oldest first"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT seq, role, content FROM turns WHERE session_id = ? AND seq >= ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (session_id, start, limit),
+            ).fetchall()
+        return [
+            {"seq": seq, "role": role, "content": json.loads(content)}
+            for seq, role, content in reversed(rows)
+        ]
+
+    def load_results(self, session_id: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        query = "SELECT session_id, agent, task, success, result, created_at FROM task_results"
+        args: tuple = ()
+        if session_id:
+            query += " WHERE session_id = ?"
+            args = (session_id,)
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY id DESC LIMIT ?", args + (limit,)).fetchall()
+        return [
+            {"session_id": s, "agent": a, "task": t, "success": bool(ok), "result": json.loads(r), "created_at": c}
+            for s, a, t, ok, r, c in rows
+        ]
+
+    def list_sessions(self, agent: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        query = "SELECT session_id, agent, summarized_turns, updated_at FROM sessions"
+        args: tuple = ()
+        if agent:
+            query += " WHERE agent = ?"
+            args = (agent,)
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY updated_at DESC LIMIT ?", args + (limit,)).fetchall()
+        return [
+            {"session_id": s, "agent": a, "summarized_turns": n, "updated_at": u}
+            for s, a, n, u in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class SupabaseBackend:
+    """Supabase (Postgres) storage - tables from POSTGRES_SCHEMA"""
+
+    name = "supabase"
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    def write_batch(self, sessions: List[Dict], turns: List[Dict], results: List[Dict]):
+        if sessions:
+            self.client.table("beechwood_sessions").upsert(sessions).execute()
+        if turns:
+            self.client.table("beechwood_turns").upsert(turns).execute()
+        if results:
+            rows = [{**result, "success": bool(result["success"])} for result in results]
+            self.client.table("beechwood_task_results").insert(
+                json.loads(json.dumps(rows, default=str))
+            ).execute()
+
+    def load_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        rows = (
+            self.client.table("beechwood_sessions").select("*")
+            .eq("session_id", session_id).limit(1).execute().data
+        )
+        return rows[0] if rows else None
+
+    def load_turns(self, session_id: str, start: int, limit: int) -> List[Dict[str, Any]]:
+        rows = (
+            self.client.table("beechwood_turns").select("seq, role, content")
+            .eq("session_id", session_id).gte("seq", start)
+            .order("seq", desc=True).limit(limit).execute().data
+        )
+        return list(reversed(rows))
+
+    def load_results(self, session_id: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        query = self.client.table("beechwood_task_results").select(
+            "session_id, agent, task, success, result, created_at"
+        )
+        if session_id:
+            query = query.eq("session_id", session_id)
+        return query.order("id", desc=True).limit(limit).execute().data
+
+    def list_sessions(self, agent: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        query = self.client.table("beechwood_sessions").select(
+            "session_id, agent, summarized_turns, updated_at"
+        )
+        if agent:
+            query = query.eq("agent", agent)
+        return query.order("updated_at", desc=True).limit(limit).execute().data
+
+    def close(self):
+        pass
+
+
+class ConversationStore:
+    """
+    Write-behind store in front of a backend
+
+    Usage:
+        conversation_store.record_turns("ceo:pulse", "pulse", [(0, "user", "Hi"), (1, "assistant", "Hello")])
+        conversation_store.record_result("ceo:pulse", "pulse", "Hi", result)
+        conversation_store.load_history("ceo:pulse")
+    """
+
+    def __init__(self, backend: Any = None):
+        """
+        Args:
+            backend: A backend instance (default: built from STORE_BACKEND
+                     on first use; "none" disables persistence)
+        """
+        self._backend = backend
+        self._backend_checked = backend is not None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, int] = {}  # queued, unwritten records per session
+
+        self.stats = {
+            "queued": 0,
+            "written": 0,
+            "batches": 0,
+            "errors": 0,  # batches dropped after their retries ran out
+            "dropped": 0,  # records in those batches
+            "last_batch_size": 0,
+            "last_write_ms": 0.0,
+        }
+
+    @property
+    def backend(self):
+        """The storage backend (None when persistence is off)"""
+        if not self._backend_checked:
+            with self._lock:
+                if not self._backend_checked:
+                    self._backend = self._connect()
+                    self._backend_checked = True
+        return self._backend
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _connect(self):
+        """Build the configured backend"""
+        kind = config.STORE_BACKEND.lower()
+        try:
+            if kind == "sqlite":
+                return SQLiteBackend(config.STORE_SQLITE_PATH)
+            if kind == "supabase":
+                return SupabaseBackend(config.get_supabase_client())
+        except Exception as e:
+            print(f"⚠️  Conversation store unavailable, not persisting ({str(e)})")
+        return None
+
+    def _start_writer(self):
+        """Start the background writer thread (once)"""
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="store-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _enqueue(self, kind: str, record: Dict[str, Any]):
+        if not self.enabled:
+            return
+        self._start_writer()
+        with self._lock:
+            self._pending[record["session_id"]] = self._pending.get(record["session_id"], 0) + 1
+        self._queue.put((kind, record))
+        self.stats["queued"] += 1
+
+    # ----- Writes (never block the caller) -----
+
+    def record_turns(self, session_id: str, agent: str, turns: List[tuple]):
+        """Queue turns: a list of (seq, role, content)"""
+        now = datetime.now().isoformat()
+        for seq, role, content in turns:
+            self._enqueue("turn", {
+                "session_id": session_id,
+                "seq": seq,
+                "agent": agent,
+                "role": role,
+                "content": content,
+                "created_at": now,
+            })
+
+    def record_session(
+        self,
+        session_id: str,
+        agent: str,
+        summary: str,
+        summarized_turns: int,
+        history_start: int
+    ):
+        """Queue a session update (summary and where its live history starts)"""
+        self._enqueue("session", {
+            "session_id": session_id,
+            "agent": agent,
+            "summary": summary,
+            "summarized_turns": summarized_turns,
+            "history_start": history_start,
+            "updated_at": datetime.now().isoformat(),
+        })
+
+    def record_result(self, session_id: str, agent: str, task: str, result: Dict[str, Any]):
+        """Queue a task result"""
+        self._enqueue("result", {
+            "session_id": session_id,
+            "agent": agent,
+            "task": task,
+            "success": 1 if result.get("success") else 0,
+            "result": result,
+            "created_at": datetime.now().isoformat(),
+        })
+
+    # ----- Background writing -----
+
+    def _write_loop(self):
+        """Collect records for up to STORE_FLUSH_INTERVAL, then write them together"""
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            deadline = time.monotonic() + config.STORE_FLUSH_INTERVAL
+
+            while len(batch) < config.STORE_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._write(batch)
+
+    def _write(self, batch: List[tuple]):
+        """
+        Write a batch (sessions are collapsed to their latest state)
+
+        Transient failures are retried with backoff through the resilience
+        layer, in place so writes stay in order (a session row retried
+        later could overwrite a newer one). The batch is dropped, and
+        counted, only once the retries run out.
+        """
+        with self._flush_lock:
+            sessions: Dict[str, Dict[str, Any]] = {}
+            turns, results = [], []
+            for kind, record in batch:
+                if kind == "session":
+                    sessions[record["session_id"]] = record
+                elif kind == "turn":
+                    turns.append(record)
+                else:
+                    results.append(record)
+
+            # Every turn's session must exist (turns reference it)
+            for turn in turns:
+                sessions.setdefault(turn["session_id"], None)
+
+            started = time.monotonic()
+            try:
+                resilience.call(
+                    STORE_KEY,
+                    lambda: self.backend.write_batch(self._with_session_rows(sessions, turns), turns, results),
+                    hedge=False,
+                    retryable=is_transient,
+                )
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.stats["dropped"] += len(batch)
+                metrics.record_resilience_event(STORE_KEY, "dropped")
+                print(f"⚠️  Conversation store write failed, {len(batch)} records dropped: {str(e)}")
+            finally:
+                self.stats["last_batch_size"] = len(batch)
+                self.stats["last_write_ms"] = round((time.monotonic() - started) * 1000, 2)
+                with self._lock:
+                    for _, record in batch:
+                        left = self._pending.pop(record["session_id"]) - 1
+                        if left:
+                            self._pending[record["session_id"]] = left
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _with_session_rows(self, sessions: Dict[str, Any], turns: List[Dict]) -> List[Dict]:
+        """Session rows to upsert: explicit updates plus placeholders for new sessions"""
+        rows = []
+        for session_id, record in sessions.items():
+            if record is None:
+                existing = self.backend.load_session(session_id)
+                if existing is not None:
+                    continue
+                agent = next(t["agent"] for t in turns if t["session_id"] == session_id)
+                record = {
+                    "session_id": session_id,
+                    "agent": agent,
+                    "summary": "",
+                    "summarized_turns": 0,
+                    "history_start": 0,
+                    "updated_at": datetime.now().isoformat(),
+                }
+            rows.append(record)
+        return rows
+
+    def flush(self):
+        """Block until everything queued so far is written"""
+        if self._writer is not None:
+            self._queue.join()
+
+    # ----- Reads (lazy, on first use of a session) -----
+
+    def load_history(self, session_id: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        A session's saved state
+
+        Returns:
+            Dictionary with summary, summarized_turns, history_start, next_seq
+            and turns (the newest `limit` turns, oldest first; each has seq,
+            role and content). Empty if nothing was saved.
+        """
+        empty = {"summary": "", "summarized_turns": 0, "history_start": 0, "next_seq": 0, "turns": []}
+        if not self.enabled:
+            return empty
+
+        # Only wait for the writer if this session has writes in the queue
+        if self._pending.get(session_id):
+            self.flush()
+        session = self.backend.load_session(session_id)
+        if session is None:
+            return empty
+
+        limit = config.STORE_HISTORY_LOAD_LIMIT if limit is None else limit
+        turns = self.backend.load_turns(session_id, session["history_start"], limit)
+        next_seq = turns[-1]["seq"] + 1 if turns else session["history_start"]
+
+        return {
+            "summary": session["summary"],
+            "summarized_turns": session["summarized_turns"],
+            "history_start": session["history_start"],
+            "next_seq": next_seq,
+            "turns": turns,
+        }
+
+    def load_results(self, session_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent task results (for one session, or all)"""
+        if not self.enabled:
+            return []
+        self.flush()
+        return self.backend.load_results(session_id, limit)
+
+    def list_sessions(self, agent: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recently updated sessions"""
+        if not self.enabled:
+            return []
+        self.flush()
+        return self.backend.list_sessions(agent, limit)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name if self.enabled else None,
+            "pending": self._queue.qsize(),
+            **self.stats,
+        }
+
+
+# Create the global conversation store (backend connects on first use)
+conversation_store = ConversationStore()
@@ -0,0 +1,386 @@
+"""
+Priority Task Queue for Beechwood OS
+Makes sure BEACON's safety-critical work never waits behind routine work
+
+Tasks are submitted with a priority class and an optional deadline and
+run on a small worker pool:
+
+- Ordering: higher class first; within a class, earliest deadline first,
+  then first come, first served.
+- Reserved capacity: some workers only take EMERGENCY tasks, so an
+  emergency always finds a free worker even when the pool is saturated.
+  Emergency tasks also jump the shared rate limiter's line.
+- Admission control: when the queue fills up, low-priority work is turned
+  away (or pushed out by more important work) instead of making
+  everything slow. Tasks whose deadline passes while queued are dropped.
+  EMERGENCY tasks are always admitted.
+"""
+
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import Future
+from enum import IntEnum
+from heapq import heappop, heappush
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import config
+from core.rate_limiter import urgent
+
+
+class Priority(IntEnum):
+    """Priority classes (lower value = more important)"""
+
+    EMERGENCY = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
+# Share of TASK_QUEUE_MAX_DEPTH each class may fill before it is turned away
+ADMISSION_SHARE = {
+    Priority.EMERGENCY: None,  # always admitted
+    Priority.HIGH: 1.0,
+    Priority.NORMAL: 0.8,
+    Priority.LOW: 0.5,
+}
+
+# Only a live incident is an emergency: "SOS alerts are failing", not
+# "refactor the emergency contacts screen". Safety-critical *work* is
+# marked explicitly (priority=..., or an agent's urgent_methods).
+_EMERGENCY_PATTERN = re.compile(
+    r"\b(?:"
+    r"(?:production|prod|beacon|the app|sos|(?:sos|emergency) (?:alerts?|messages?|calls?|button)|"
+    r"alerts?|push notifications?|location sharing) (?:(?:is|are) )?"
+    r"(?:down|failing|broken|not (?:working|sending|going out|delivering|arriving))"
+    r"|(?:users?|people|customers?) (?:can'?t|cannot|can not|are unable to) "
+    r"(?:send|receive|trigger|reach) (?:an? |their )?(?:sos|alerts?|emergency|help|911)"
+    r"|(?:active|ongoing|live) emergency"
+    r")\b",
+    re.IGNORECASE,
+)
+_HIGH_PATTERN = re.compile(
+    r"\b(outage|incident|breach|exploit|vulnerabilit\w*|data leak)\b",
+    re.IGNORECASE,
+)
+
+
+def detect_priority(text: str, default: Priority = Priority.NORMAL) -> Priority:
+    """
+    Guess a task's priority from its wording
+
+    A live incident (production or SOS delivery down, users unable to
+    send alerts) -> EMERGENCY, incidents and vulnerabilities -> HIGH,
+    everything else -> default. Merely mentioning emergencies or SOS
+    doesn't count - pass the priority explicitly for that work.
+    """
+    if _EMERGENCY_PATTERN.search(text):
+        return Priority.EMERGENCY
+    if _HIGH_PATTERN.search(text):
+        return Priority.HIGH
+    return default
+
+
+class TaskRejectedError(Exception):
+    """A task was shed by admission control or missed its deadline"""
+
+    def __init__(self, name: str, priority: Priority, reason: str):
+        self.name = name
+        self.priority = priority
+        self.reason = reason
+        super().__init__(f"Task '{name}' ({priority.name}) rejected: {reason}")
+
+
+class QueuedTask:
+    """One task waiting in the queue"""
+
+    __slots__ = ("priority", "deadline", "sequence", "name", "fn", "args", "kwargs", "context", "future", "enqueued_at", "removed")
+
+    def __init__(self, priority, deadline, sequence, name, fn, args, kwargs):
+        self.priority = priority
+        self.deadline = deadline
+        self.sequence = sequence
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.context = contextvars.copy_context()  # the submitter's session etc.
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+        self.removed = False
+
+    def sort_key(self):
+        # Tasks without a deadline sort after those with one (same class)
+        return (self.priority, self.deadline or float("inf"), self.sequence)
+
+    def __lt__(self, other: "QueuedTask") -> bool:
+        return self.sort_key() < other.sort_key()
+
+
+class TaskQueue:
+    """
+    Priority queue + worker pool in front of the agents
+
+    Usage:
+        future = task_queue.submit(security_ai.design_emergency_system, description,
+                                   priority=Priority.EMERGENCY)
+        result = future.result()
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        reserved_workers: Optional[int] = None,
+        max_depth: Optional[int] = None
+    ):
+        """
+        Args:
+            workers: Total worker threads (default: TASK_QUEUE_WORKERS)
+            reserved_workers: How many of them only run EMERGENCY tasks
+                              (default: TASK_QUEUE_RESERVED_WORKERS)
+            max_depth: Queue size that counts as overload
+                       (default: TASK_QUEUE_MAX_DEPTH)
+        """
+        self._workers_setting = workers
+        self._reserved_setting = reserved_workers
+        self._max_depth = max_depth
+
+        self._heap: List[QueuedTask] = []
+        self._depth = 0
+        self._sequence = 0
+        self._threads: List[threading.Thread] = []
+        self._running = 0
+        self._stopping = False
+        self._condition = threading.Condition()
+
+        self.stats: Dict[str, Dict[str, Any]] = {
+            priority.name: {
+                "submitted": 0,
+                "completed": 0,
+                "failed": 0,
+                "shed": 0,
+                "expired": 0,
+                "total_wait": 0.0,
+                "max_wait": 0.0,
+            }
+            for priority in Priority
+        }
+
+    @property
+    def max_depth(self) -> int:
+        return config.TASK_QUEUE_MAX_DEPTH if self._max_depth is None else self._max_depth
+
+    def _start_workers(self):
+        """Start the worker pool on first use (lock must be held)"""
+        if self._threads:
+            return
+
+        workers = config.TASK_QUEUE_WORKERS if self._workers_setting is None else self._workers_setting
+        reserved = config.TASK_QUEUE_RESERVED_WORKERS if self._reserved_setting is None else self._reserved_setting
+        workers = max(workers, reserved + 1)  # always at least one general worker
+
+        for index in range(workers):
+            emergency_only = index < reserved
+            thread = threading.Thread(
+                target=self._worker,
+                args=(emergency_only,),
+                name=f"task-queue-{'emergency' if emergency_only else 'general'}-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        priority: Priority = Priority.NORMAL,
+        deadline: Optional[float] = None,
+        name: Optional[str] = None,
+        **kwargs
+    ) -> Future:
+        """
+        Queue a call
+
+        Args:
+            fn: What to run (e.g., pulse.route_to_agent)
+            *args / **kwargs: Passed to fn
+            priority: Priority class
+            deadline: Seconds from now by which the task should start;
+                      it is dropped if still queued after that
+            name: Label for stats and errors
+
+        Returns:
+            A Future with fn's return value. It raises TaskRejectedError
+            if the task was shed or expired.
+        """
+        priority = Priority(priority)
+        name = name or getattr(fn, "__name__", "task")
+
+        with self._condition:
+            self._start_workers()
+            self._sequence += 1
+            entry = QueuedTask(
+                priority,
+                time.monotonic() + deadline if deadline else None,
+                self._sequence,
+                name,
+                fn,
+                args,
+                kwargs,
+            )
+            self.stats[priority.name]["submitted"] += 1
+
+            if not self._admit(entry):
+                self._reject(entry, "queue full (shed under overload)", "shed")
+                return entry.future
+
+            heappush(self._heap, entry)
+            self._depth += 1
+            self._condition.notify_all()
+
+        return entry.future
+
+    def _admit(self, entry: QueuedTask) -> bool:
+        """
+        Admission control (lock must be held)
+
+        A class that has used up its share of the queue is turned away,
+        unless something less important is queued that it can replace.
+        """
+        share = ADMISSION_SHARE[entry.priority]
+        if share is None or self._depth < self.max_depth * share:
+            return True
+
+        # Tasks their callers cancelled give their place back first
+        for task in self._heap:
+            if not task.removed and task.future.cancelled():
+                task.removed = True
+                self._depth -= 1
+        if self._depth < self.max_depth * share:
+            return True
+
+        # Push out the least important queued task (latest deadline last)
+        queued = [task for task in self._heap if not task.removed]
+        victim = max(queued, key=QueuedTask.sort_key, default=None)
+        if victim is None or victim.priority <= entry.priority:
+            return False
+
+        victim.removed = True
+        self._depth -= 1
+        self._reject(victim, "displaced by higher-priority work", "shed")
+        return True
+
+    def _reject(self, entry: QueuedTask, reason: str, stat: str):
+        """Fail a task's future without running it"""
+        if not entry.future.set_running_or_notify_cancel():
+            return  # cancelled by the caller; nothing is waiting on it
+        self.stats[entry.priority.name][stat] += 1
+        print(f"🚫 Task '{entry.name}' ({entry.priority.name}) not run: {reason}")
+        entry.future.set_exception(TaskRejectedError(entry.name, entry.priority, reason))
+
+    def _take(self, emergency_only: bool) -> Optional[QueuedTask]:
+        """Next task this worker may run, or None (lock must be held)"""
+        while self._heap:
+            entry = self._heap[0]
+            if entry.removed:
+                heappop(self._heap)
+                continue
+            if emergency_only and entry.priority != Priority.EMERGENCY:
+                return None
+            heappop(self._heap)
+            self._depth -= 1
+            return entry
+        return None
+
+    def _worker(self, emergency_only: bool):
+        """Worker loop: take the most important task, run it, repeat"""
+        while True:
+            with self._condition:
+                entry = self._take(emergency_only)
+                while entry is None:
+                    if self._stopping:
+                        return
+                    self._condition.wait()
+                    entry = self._take(emergency_only)
+                self._running += 1
+
+            try:
+                self._run(entry)
+            finally:
+                with self._condition:
+                    self._running -= 1
+
+    def _run(self, entry: QueuedTask):
+        """Run one task and resolve its future"""
+        stats = self.stats[entry.priority.name]
+        now = time.monotonic()
+
+        if entry.deadline and now > entry.deadline:
+            self._reject(entry, "deadline passed while queued", "expired")
+            return
+        if not entry.future.set_running_or_notify_cancel():
+            return  # cancelled by the caller
+
+        waited = now - entry.enqueued_at
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+
+        try:
+            result = entry.context.run(self._call, entry)
+        except BaseException as e:
+            stats["failed"] += 1
+            entry.future.set_exception(e)
+        else:
+            stats["completed"] += 1
+            entry.future.set_result(result)
+
+    def _call(self, entry: QueuedTask) -> Any:
+        """Call the task's function (emergency work skips the rate limit line)"""
+        if entry.priority == Priority.EMERGENCY:
+            with urgent():
+                return entry.fn(*entry.args, **entry.kwargs)
+        return entry.fn(*entry.args, **entry.kwargs)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers once the queue is empty"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+            threads = list(self._threads)
+
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, running tasks and per-class counters"""
+        with self._condition:
+            depth_by_class = {priority.name: 0 for priority in Priority}
+            for entry in self._heap:
+                if not entry.removed:
+                    depth_by_class[entry.priority.name] += 1
+
+            classes = {}
+            for name, stats in self.stats.items():
+                started = stats["completed"] + stats["failed"]
+                classes[name] = {
+                    **stats,
+                    "queued": depth_by_class[name],
+                    "total_wait": round(stats["total_wait"], 3),
+                    "max_wait": round(stats["max_wait"], 3),
+                    "avg_wait": round(stats["total_wait"] / started, 3) if started else 0.0,
+                }
+
+            return {
+                "workers": len(self._threads),
+                "running": self._running,
+                "queue_depth": self._depth,
+                "max_depth": self.max_depth,
+                "classes": classes,
+            }
+
+
+# Create the global task queue (workers start on the first submit)
+task_queue = TaskQueue()
@@ -0,0 +1,154 @@
+"""
+Token estimation for Beechwood OS
+Cheap, local guesses at how many tokens a request will cost
+
+Claude's tokenizer isn't available offline, so we approximate it: words
+cost about one token per 4 characters and every punctuation mark costs
+one token (which matters a lot for code). It's good enough to keep memory
+inside a budget and to catch oversized requests before they are sent.
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Tuple
+
+from core.attachments import carry_forward
+from core.config import config
+
+
+CHARS_PER_TOKEN = 4.0
+
+# Fixed overhead per message (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Words/numbers, or single punctuation characters
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Context window sizes (input + output) by model
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "claude-sonnet-4-20250514": 200000,
+    "claude-3-5-haiku-20241022": 200000,
+}
+DEFAULT_CONTEXT_WINDOW = 200000
+
+
+class RequestTooLargeError(Exception):
+    """A request can't fit in the model's context window, even after trimming"""
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a string
+
+    Args:
+        text: Any text
+
+    Returns:
+        Estimated token count (0 for empty text)
+    """
+    if not text:
+        return 0
+
+    tokens = 0
+    for piece in _PIECE_PATTERN.findall(text):
+        tokens += math.ceil(len(piece) / CHARS_PER_TOKEN)
+    return tokens
+
+
+def content_text(content: Any) -> str:
+    """Flatten message content (string or content blocks) to text"""
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+def estimate_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    """
+    Estimate the tokens used by a list of conversation messages
+
+    Args:
+        messages: List of {"role", "content"} dictionaries
+
+    Returns:
+        Estimated token count
+    """
+    return sum(
+        estimate_tokens(content_text(message["content"])) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def estimate_request(params: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Estimate the size of a messages.create request
+
+    Args:
+        params: The request parameters (model, max_tokens, system, messages)
+
+    Returns:
+        Dictionary with input_tokens, max_output_tokens, total_tokens
+        and context_window
+    """
+    system = params.get("system") or ""
+    input_tokens = estimate_tokens(content_text(system)) + estimate_message_tokens(params["messages"])
+    max_output_tokens = params.get("max_tokens", 0)
+
+    return {
+        "input_tokens": input_tokens,
+        "max_output_tokens": max_output_tokens,
+        "total_tokens": input_tokens + max_output_tokens,
+        "context_window": MODEL_CONTEXT_WINDOWS.get(params.get("model", ""), DEFAULT_CONTEXT_WINDOW),
+    }
+
+
+def preflight_request(params: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Check a request fits the context window before sending it
+
+    If it doesn't, the oldest conversation turns are trimmed from the
+    request (the agent's own memory is left alone). Attachments that
+    trimmed turns carried, and that kept turns still reference, move
+    forward with the request. If the newest message alone is too big,
+    the request is rejected without a network call.
+
+    Args:
+        params: The request parameters
+
+    Returns:
+        Tuple of (params to send, estimate). The estimate also has
+        trimmed_messages (how many old messages were left out).
+
+    Raises:
+        RequestTooLargeError: If the request can't be made to fit
+    """
+    estimate = estimate_request(params)
+    limit = estimate["context_window"]
+    margin = config.PREFLIGHT_SAFETY_MARGIN
+
+    def _fits(current: Dict[str, int]) -> bool:
+        return current["input_tokens"] * margin + current["max_output_tokens"] <= limit
+
+    messages = list(params["messages"])
+    trimmed = 0
+
+    while not _fits(estimate) and len(messages) > 1:
+        # Drop the oldest message, then anything until the next user turn
+        dropped = [messages.pop(0)]
+        while len(messages) > 1 and messages[0]["role"] != "user":
+            dropped.append(messages.pop(0))
+        trimmed += len(dropped)
+        messages = carry_forward(dropped, messages)
+
+        params = {**params, "messages": messages}
+        estimate = estimate_request(params)
+
+    if not _fits(estimate):
+        raise RequestTooLargeError(
+            f"Request too large: ~{estimate['input_tokens']} input tokens + "
+            f"{estimate['max_output_tokens']} output tokens exceeds the "
+            f"{limit} token context window"
+        )
+
+    estimate["trimmed_messages"] = trimmed
+    return params, estimate
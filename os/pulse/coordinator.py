@@ -4,15 +4,38 @@ This is the AI CTO that coordinates all AI employees and manages tasks
 NOW POWERED BY CLAUDE (Anthropic)
 """
 
+import asyncio
+import contextvars
+import hashlib
 import json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from anthropic import Anthropic
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Any, Sequence, Tuple
 
+from core.agent import BaseAgent
 from core.config import config
+from core.lazy import lazy_singleton
+from core.metrics import metrics
+from core.intent_router import IntentRouter
+from core.rate_limiter import rate_limiter
+from core.registry import agent_registry
+from core.resilience import resilience
+from core.attachments import attachments
+from core.clients import client_registry
+from core.fuzzy_cache import fuzzy_cache
+from core.response_cache import CachedMessage, response_cache
+from core.sessions import current_session, sessions
+from core.store import conversation_store
+from core.task_queue import Priority, TaskRejectedError, detect_priority, task_queue
+from core.tokens import estimate_tokens
 
 
-class PulseCoordinator:
+# Breaker and metrics label for PULSE's routing calls (kept apart from its own answers)
+ROUTER_KEY = "pulse:router"
+
+
+class PulseCoordinator(BaseAgent):
     """
     PULSE (Predictive Unified Logic System Engine)
     
@@ -24,18 +47,31 @@ class PulseCoordinator:
     - Coordinate between different departments
     """
     
+    agent_key = "pulse"
+    department = "Executive"
+    specialty = "Strategy, coordination, task routing"
+    capabilities = [
+        "strategy", "strategic", "plan", "roadmap", "priority", "prioritize",
+        "status", "update", "progress", "coordinate", "decide", "decision",
+        "timeline", "deadline", "budget", "cost", "hire", "team", "business",
+        "market", "launch", "feasibility", "recommend", "advice", "company",
+        "overview", "report", "next steps", "ceo",
+    ]
+    model = "claude-sonnet-4-20250514"  # Latest Claude Sonnet
+    max_tokens = 4096
+    output_key = "response"
+    
     def __init__(self):
         """Initialize PULSE with Anthropic (Claude) connection"""
-        self.client = config.get_anthropic_client()
         self.version = config.PULSE_VERSION
         self.name = config.PULSE_NAME
         self.company = config.COMPANY_NAME
         
-        # Conversation history (memory)
-        self.conversation_history: List[Dict[str, str]] = []
-        
-        # System prompt - defines PULSE's personality and role
-        self.system_prompt = self._create_system_prompt()
+        # Client, conversation history (memory) and system prompt
+        super().__init__()
+
+        # Open API connections now if pre-warming is configured
+        client_registry.warm_up()
         
         print(f"🧠 {self.name} v{self.version} initialized")
         print(f"🏢 Serving: {self.company}")
@@ -80,10 +116,19 @@ Current version: {self.version}
 Current date: {datetime.now().strftime('%Y-%m-%d')}
 """
     
+    def _result_base(self) -> Dict[str, Any]:
+        """PULSE results don't carry agent/department fields"""
+        return {}
+    
+    def _error_message(self, error: Exception) -> str:
+        """Human-readable error text"""
+        return f"Error processing request: {str(error)}"
+    
     def process_request(
         self,
         user_message: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Process a request from the CEO using Claude
@@ -91,58 +136,138 @@ Current date: {datetime.now().strftime('%Y-%m-%d')}
         Args:
             user_message: The message from the user
             context: Optional additional context
+            use_cache: Set False to always ask Claude (skip the response cache)
             
         Returns:
             Dictionary with response and metadata
         """
-        try:
-            # Add user message to conversation history
-            self.conversation_history.append({
-                "role": "user",
-                "content": user_message
-            })
-            
-            # Call Anthropic API
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",  # Latest Claude Sonnet
-                max_tokens=4096,
-                system=self.system_prompt,
-                messages=self.conversation_history
-            )
-            
-            # Extract the response
-            assistant_message = response.content[0].text
-            
-            # Add assistant response to conversation history
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": assistant_message
-            })
-            
-            # Return structured response
-            return {
-                "success": True,
-                "response": assistant_message,
-                "timestamp": datetime.now().isoformat(),
-                "tokens_used": response.usage.input_tokens + response.usage.output_tokens,
-                "model": response.model
-            }
-            
-        except Exception as e:
-            error_message = f"Error processing request: {str(e)}"
-            print(f"❌ {error_message}")
+        scope, result = self._fuzzy_lookup(user_message, context, use_cache)
+        if result:
+            return result
+        
+        result = self.execute_task(user_message, context, use_cache)
+        self._fuzzy_store(scope, user_message, result)
+        return result
+    
+    async def process_request_async(
+        self,
+        user_message: str,
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Process a request from the CEO without blocking the event loop
+        
+        Same history and result dictionary as process_request().
+        """
+        await self.conversation.load_async()
+        scope, result = self._fuzzy_lookup(user_message, context, use_cache)
+        if result:
+            return result
+        
+        result = await self.execute_task_async(user_message, context, use_cache)
+        self._fuzzy_store(scope, user_message, result)
+        return result
+    
+    def _fuzzy_scope(self) -> str:
+        """
+        Fingerprint of the conversation's context (fuzzy hits must share it)
+
+        Agent, session and the running summary - not the recent turns,
+        which change with every request (so nothing could ever match).
+        Two users never share answers, and a new summary starts afresh.
+        """
+        payload = json.dumps({
+            "agent": self.agent_key,
+            "session": current_session(),
+            "summary": self.conversation.summary,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def _fuzzy_lookup(
+        self,
+        user_message: str,
+        context: Optional[Dict[str, Any]],
+        use_cache: bool
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Answer a near-duplicate of an earlier request from the fuzzy cache
+        
+        Requests with extra context are never matched fuzzily.
+        
+        Returns:
+            Tuple of (scope to store the answer under, result on a hit)
+        """
+        if not (use_cache and config.FUZZY_CACHE_ENABLED) or context:
+            return None, None
+        
+        started = time.monotonic()
+        scope = self._fuzzy_scope()
+        match = fuzzy_cache.lookup(scope, user_message)
+        if match is None:
+            return scope, None
+        
+        # Keep memory consistent, as if Claude had answered
+        self._start_turn(user_message)
+        self._finish_turn(match["answer"])
+        self.last_estimate = {}
+        
+        result = self._success_result(match["answer"], CachedMessage(match["answer"], match["model"]))
+        result["fuzzy_match"] = {
+            "similarity": match["similarity"],
+            "matched_request": match["matched_request"],
+            "audit_id": match["audit_id"],
+        }
+        metrics.record_success(self.agent_key, result["model"], result, time.monotonic() - started)
+        return scope, result
+    
+    def _fuzzy_store(self, scope: Optional[str], user_message: str, result: Dict[str, Any]):
+        """Remember a successful answer for future near-duplicates"""
+        if scope and result.get("success"):
+            fuzzy_cache.store(scope, user_message, result["response"], result["model"])
+    
+    def report_false_hit(self, audit_id: int) -> bool:
+        """
+        Report that a fuzzy-cache answer didn't fit the question
+        
+        Args:
+            audit_id: The audit_id from the result's "fuzzy_match"
             
-            return {
-                "success": False,
-                "response": error_message,
-                "timestamp": datetime.now().isoformat()
-            }
+        Returns:
+            True if the hit was found (its cache entry is evicted)
+        """
+        return fuzzy_cache.report_false_hit(audit_id)
+    
+    def stream_request(
+        self,
+        user_message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process a request from the CEO and stream PULSE's answer
+        
+        Yields text events as they arrive, then a final result event
+        (see BaseAgent.stream_task()).
+        """
+        return self.stream_task(user_message, context)
+    
+    def stream_request_async(
+        self,
+        user_message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of stream_request()"""
+        return self.stream_task_async(user_message, context)
     
     def clear_history(self):
         """Clear conversation history (fresh start)"""
-        self.conversation_history = []
+        self.conversation.clear()
         print("🧹 Conversation history cleared")
     
+    def clear_context(self):
+        """Alias for clear_history() so PULSE matches the agent interface"""
+        self.clear_history()
+    
     def get_status(self) -> Dict[str, Any]:
         """Get current status of PULSE"""
         return {
@@ -151,40 +276,206 @@ Current date: {datetime.now().strftime('%Y-%m-%d')}
             "company": self.company,
             "ai_provider": "Anthropic Claude",
             "conversation_length": len(self.conversation_history),
-            "status": "operational"
+            "memory": self.conversation.get_status(),
+            "agents": agent_registry.names(),
+            "connection_pool": client_registry.get_status(),
+            "response_cache": response_cache.get_stats(),
+            "fuzzy_cache": fuzzy_cache.get_stats(),
+            "resilience": resilience.get_status(),
+            "rate_limiter": rate_limiter.get_stats(),
+            "task_queue": task_queue.get_stats(),
+            "store": conversation_store.get_stats(),
+            "sessions": sessions.get_status(),
+            "attachments": attachments.get_status(),
+            "status": self._operational_status()
         }
     
-    def route_to_agent(self, agent_name: str, task: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def get_metrics(self, prometheus: bool = False) -> Any:
         """
-        Route a task to a specific AI agent
+        Latency, token, error and concurrency metrics for every agent call
         
         Args:
-            agent_name: Name of the agent (e.g., "engineering", "security")
-            task: The task to route
+            prometheus: Return the Prometheus text format instead of a dictionary
+        """
+        return metrics.render() if prometheus else metrics.get_metrics()
+    
+    def _get_agent(self, agent_name: str):
+        """
+        Look up an AI agent by name (key, alias, name or department)
+        
+        Returns:
+            Tuple of (agent or None, list of available agent names)
+        """
+        agent = agent_registry.get(agent_name)
+        if agent:
+            return agent, None
+        return None, agent_registry.names()
+    
+    @property
+    def intent_router(self) -> IntentRouter:
+        """Local department classifier (shared by all PULSE instances)"""
+        return _intent_router
+    
+    def classify_request(self, message: str) -> Dict[str, Any]:
+        """
+        Decide which department should handle a request
+        
+        The local intent router answers almost every time. Claude is only
+        asked when the router's confidence is below INTENT_ROUTER_THRESHOLD.
+        
+        Args:
+            message: The request text
+            
+        Returns:
+            Dictionary with agent ("pulse" or a registered agent key),
+            confidence, method ("local" or "llm") and the local scores
+        """
+        routing = self.intent_router.classify(message)
+        routing["method"] = "local"
+        
+        if routing["confidence"] >= config.INTENT_ROUTER_THRESHOLD or not config.INTENT_ROUTER_LLM_FALLBACK:
+            return routing
+        
+        params = self._routing_request(message)
+        
+        def _create():
+            with rate_limiter.reserve(self.agent_key, estimate_tokens(message), params["max_tokens"]) as ticket:
+                response = self.client.messages.create(**params)
+                ticket.usage = response.usage
+            return response
+        
+        try:
+            with metrics.track(ROUTER_KEY, params["model"]) as call:
+                response = metrics.finish_response(call, resilience.call(ROUTER_KEY, _create))
+            return self._apply_llm_routing(routing, response)
+        except Exception as e:
+            print(f"⚠️  LLM routing failed, using local decision: {str(e)}")
+            return routing
+    
+    async def classify_request_async(self, message: str) -> Dict[str, Any]:
+        """Async version of classify_request()"""
+        routing = self.intent_router.classify(message)
+        routing["method"] = "local"
+        
+        if routing["confidence"] >= config.INTENT_ROUTER_THRESHOLD or not config.INTENT_ROUTER_LLM_FALLBACK:
+            return routing
+        
+        params = self._routing_request(message)
+        
+        async def _create():
+            async with rate_limiter.reserve_async(self.agent_key, estimate_tokens(message), params["max_tokens"]) as ticket:
+                response = await self.async_client.messages.create(**params)
+                ticket.usage = response.usage
+            return response
+        
+        try:
+            with metrics.track(ROUTER_KEY, params["model"]) as call:
+                response = metrics.finish_response(call, await resilience.call_async(ROUTER_KEY, _create))
+            return self._apply_llm_routing(routing, response)
+        except Exception as e:
+            print(f"⚠️  LLM routing failed, using local decision: {str(e)}")
+            return routing
+    
+    def _routing_options(self) -> List[str]:
+        """Department keys the router can choose from"""
+        return [self.agent_key] + agent_registry.names()
+    
+    def _routing_request(self, message: str) -> Dict[str, Any]:
+        """Tiny, cheap classification request for the LLM fallback"""
+        departments = "\n".join(
+            f"- {spec.key}: {spec.specialty}" for spec in agent_registry.specs()
+        )
+        return {
+            "model": config.INTENT_ROUTER_MODEL,
+            "max_tokens": 10,
+            "system": (
+                f"You route requests at {self.company}. Departments:\n"
+                f"- {self.agent_key}: {self.specialty}\n{departments}\n"
+                "Reply with the department key only."
+            ),
+            "messages": [{"role": "user", "content": message}],
+        }
+    
+    def _apply_llm_routing(self, routing: Dict[str, Any], response: Any) -> Dict[str, Any]:
+        """Use the LLM's answer if it named a known department"""
+        answer = response.content[0].text.strip().lower()
+        for option in self._routing_options():
+            if option in answer:
+                routing.update({"agent": option, "method": "llm"})
+                break
+        return routing
+    
+    def auto_route(self, message: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Send a request to whichever department should handle it
+        
+        Args:
+            message: The request
             context: Optional additional context
             
         Returns:
-            Response from the agent
+            The handling agent's result dictionary, plus a "routing" entry
+            describing the decision
         """
-        # Import agents (lazy import to avoid circular dependencies)
-        from agents.engineering_ai import engineering_ai
-        from agents.security_ai import security_ai
+        routing = self.classify_request(message)
         
-        # Map agent names to instances
-        agents = {
-            "engineering": engineering_ai,
-            "security": security_ai,
+        if routing["agent"] == self.agent_key:
+            result = self.process_request(message, context)
+        else:
+            result = self.route_to_agent(routing["agent"], message, context)
+        
+        result["routing"] = routing
+        return result
+    
+    async def auto_route_async(self, message: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async version of auto_route()"""
+        routing = await self.classify_request_async(message)
+        
+        if routing["agent"] == self.agent_key:
+            result = await self.process_request_async(message, context)
+        else:
+            result = await self.route_to_agent_async(routing["agent"], message, context)
+        
+        result["routing"] = routing
+        return result
+    
+    def _unknown_agent_result(self, agent_name: str, available_agents: List[str]) -> Dict[str, Any]:
+        """Result dictionary for a routing request to an agent that doesn't exist"""
+        return {
+            "success": False,
+            "error": f"Unknown agent: {agent_name}",
+            "available_agents": available_agents
         }
+    
+    def route_to_agent(
+        self,
+        agent_name: str,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> Any:
+        """
+        Route a task to a specific AI agent
         
+        Args:
+            agent_name: Name of the agent (e.g., "engineering", "security")
+            task: The task to route
+            context: Optional additional context
+            stream: If True, return the agent's stream_task() event iterator
+            
+        Returns:
+            Response from the agent (or an event iterator when streaming)
+        """
         # Get the agent
-        agent = agents.get(agent_name.lower())
+        agent, available_agents = self._get_agent(agent_name)
         
         if not agent:
-            return {
-                "success": False,
-                "error": f"Unknown agent: {agent_name}",
-                "available_agents": list(agents.keys())
-            }
+            result = self._unknown_agent_result(agent_name, available_agents)
+            return iter([{"type": "result", "result": result}]) if stream else result
+        
+        if stream:
+            print(f"\n🔀 PULSE streaming task to {agent.name}...")
+            return agent.stream_task(task, context)
         
         # Route the task
         print(f"\n🔀 PULSE routing task to {agent.name}...")
@@ -192,7 +483,316 @@ Current date: {datetime.now().strftime('%Y-%m-%d')}
         print(f"✅ {agent.name} completed task\n")
         
         return result
+    
+    async def route_to_agent_async(
+        self,
+        agent_name: str,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> Any:
+        """
+        Route a task to a specific AI agent without blocking the event loop
+        
+        Same arguments and result dictionary as route_to_agent(). With
+        stream=True, returns the agent's stream_task_async() iterator.
+        """
+        agent, available_agents = self._get_agent(agent_name)
+        
+        if not agent:
+            result = self._unknown_agent_result(agent_name, available_agents)
+            return self._single_event(result) if stream else result
+        
+        if stream:
+            print(f"\n🔀 PULSE streaming task to {agent.name}...")
+            return agent.stream_task_async(task, context)
+        
+        print(f"\n🔀 PULSE routing task to {agent.name}...")
+        result = await agent.execute_task_async(task, context)
+        print(f"✅ {agent.name} completed task\n")
+        
+        return result
+    
+    def submit_task(
+        self,
+        agent_name: str,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        priority: Optional[Priority] = None,
+        deadline: Optional[float] = None
+    ) -> Future:
+        """
+        Queue a task for an agent on the priority task queue
+        
+        Args:
+            agent_name: Name of the agent (e.g., "engineering", "security")
+            task: The task to route
+            context: Optional additional context
+            priority: Priority class (default: detected from the task -
+                      only live-incident wording is EMERGENCY, so pass
+                      Priority.EMERGENCY for other safety-critical work)
+            deadline: Seconds from now the task must start by
+            
+        Returns:
+            Future with the agent's result dictionary (raises
+            TaskRejectedError if the task was shed or expired)
+        """
+        if priority is None:
+            priority = detect_priority(task)
+        
+        return task_queue.submit(
+            self.route_to_agent,
+            agent_name,
+            task,
+            context,
+            priority=priority,
+            deadline=deadline,
+            name=f"{agent_name}: {task[:40]}",
+        )
+    
+    def route_with_priority(
+        self,
+        agent_name: str,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        priority: Optional[Priority] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Route a task through the priority queue and wait for the result
+        
+        Same arguments as submit_task(). A shed or expired task comes back
+        as a result dictionary with success False.
+        """
+        try:
+            return self.submit_task(agent_name, task, context, priority, deadline).result()
+        except TaskRejectedError as e:
+            return self._rejected_result(agent_name, e)
+    
+    async def route_with_priority_async(
+        self,
+        agent_name: str,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        priority: Optional[Priority] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Async version of route_with_priority() (waits without blocking the loop)"""
+        try:
+            future = self.submit_task(agent_name, task, context, priority, deadline)
+            return await asyncio.wrap_future(future)
+        except TaskRejectedError as e:
+            return self._rejected_result(agent_name, e)
+    
+    def _rejected_result(self, agent_name: str, error: TaskRejectedError) -> Dict[str, Any]:
+        """Result dictionary for a task the queue didn't run"""
+        return {
+            "success": False,
+            "agent": agent_name,
+            "output": str(error),
+            "error": str(error),
+            "priority": error.priority.name,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    async def _single_event(self, result: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Wrap a result dictionary as a one-event async stream"""
+        yield {"type": "result", "result": result}
+    
+    def _prepare_routes(
+        self,
+        tasks: Sequence[Tuple]
+    ) -> List[Tuple[str, str, Optional[Dict[str, Any]]]]:
+        """Normalize (agent, task) / (agent, task, context) tuples"""
+        routes = []
+        for item in tasks:
+            agent_name, task = item[0], item[1]
+            context = item[2] if len(item) > 2 else None
+            routes.append((agent_name, task, context))
+        return routes
+    
+    def _route_timeout_result(self, agent_name: str, timeout: float) -> Dict[str, Any]:
+        """Result dictionary for a routed task that ran past its deadline"""
+        error_message = f"Task for {agent_name} timed out after {timeout:g}s"
+        print(f"❌ {error_message}")
+        
+        return {
+            "success": False,
+            "agent": agent_name,
+            "output": error_message,
+            "error": error_message,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def submit_batch(self, tasks: Sequence[Tuple], job_id: Optional[str] = None):
+        """
+        Pack many independent tasks into one Message Batches job
+        
+        For large, non-interactive work (half price, results usually
+        within an hour). Agents' conversation history is not used.
+        
+        Args:
+            tasks: List of (agent_name, task) or (agent_name, task, context)
+            job_id: Optional name for the job (to resume it later)
+            
+        Returns:
+            The submitted BatchJob - call wait() for {custom_id: result}.
+            Task i has custom_id "task-0000i".
+        """
+        from core.batch import BatchJob
+        
+        job = BatchJob(job_id)
+        for agent_name, task, context in self._prepare_routes(tasks):
+            job.add(agent_name, task, context)
+        job.submit()
+        return job
+    
+    def _route_standalone(self, agent_name: str, task: str, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run one of route_many()'s tasks without conversation memory"""
+        agent, available_agents = self._get_agent(agent_name)
+        if not agent:
+            return self._unknown_agent_result(agent_name, available_agents)
+        return agent.execute_standalone(task, context)
+    
+    async def _route_standalone_async(self, agent_name: str, task: str, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Async version of _route_standalone()"""
+        agent, available_agents = self._get_agent(agent_name)
+        if not agent:
+            return self._unknown_agent_result(agent_name, available_agents)
+        return await agent.execute_standalone_async(task, context)
+    
+    def route_many(
+        self,
+        tasks: Sequence[Tuple],
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Route several independent tasks to their agents in parallel
+        
+        Total wall-clock time is set by the slowest agent, not the sum.
+        Each task runs on its own, without conversation history (nothing
+        is read from or added to the agents' memory), so several tasks
+        for one agent can't mix their turns into one conversation.
+        
+        A task past its timeout gets a timeout result right away, but its
+        thread can't be stopped: the call is abandoned and ends on its
+        own (at the latest at the client timeout). Its late answer is
+        dropped - it never reaches a caller or a conversation.
+        
+        Args:
+            tasks: List of (agent_name, task) or (agent_name, task, context)
+            max_concurrency: Max tasks running at once (default from config)
+            timeout: Per-task timeout in seconds (default from config, 0 = none)
+            
+        Yields:
+            Result dictionaries as each task finishes. Each one has a
+            "task_index" pointing back into the tasks list.
+        """
+        routes = self._prepare_routes(tasks)
+        max_concurrency = max_concurrency or config.ROUTE_MAX_CONCURRENCY
+        if timeout is None:
+            timeout = config.ROUTE_TASK_TIMEOUT
+        
+        # Per-task deadlines start when the task starts running, not when queued
+        started: Dict[int, float] = {}
+        
+        def _run(index: int, agent_name: str, task: str, context: Optional[Dict[str, Any]]):
+            started[index] = time.monotonic()
+            return self._route_standalone(agent_name, task, context)
+        
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        try:
+            # Each task runs in a copy of our context (keeps urgent() and the session)
+            pending = {
+                executor.submit(contextvars.copy_context().run, _run, index, *route): index
+                for index, route in enumerate(routes)
+            }
+            
+            while pending:
+                done, _ = wait(pending, timeout=0.05 if timeout else None, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = self._error_result(e)
+                    result["task_index"] = index
+                    yield result
+                
+                if not timeout:
+                    continue
+                
+                # Give up on tasks that have been running too long (their
+                # threads keep going until the call ends; the result is dropped)
+                now = time.monotonic()
+                for future, index in list(pending.items()):
+                    if index in started and now - started[index] > timeout:
+                        del pending[future]
+                        result = self._route_timeout_result(routes[index][0], timeout)
+                        result["task_index"] = index
+                        yield result
+        finally:
+            # Don't wait for abandoned threads (they end at the client timeout)
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def route_many_async(
+        self,
+        tasks: Sequence[Tuple],
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Route several independent tasks to their agents concurrently
+        
+        Async version of route_many(): same arguments, yields the same
+        result dictionaries (with "task_index") as tasks finish. Tasks
+        also run without conversation history; a task past its timeout
+        is cancelled.
+        """
+        routes = self._prepare_routes(tasks)
+        max_concurrency = max_concurrency or config.ROUTE_MAX_CONCURRENCY
+        if timeout is None:
+            timeout = config.ROUTE_TASK_TIMEOUT
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def _run(index: int, agent_name: str, task: str, context: Optional[Dict[str, Any]]):
+            async with semaphore:
+                try:
+                    result = await asyncio.wait_for(
+                        self._route_standalone_async(agent_name, task, context),
+                        timeout or None
+                    )
+                except asyncio.TimeoutError:
+                    result = self._route_timeout_result(agent_name, timeout)
+            result["task_index"] = index
+            return result
+        
+        running = [
+            asyncio.ensure_future(_run(index, *route))
+            for index, route in enumerate(routes)
+        ]
+        try:
+            for next_done in asyncio.as_completed(running):
+                yield await next_done
+        finally:
+            # Stop leftover work if the caller stops listening early
+            for task in running:
+                task.cancel()
+
+
+# Local department classifier (tables are built on first classification)
+_intent_router = IntentRouter(agent_registry, fallback_agent=PulseCoordinator)
+
+
+# The global PULSE instance is created on first use
+# ("from pulse.coordinator import pulse" still works)
+get_pulse = lazy_singleton(PulseCoordinator)
 
 
-# Create a global PULSE instance
-pulse = PulseCoordinator()
\ No newline at end of file
+def __getattr__(name: str):
+    if name == "pulse":
+        return get_pulse()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,173 @@
+"""
+Test script for the HTTP service (runs offline against the local fake model server)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+server = FakeModelServer(latency=0.2, output_tokens=10).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_REDIS": "False",
+    "RATE_LIMIT_RPM": "0",
+    "RATE_LIMIT_INPUT_TPM": "0",
+    "RATE_LIMIT_OUTPUT_TPM": "0",
+    "INTENT_ROUTER_LLM_FALLBACK": "False",
+})
+
+import httpx
+
+from api.main import app, lifespan, service
+from core.config import config
+from core.sessions import sessions
+
+
+def parse_sse(body: str):
+    """Server-sent events as (event, data) pairs"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def run_checks():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://beechwood") as client:
+
+        # Test 1: Directory lists the specialized methods
+        agents = (await client.get("/v1/agents")).json()
+        engineering = next(agent for agent in agents if agent["key"] == "engineering")
+        assert "review_code" in engineering["methods"] and "design_architecture" in engineering["methods"]
+        print(f"✅ {len(agents)} agents listed with their methods")
+
+        # Test 2: PULSE request
+        response = await client.post("/v1/pulse/request", json={"message": "Status of Beacon?", "use_cache": False})
+        assert response.status_code == 200 and response.json()["success"]
+        response = await client.post("/v1/pulse/route", json={"message": "Design the encryption for location sharing"})
+        assert response.json()["routing"]["agent"] == "security"
+        print("✅ POST /v1/pulse/request and /v1/pulse/route")
+
+        # Test 3: Specialized method, plain and streamed
+        args = {"code": "export const x = 1", "filename": "x.ts"}
+        response = await client.post("/v1/agents/engineering/methods/review_code", json={"args": args, "use_cache": False})
+        assert response.status_code == 200 and response.json()["success"]
+        response = await client.post("/v1/agents/eng/methods/review_code/stream", json={"args": args, "use_cache": False})
+        events = parse_sse(response.text)
+        assert [name for name, _ in events].count("text") == 10 and events[-1][0] == "result"
+        assert events[-1][1]["streamed"]
+        print("✅ review_code over HTTP (plain and SSE)")
+
+        # Test 4: Bad input
+        assert (await client.post("/v1/agents/nobody/tasks", json={"task": "hi"})).status_code == 404
+        assert (await client.post("/v1/agents/security/methods/rm_rf", json={})).status_code == 404
+        assert (await client.post("/v1/agents/security/methods/assess_threat_model", json={"args": {}})).status_code == 422
+        print("✅ Unknown agent/method -> 404, missing arguments -> 422")
+
+        # Test 5: Different agents run in parallel, one agent takes turns
+        started = time.perf_counter()
+        await asyncio.gather(
+            client.post("/v1/agents/engineering/tasks", json={"task": "Plan A", "use_cache": False}),
+            client.post("/v1/agents/security/tasks", json={"task": "Plan B", "use_cache": False}),
+        )
+        parallel = time.perf_counter() - started
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            client.post("/v1/agents/engineering/tasks", json={"task": f"Step {n}", "use_cache": False})
+            for n in range(2)
+        ])
+        serial = time.perf_counter() - started
+        assert parallel < 0.35 and serial >= 0.4
+        history = service.get_agent("engineering").conversation_history
+        assert [message["role"] for message in history[-4:]] == ["user", "assistant", "user", "assistant"]
+        print(f"✅ Two agents in {parallel * 1000:.0f}ms, two turns on one agent in {serial * 1000:.0f}ms (history stays ordered)")
+
+        # Test 6: Sessions get their own memory and don't wait for each other
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            client.post("/v1/agents/engineering/tasks", json={"task": "Hi", "session_id": user, "use_cache": False})
+            for user in ("alice", "bob")
+        ])
+        assert time.perf_counter() - started < 0.35
+        session = (await client.get("/v1/sessions/alice")).json()
+        assert session["agents"]["engineering"]["messages"] == 2
+        print("✅ Two sessions on one agent ran in parallel")
+
+        # Test 7: Timeouts
+        config.API_REQUEST_TIMEOUT = 0.05
+        response = await client.post("/v1/agents/security/tasks", json={"task": "Slow", "use_cache": False})
+        assert response.status_code == 504
+        response = await client.post("/v1/agents/security/tasks/stream", json={"task": "Slow", "use_cache": False})
+        assert parse_sse(response.text)[-1][0] == "error"
+        config.API_REQUEST_TIMEOUT = 300
+        print("✅ Timed-out requests -> 504 / SSE error event")
+
+        # Test 8: Routing counts against the deadline, and a timed-out route leaves its session evictable
+        config.INTENT_ROUTER_LLM_FALLBACK, config.INTENT_ROUTER_THRESHOLD = True, 1.1
+        config.API_REQUEST_TIMEOUT = 0.3  # classification (0.2s) + the call (0.2s) doesn't fit
+        response = await client.post("/v1/pulse/route", json={
+            "message": "Design the encryption for location sharing", "session_id": "frank", "use_cache": False,
+        })
+        assert response.status_code == 504
+        config.INTENT_ROUTER_LLM_FALLBACK, config.API_REQUEST_TIMEOUT = False, 300
+        frank = sessions._sessions["frank"]
+        assert not frank.busy and all(not c.messages for c in frank.conversations.values())
+        assert sessions.drop("frank")
+        print("✅ Timed-out route -> 504, its session left idle and evictable")
+
+        # Test 9: Metrics endpoint
+        response = await client.get("/metrics")
+        assert "beechwood_requests_total" in response.text
+        print(f"✅ /metrics served\n\n📊 Service: {service.get_status()}")
+
+
+async def start_and_stop():
+    """Run the app's startup and shutdown (a new worker: its own event loop and pool)"""
+    server.reset_stats()
+    async with lifespan(app):
+        connections = server.stats["connections"]
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://beechwood") as client:
+            response = await client.post("/v1/pulse/request", json={"message": "Status?", "use_cache": False})
+    return connections, response
+
+
+def test_api():
+    """Test the HTTP service end to end through the ASGI app"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING HTTP SERVICE")
+    print("="*60 + "\n")
+
+    try:
+        asyncio.run(run_checks())
+
+        # Test 10: Startup warms the worker's async pool before the first request
+        config.ANTHROPIC_PREWARM_CONNECTIONS = 2
+        connections, response = asyncio.run(start_and_stop())
+        config.ANTHROPIC_PREWARM_CONNECTIONS = 0
+        assert connections == 2 and response.json()["success"]
+        assert server.stats["connections"] == 2 and server.stats["requests"] == 1
+        print("✅ Startup warmed 2 connections; the first request used one of them")
+    finally:
+        server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 HTTP SERVICE TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_api()
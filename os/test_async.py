@@ -0,0 +1,99 @@
+"""
+Test script for the async execution path (runs offline against the local fake model server)
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+server = FakeModelServer(latency=0.2, output_tokens=20).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_ENABLED": "False",
+    "INTENT_ROUTER_LLM_FALLBACK": "False",
+})
+
+from pulse.coordinator import get_pulse
+
+
+async def run_checks(pulse):
+    engineering = pulse._get_agent("engineering")[0]
+
+    # Test 1: One async task, remembered like a sync one
+    result = await engineering.execute_task_async("Plan the alert API")
+    assert result["success"] and result["output_tokens"] == 20
+    assert [message["role"] for message in engineering.conversation_history] == ["user", "assistant"]
+    print("✅ execute_task_async answered and kept the turn")
+
+    # Test 2: PULSE and two agents at once, without blocking the event loop
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    heartbeat = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        pulse.process_request_async("What's the Beacon status?", use_cache=False),
+        pulse.route_to_agent_async("security", "Threat model location sharing"),
+        pulse.route_to_agent_async("engineering", "Now plan the map view"),
+    )
+    elapsed = time.perf_counter() - started
+    heartbeat.cancel()
+    assert all(result["success"] for result in results)
+    assert elapsed < 0.35 and ticks >= 10
+    print(f"✅ 3 calls in {elapsed * 1000:.0f}ms, event loop ticked {ticks} times meanwhile")
+
+    # Test 3: Automatic routing and unknown agents
+    result = await pulse.auto_route_async("Design the encryption for location sharing")
+    assert result["success"] and result["routing"]["agent"] == "security"
+    result = await pulse.route_to_agent_async("marketing", "Write a launch post")
+    assert not result["success"] and "engineering" in result["available_agents"]
+    print("✅ auto_route_async routed to Security AI; unknown agent reported")
+
+    # Test 4: A failed call comes back as a result and leaves memory as it was
+    history = engineering.conversation_history
+    server.error_rate, server.error_statuses = 1.0, (400,)
+    result = await engineering.execute_task_async("Plan the billing page", use_cache=False)
+    server.error_rate = 0.0
+    assert not result["success"] and engineering.conversation_history == history
+    print("✅ Failed async call reported, memory unchanged")
+
+
+def test_async():
+    """Test the async agent and PULSE paths end to end"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING ASYNC EXECUTION")
+    print("="*60 + "\n")
+
+    pulse = get_pulse()
+    asyncio.run(run_checks(pulse))
+
+    # Test 5: A second event loop gets its own async client (connections can't cross loops)
+    result = asyncio.run(pulse.route_to_agent_async("engineering", "One more thing"))
+    assert result["success"]
+    print("✅ Works again from a new event loop")
+
+    server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 ASYNC EXECUTION TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_async()
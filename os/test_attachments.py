@@ -0,0 +1,136 @@
+"""
+Test script for context attachments (runs offline against the local fake model server)
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+server = FakeModelServer(output_tokens=50).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_REDIS": "False",
+    "RATE_LIMIT_RPM": "0",
+    "RATE_LIMIT_INPUT_TPM": "0",
+    "RATE_LIMIT_OUTPUT_TPM": "0",
+})
+
+import httpx
+
+from agents.engineering_ai import EngineeringAI
+from core.attachments import attachments
+from core.prompt_cache import cacheable_messages
+from core.config import config
+from core.tokens import DEFAULT_CONTEXT_WINDOW, MODEL_CONTEXT_WINDOWS, content_text, estimate_tokens
+
+# A Security AI protocol the size of a real one (~3,000 tokens)
+PROTOCOL = "\n".join(
+    f"{step}. Encrypt location update {step} with the session key, sign it, and retry over SMS if push fails."
+    for step in range(1, 150)
+)
+SECURITY_RESULT = {"success": True, "agent": "Security AI", "output": PROTOCOL}
+
+
+def test_attachments():
+    """Test that large context is sent once and referenced afterwards"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING CONTEXT ATTACHMENTS")
+    print("="*60 + "\n")
+
+    # Test 1: Small context stays inline, as JSON (not a Python repr)
+    content = attachments.build_content("Plan it", {"deadline": "Friday", "urgent": True})
+    assert isinstance(content, str) and '"urgent": true' in content
+    print("✅ Small context inlined as JSON")
+
+    # Test 2: An agent result becomes one content-addressed attachment
+    blocks = attachments.build_content("Plan it", {"protocol": SECURITY_RESULT, "copy": PROTOCOL})
+    protocol = attachments.agent_output(SECURITY_RESULT)
+    assert len(blocks) == 2 and protocol.id in blocks[0]["text"] and PROTOCOL in blocks[0]["text"]
+    marked = cacheable_messages([{"role": "user", "content": blocks}])[0]["content"]
+    assert all("cache_control" in block for block in marked)
+    print(f"✅ Same text under two keys sent once as {protocol.id} (cacheable block)")
+
+    # Test 3: Later turns reference the attachment instead of re-sending it
+    agent = EngineeringAI()
+    first = agent.execute_task("Plan the alert API", context={"protocol": SECURITY_RESULT}, use_cache=False)
+    second = agent.execute_task("Now plan the map view", context={"protocol": SECURITY_RESULT}, use_cache=False)
+    assert first["success"] and second["success"]
+    first_turn, later_turn = (content_text(m["content"]) for m in agent.conversation_history[::2])
+    assert PROTOCOL in first_turn and PROTOCOL not in later_turn and protocol.id in later_turn
+    assert second["estimated_input_tokens"] - first["estimated_input_tokens"] < 500
+    assert attachments.stats["referenced"] == 1
+    print(f"✅ Second turn referenced the protocol ({first['estimated_input_tokens']} -> "
+          f"{second['estimated_input_tokens']} estimated input tokens)")
+
+    # Test 4: Once the turn that carried it is forgotten, it is sent again
+    agent.clear_context()
+    agent.execute_task("Start over", context={"protocol": SECURITY_RESULT}, use_cache=False)
+    assert PROTOCOL in content_text(agent.conversation_history[0]["content"])
+    print("✅ Re-sent after the conversation lost it")
+
+    # Test 5: Standalone tasks sharing an attachment read it from the prompt cache
+    spec = attachments.spec("beacon-protocol", PROTOCOL)
+    agent.execute_standalone("Review the alert API against the spec", context={"spec": spec}, use_cache=False)
+    result = agent.execute_standalone("Review the map view against the spec", context={"spec": spec}, use_cache=False)
+    assert result["cache_read_input_tokens"] > 2000
+    print(f"✅ Standalone task read {result['cache_read_input_tokens']} tokens of the shared spec from cache")
+
+    # Test 6: Upload once over HTTP, then pass just the ID
+    from api.main import app
+
+    async def _http():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://beechwood") as client:
+            uploaded = (await client.post("/v1/attachments", json={"name": "protocol", "text": PROTOCOL})).json()
+            response = await client.post("/v1/agents/engineering/tasks", json={
+                "task": "Plan push notifications", "context": {"protocol": uploaded["id"]}, "use_cache": False,
+            })
+            assert response.status_code == 200 and response.json()["success"]
+            unknown = await client.post("/v1/agents/engineering/tasks", json={
+                "task": "Hi", "context": {"protocol": "sha256:0000000000000000"},
+            })
+            assert unknown.status_code == 404
+            return uploaded
+
+    uploaded = asyncio.run(_http())
+    assert uploaded["id"] == protocol.id  # same content, same ID
+    print("✅ Uploaded attachment used by ID, unknown ID -> 404")
+
+    # Test 7: If preflight trims the turn that carried it, the attachment moves forward
+    agent = EngineeringAI()
+    agent.model = "tiny-model"
+    MODEL_CONTEXT_WINDOWS["tiny-model"] = DEFAULT_CONTEXT_WINDOW
+    agent.execute_task("Plan the alert API", context={"protocol": SECURITY_RESULT}, use_cache=False)
+    for feature in ("map view", "contacts", "check-ins"):
+        agent.execute_task(f"Now plan the {feature}: " + "keep it small. " * 100, use_cache=False)
+    full = agent.estimate_task("And push notifications?", context={"protocol": SECURITY_RESULT})
+    MODEL_CONTEXT_WINDOWS["tiny-model"] = (
+        int(full["input_tokens"] * config.PREFLIGHT_SAFETY_MARGIN) + full["max_output_tokens"] - 50
+    )
+    result = agent.execute_task("And push notifications?", context={"protocol": SECURITY_RESULT}, use_cache=False)
+    assert result["success"] and agent.last_estimate["trimmed_messages"] >= 2
+    assert protocol.id in content_text(agent.conversation_history[-2]["content"])  # referenced, not re-sent
+    assert PROTOCOL not in content_text(agent.conversation_history[-2]["content"])
+    assert result["estimated_input_tokens"] > estimate_tokens(PROTOCOL)  # ... but still in the request
+    print(f"✅ Trimmed {agent.last_estimate['trimmed_messages']} messages, protocol carried into the request"
+          f"\n\n📊 Attachments: {attachments.get_status()}")
+
+    server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 CONTEXT ATTACHMENTS TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_attachments()
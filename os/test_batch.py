@@ -0,0 +1,137 @@
+"""
+Test script for bulk mode (runs offline against a local batch endpoint)
+
+LocalBatchServer stands in for the Message Batches API: it accepts a
+batch, reports "in_progress" for a couple of polls, then serves JSONL
+results - echoing each request back so results can be checked.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+from anthropic import Anthropic
+
+from core.batch import BatchJob
+
+
+class LocalBatchServer:
+    """Minimal in-process Message Batches endpoint"""
+
+    def __init__(self, polls_until_done: int = 2):
+        self.polls_until_done = polls_until_done
+        self.batches = {}
+        self.created = 0
+
+    def _batch(self, batch_id):
+        batch = self.batches[batch_id]
+        ended = batch["polls"] > self.polls_until_done
+        count = len(batch["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count - 1 if ended else 0,
+                "errored": 1 if ended else 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": "2025-01-01T00:00:00Z",
+            "expires_at": "2025-01-02T00:00:00Z",
+            "ended_at": "2025-01-01T00:10:00Z" if ended else None,
+            "results_url": f"https://api.anthropic.com/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def _results(self, batch_id):
+        lines = []
+        for index, request in enumerate(self.batches[batch_id]["requests"]):
+            if index == len(self.batches[batch_id]["requests"]) - 1:
+                result = {"type": "errored", "error": {"type": "error", "error": {"type": "invalid_request_error", "message": "bad input"}}}
+            else:
+                prompt = request["params"]["messages"][-1]["content"]
+                text = prompt if isinstance(prompt, str) else prompt[-1]["text"]
+                result = {"type": "succeeded", "message": {
+                    "id": f"msg_{index}", "type": "message", "role": "assistant",
+                    "model": request["params"]["model"],
+                    "content": [{"type": "text", "text": f"done: {text[:30]}"}],
+                    "stop_reason": "end_turn", "stop_sequence": None,
+                    "usage": {"input_tokens": 100, "output_tokens": 20},
+                }}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "result": result}))
+        return "\n".join(lines)
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == "POST" and path.endswith("/messages/batches"):
+            self.created += 1
+            batch_id = f"msgbatch_{self.created}"
+            self.batches[batch_id] = {"requests": json.loads(request.content)["requests"], "polls": 0}
+            return httpx.Response(200, json=self._batch(batch_id))
+        if path.endswith("/results"):
+            return httpx.Response(200, text=self._results(path.split("/")[-2]))
+        batch_id = path.split("/")[-1]
+        self.batches[batch_id]["polls"] += 1
+        return httpx.Response(200, json=self._batch(batch_id))
+
+
+def test_batch():
+    """Test submit, poll, result mapping and resume after a crash"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING BULK MODE (LOCAL BATCH ENDPOINT)")
+    print("="*60 + "\n")
+
+    server = LocalBatchServer()
+    client = Anthropic(
+        api_key="test",
+        http_client=httpx.Client(transport=httpx.MockTransport(server.handler)),
+        max_retries=0,
+    )
+    state_dir = tempfile.mkdtemp()
+
+    # Test 1: Build and submit a job mixing agents and specialized methods
+    job = BatchJob("nightly-review", client=client, state_dir=state_dir)
+    job.add_method("engineering", "review_code", "def add(a, b): return a + b", "math.py")
+    job.add_method("security", "assess_threat_model", "Location sharing with contacts")
+    job.add("engineering", "This one will fail", custom_id="will-fail")
+    job.submit()
+    assert server.created == 1
+    assert job.poll() == "submitted"
+    print("✅ Submitted 3 tasks as one batch")
+
+    # Test 2: "Crash" - a new process resumes from disk and doesn't resubmit
+    resumed = BatchJob.resume("nightly-review", client=client, state_dir=state_dir)
+    assert resumed.batch_id == job.batch_id
+    results = resumed.wait(poll_interval=0)
+    assert server.created == 1
+    print("✅ Resumed after crash without resubmitting")
+
+    # Test 3: Results map back to the agents' usual result dictionaries
+    review = results["task-00000"]
+    assert review["success"] and review["agent"] == "Engineering AI"
+    assert review["output"].startswith("done: Review this code")
+    assert review["tokens_used"] == 120 and review["batch"]
+    assert results["task-00001"]["agent"] == "Security AI"
+    assert not results["will-fail"]["success"]
+    assert "bad input" in results["will-fail"]["output"]
+    print("✅ Results mapped per task (including the failed one)")
+
+    # Test 4: Collected results are served from disk on later resumes
+    again = BatchJob.resume("nightly-review", client=client, state_dir=state_dir)
+    assert again.status == "collected" and again.wait() == results
+    print(f"\n📊 Jobs: {BatchJob.list_jobs(state_dir)}")
+
+    print("\n" + "="*60)
+    print("🎉 BULK MODE TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_batch()
@@ -65,13 +65,7 @@ Provide a concise protocol design that Engineering AI can implement."""
     
     engineering_result = pulse.route_to_agent(
         "engineering",
-        f"""Based on Security AI's emergency protocol design, create a technical implementation plan for BEACON:
-
-SECURITY AI'S PROTOCOL:
-
-{security_result['output'][:1000]}...
-
-YOUR TASK:
+        """Based on Security AI's emergency protocol design (attached), create a technical implementation plan for BEACON.
 
 Provide a concise technical architecture including:
 1. Database schema for emergency contacts and alerts
@@ -80,7 +74,9 @@ Provide a concise technical architecture including:
 4. Real-time location tracking implementation
 5. SMS/push notification integration approach
 
-Keep it high-level - we'll build details later."""
+Keep it high-level - we'll build details later.""",
+        # The whole protocol, sent once and referenced by hash on follow-ups
+        context={"security_protocol": security_result} if security_result["success"] else None,
     )
     
     if engineering_result["success"]:
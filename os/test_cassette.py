@@ -0,0 +1,93 @@
+"""
+Test script for record & replay (runs offline against the local fake model server)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Record from a local server only - never the real API
+server = FakeModelServer(latency=0.05, tokens_per_second=400, output_tokens=20).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_REDIS": "False",
+})
+
+from agents.engineering_ai import EngineeringAI
+from core.cassette import cassettes
+
+
+def workflow():
+    """A small multi-step run: plain, streamed and async calls"""
+    agent = EngineeringAI()
+    first = agent.execute_task("Design the login API", use_cache=False)
+    events = list(agent.stream_task("Now list the endpoints", use_cache=False))
+    third = asyncio.run(agent.execute_task_async("Estimate the work", use_cache=False))
+    chunks = [event["text"] for event in events if event["type"] == "text"]
+    return first, chunks, events[-1]["result"], third
+
+
+def test_cassette():
+    """Test recording a workflow and replaying it without the server"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING RECORD & REPLAY")
+    print("="*60 + "\n")
+
+    path = str(Path(tempfile.mkdtemp()) / "workflow.json")
+
+    # Test 1: Record against the server
+    started = time.perf_counter()
+    with cassettes.use(path, mode="record") as cassette:
+        recorded = workflow()
+        assert not Path(path).exists()  # kept in memory until the block ends
+    record_time = time.perf_counter() - started
+    assert len(json.loads(Path(path).read_text())["interactions"]) == 3
+    assert len(cassette.interactions) == 3 and server.stats["requests"] == 3
+    assert cassette.interactions[1]["response"]["chunks"]
+    assert cassette.interactions[1]["usage"]["output_tokens"] == 20
+    print(f"✅ Recorded 3 calls (incl. a stream) in {record_time * 1000:.0f}ms")
+
+    # Test 2: Replay with the server gone - same answers, chunks and usage
+    server.stop()
+    started = time.perf_counter()
+    with cassettes.use(path, mode="replay"):
+        replayed = workflow()
+    replay_time = time.perf_counter() - started
+    assert replayed[0]["output"] == recorded[0]["output"]
+    assert replayed[1] == recorded[1] and len(replayed[1]) == 20
+    assert replayed[2]["output_tokens"] == recorded[2]["output_tokens"]
+    assert replayed[3]["output"] == recorded[3]["output"]
+    print(f"✅ Replayed offline in {replay_time * 1000:.0f}ms (recording took {record_time * 1000:.0f}ms)")
+
+    # Test 3: Replay with the recorded timing
+    started = time.perf_counter()
+    with cassettes.use(path, mode="replay", speed=1.0):
+        workflow()
+    assert time.perf_counter() - started >= 0.15  # three calls of >= 50ms each
+    print("✅ Recorded latency simulated")
+
+    # Test 4: An unrecorded request fails fast with a clear message
+    with cassettes.use(path, mode="replay"):
+        result = EngineeringAI().execute_task("Something never recorded", use_cache=False)
+    assert not result["success"] and "record the cassette again" in result["output"]
+    print("✅ Unrecorded request reported (no retries)")
+
+    print("\n" + "="*60)
+    print("🎉 RECORD & REPLAY TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_cassette()
@@ -0,0 +1,95 @@
+"""
+Test script for the shared Anthropic client (runs offline against the local fake model server)
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+server = FakeModelServer(output_tokens=10).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_ENABLED": "False",
+})
+
+from core.clients import client_registry
+from core.config import config
+from pulse.coordinator import PulseCoordinator, get_pulse
+
+
+def test_clients():
+    """Test that PULSE and every agent share one keep-alive connection pool"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING SHARED CLIENT")
+    print("="*60 + "\n")
+
+    # Test 1: Nothing is built until the first call
+    pulse = get_pulse()
+    engineering = pulse._get_agent("engineering")[0]
+    security = pulse._get_agent("security")[0]
+    assert not client_registry.get_status()["initialized"]
+    print("✅ No client built at startup")
+
+    # Test 2: One pool underneath every agent; only the timeout differs
+    clients = [pulse.client, engineering.client, security.client]
+    assert len({id(client._client) for client in clients}) == 1
+    assert engineering.client is engineering.client
+    assert clients[0].timeout.read == config.get_agent_timeout("pulse")
+    assert clients[1].timeout.read == config.get_agent_timeout("engineering")
+    print(f"✅ One connection pool shared by {client_registry.get_status()['agent_clients']}")
+
+    # Test 3: Calls from every agent reuse the same kept-alive connection
+    for _ in range(3):
+        assert pulse.process_request("Status?", use_cache=False)["success"]
+        assert engineering.execute_task("Plan the alert API", use_cache=False)["success"]
+        assert security.execute_task("Review the alert API", use_cache=False)["success"]
+    assert server.stats["requests"] == 9 and server.stats["connections"] == 1
+    print("✅ 9 calls from 3 agents over 1 connection")
+
+    # Test 4: With ANTHROPIC_PREWARM_CONNECTIONS set, startup warms the pool
+    client_registry.close()
+    server.reset_stats()
+    config.ANTHROPIC_PREWARM_CONNECTIONS = 2
+    PulseCoordinator()
+    deadline = time.monotonic() + 2
+    while client_registry.get_status()["warmed_connections"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert server.stats["requests"] == 0 and server.stats["connections"] == 2
+    assert engineering.execute_task("Plan the map view", use_cache=False)["success"]
+    assert server.stats["connections"] == 2
+    print("✅ Pool warmed at startup and used by the first call")
+
+    # Test 5: The event loop's async pool is warmed too
+    async def _warm_then_call():
+        warmed = await client_registry.prewarm_async()
+        connections = server.stats["connections"]
+        result = await engineering.execute_task_async("Plan the list view", use_cache=False)
+        return warmed, connections, result
+
+    server.reset_stats()
+    warmed, connections, result = asyncio.run(_warm_then_call())
+    config.ANTHROPIC_PREWARM_CONNECTIONS = 0
+    assert warmed == 2 and connections == 2 and result["success"]
+    assert server.stats["connections"] == 2
+    print(f"✅ Async pool warmed before its first call\n\n📊 Clients: {client_registry.get_status()}")
+
+    server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 SHARED CLIENT TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_clients()
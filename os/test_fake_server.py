@@ -0,0 +1,69 @@
+"""
+Test script for the benchmark fake model server (runs offline, localhost only)
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import anthropic
+import httpx
+
+from benchmarks.fake_server import FakeModelServer
+
+
+def test_fake_server():
+    """Test that the SDK works against the fake server, including caching and errors"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING FAKE MODEL SERVER")
+    print("="*60 + "\n")
+
+    with FakeModelServer(output_tokens=12) as server:
+        client = anthropic.Anthropic(
+            api_key="benchmark", base_url=server.url, http_client=httpx.Client(), max_retries=0
+        )
+        params = {
+            "model": "claude-sonnet-4-20250514",
+            "max_tokens": 100,
+            "system": [{"type": "text", "text": "You are Engineering AI. " * 300, "cache_control": {"type": "ephemeral"}}],
+            "messages": [{"role": "user", "content": "Review app.tsx"}],
+        }
+
+        # Test 1: Plain call - reply length and cache write
+        first = client.messages.create(**params)
+        assert first.usage.output_tokens == 12 and first.content[0].text.startswith("the plan")
+        assert first.usage.cache_creation_input_tokens > 1024
+        print(f"✅ First call wrote {first.usage.cache_creation_input_tokens} tokens to the cache")
+
+        # Test 2: Same prefix again is a cache read
+        second = client.messages.create(**params)
+        assert second.usage.cache_read_input_tokens == first.usage.cache_creation_input_tokens
+        assert second.usage.cache_creation_input_tokens == 0
+        print("✅ Repeated prefix read from the cache")
+
+        # Test 3: Streaming
+        with client.messages.stream(**params) as stream:
+            chunks = list(stream.text_stream)
+            final = stream.get_final_message()
+        assert len(chunks) == 12 and final.usage.output_tokens == 12
+        print("✅ Streamed 12 chunks")
+
+        # Test 4: Error injection
+        server.error_rate = 1.0
+        try:
+            client.messages.create(**params)
+            raise AssertionError("expected an injected error")
+        except anthropic.APIStatusError as e:
+            assert e.status_code in (529, 429, 500)
+        print(f"✅ Injected error returned\n\n📊 Server: {server.stats}")
+
+    print("\n" + "="*60)
+    print("🎉 FAKE MODEL SERVER TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_fake_server()
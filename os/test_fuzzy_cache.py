@@ -0,0 +1,104 @@
+"""
+Test script for the fuzzy (near-duplicate) cache (runs offline against the local fake model server)
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+server = FakeModelServer(output_tokens=10).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_REDIS": "False",
+    "FUZZY_CACHE_ENABLED": "True",
+})
+
+from core.fuzzy_cache import FuzzyCache, fuzzy_cache
+from core.sessions import use_session
+
+
+def test_fuzzy_cache():
+    """Test near-duplicate matching, scoping and false-hit auditing"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING FUZZY CACHE")
+    print("="*60 + "\n")
+
+    cache = FuzzyCache(threshold=0.8, max_entries=10, ttl=0)
+    cache.store("session-a", "PULSE, what's the current status of the BEACON project?", "BEACON is on track.", "claude-sonnet-4-20250514")
+
+    # Test 1: A reworded question hits
+    match = cache.lookup("session-a", "Pulse what is the current status of the beacon project")
+    assert match is not None
+    print(f"✅ Reworded request matched (similarity {match['similarity']})")
+
+    # Test 2: A different question misses
+    assert cache.lookup("session-a", "PULSE, what's the current status of the W2GN project?") is None
+    print("✅ Different project did not match")
+
+    # Test 3: Similar wording with different numbers or a negation misses
+    cache.store("session-a", "Should we use Redis for the BEACON alert queue?", "Yes.", "claude-sonnet-4-20250514")
+    cache.store("session-a", "List the top 3 risks for BEACON in the next two weeks", "1. ...", "claude-sonnet-4-20250514")
+    assert cache.lookup("session-a", "Should we not use Redis for the BEACON alert queue?") is None
+    assert cache.lookup("session-a", "Should we use Redis for the BEACON alert queue without a TTL?") is None
+    assert cache.lookup("session-a", "List the top 10 risks for BEACON in the next six months") is None
+    assert cache.lookup("session-a", "list the top 3 risks for beacon in the next two weeks!") is not None
+    cache.store("session-a", "Draft the BEACON launch update for the board meeting on Friday", "Draft...", "claude-sonnet-4-20250514")
+    assert cache.lookup("session-a", "Draft the BEACON launch update for the board meeting on Monday") is None
+    print("✅ Different numbers, negation or time words never match")
+
+    # Test 4: Same question in another conversation misses
+    assert cache.lookup("session-b", "PULSE, what's the current status of the BEACON project?") is None
+    print("✅ Matches are scoped to the conversation")
+
+    # Test 5: Reporting a false hit evicts the entry
+    assert cache.report_false_hit(match["audit_id"])
+    assert cache.lookup("session-a", "Pulse what is the current status of the beacon project") is None
+
+    # Test 6: PULSE never shares fuzzy answers between sessions (even empty ones)
+    from pulse.coordinator import get_pulse
+    pulse = get_pulse()
+    with use_session("alice"):
+        alice_scope = pulse._fuzzy_scope()
+    with use_session("bob"):
+        bob_scope = pulse._fuzzy_scope()
+    assert alice_scope != bob_scope
+    print("✅ Each session has its own fuzzy scope")
+
+    # Test 7: End to end - a reworded follow-up is answered without calling Claude
+    for session_id in (None, "carol"):
+        with use_session(session_id):
+            first = pulse.process_request("PULSE, what's the current status of the BEACON project?")
+            pulse.process_request("Which agent owns the alert API?")  # the conversation moves on
+            requests = server.stats["requests"]
+            again = pulse.process_request("Pulse, what is the current status of the Beacon project")
+        assert first["success"] and "fuzzy_match" in again and again["response"] == first["response"]
+        assert server.stats["requests"] == requests
+    with use_session("dave"):
+        assert "fuzzy_match" not in pulse.process_request("Pulse, what is the current status of the Beacon project")
+    print(f"✅ Reworded request answered from the fuzzy cache through PULSE (in and out of a session): "
+          f"{fuzzy_cache.get_stats()['hits']} hits")
+
+    stats = cache.get_stats()
+    print(f"\n📊 Stats: {stats}")
+    assert stats["hits"] == 2
+    assert stats["false_hits"] == 1
+    assert stats["false_hit_rate"] == 0.5
+
+    server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 FUZZY CACHE TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_fuzzy_cache()
@@ -0,0 +1,66 @@
+"""
+Test that importing Beechwood OS is fast and side-effect free (offline)
+
+Importing PULSE and the agents must not build API clients, read
+credentials, print banners, or pull in the Anthropic SDK.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+OS_DIR = Path(__file__).parent
+
+# Import-time budget in milliseconds (override with IMPORT_TIME_BUDGET_MS)
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "250"))
+
+PROBE = """
+import sys, time
+sys.path.insert(0, {path!r})
+started = time.perf_counter()
+import pulse.coordinator, agents.engineering_ai, agents.security_ai
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(round(elapsed_ms, 1), "anthropic" in sys.modules, "httpx" in sys.modules, "dotenv" in sys.modules)
+"""
+
+
+def test_import_time():
+    """Measure a cold import in a fresh interpreter"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING IMPORT TIME")
+    print("="*60 + "\n")
+
+    # No credentials at all: importing must still work
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("ANTHROPIC_", "SUPABASE_"))}
+
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(path=str(OS_DIR))],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=str(OS_DIR.parent),
+        check=True,
+    ).stdout.strip()
+
+    # The probe's own line must be the only output (no banners, no warnings)
+    assert len(output.splitlines()) == 1, output
+    elapsed_ms, anthropic_loaded, httpx_loaded, dotenv_loaded = output.split()
+
+    print(f"⏱️  Import time: {elapsed_ms} ms (budget {IMPORT_TIME_BUDGET_MS:g} ms)")
+    print(f"📦 anthropic loaded: {anthropic_loaded}, httpx loaded: {httpx_loaded}, dotenv loaded: {dotenv_loaded}")
+
+    assert float(elapsed_ms) <= IMPORT_TIME_BUDGET_MS
+    assert anthropic_loaded == "False"
+    assert httpx_loaded == "False"
+    assert dotenv_loaded == "False"
+
+    print("\n" + "="*60)
+    print("🎉 IMPORT TIME TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_import_time()
@@ -0,0 +1,60 @@
+"""
+Test script for the local intent router (runs offline, no API calls)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.intent_router import IntentRouter
+from core.registry import agent_registry
+from pulse.coordinator import PulseCoordinator
+
+
+def test_intent_router():
+    """Test department decisions, confidence and speed"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING INTENT ROUTER")
+    print("="*60 + "\n")
+
+    router = IntentRouter(agent_registry, fallback_agent=PulseCoordinator)
+
+    examples = {
+        "Create a Python function to calculate factorial with error handling": "engineering",
+        "Review this React component for bugs": "engineering",
+        "Assess the threat model for real-time location sharing": "security",
+        "What should our priorities be for the BEACON launch timeline?": "pulse",
+    }
+
+    # Test 1: Clear requests go to the right department, confidently
+    for request, expected in examples.items():
+        decision = router.classify(request)
+        print(f"   {decision['agent']:12} {decision['confidence']:.2f}  {request}")
+        assert decision["agent"] == expected
+        assert decision["confidence"] > 0.6
+    print("✅ Clear requests routed locally")
+
+    # Test 2: No evidence -> PULSE with zero confidence (LLM fallback territory)
+    decision = router.classify("hello there")
+    assert decision["agent"] == "pulse" and decision["confidence"] == 0.0
+    print("✅ Unclear requests have low confidence")
+
+    # Test 3: Classification is far cheaper than an LLM round trip
+    start = time.perf_counter()
+    for _ in range(1000):
+        router.classify("Design the database schema and API endpoints for emergency contacts")
+    per_call_us = (time.perf_counter() - start) * 1000
+    print(f"✅ {per_call_us:.1f}µs per classification")
+    assert per_call_us < 1000
+
+    print("\n" + "="*60)
+    print("🎉 INTENT ROUTER TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_intent_router()
@@ -0,0 +1,105 @@
+"""
+Test script for bounded conversation memory (runs offline against the local fake model server)
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+server = FakeModelServer(output_tokens=30).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_ENABLED": "False",
+    "RETRY_BASE_DELAY": "0.01",
+})
+
+from agents.engineering_ai import EngineeringAI
+from core.config import config
+from core.memory import Conversation
+
+
+def chat(conversation, turns, start=0):
+    """Add question/answer pairs of ~50 estimated tokens each"""
+    for n in range(start, start + turns):
+        conversation.add("user", f"Question {n}: " + "how should the Beacon alert API handle retries? " * 4)
+        conversation.add("assistant", f"Answer {n}: " + "queue the alert, retry with backoff, fall back to SMS. " * 4)
+
+
+def test_memory():
+    """Test the token budget, rolling summaries and the local fallback"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING CONVERSATION MEMORY")
+    print("="*60 + "\n")
+
+    # Test 1: Under budget, nothing is summarized (and no model call is made)
+    conversation = Conversation("engineering", token_budget=2000)
+    chat(conversation, 4)
+    conversation.maybe_compact(background=False)
+    assert len(conversation) == 8 and not conversation.summary and server.stats["requests"] == 0
+    print(f"✅ Under budget: {len(conversation)} messages kept verbatim")
+
+    # Test 2: Over budget, the oldest turns become a summary
+    conversation = Conversation("engineering", token_budget=400)
+    chat(conversation, 10)
+    before = conversation.estimated_tokens()
+    conversation.maybe_compact(background=False)
+    messages = conversation.messages
+    assert conversation.summary and conversation.summarized_turns > 0 and server.stats["requests"] == 1
+    assert messages[0]["role"] == "user" and messages[-1]["content"].startswith("Answer 9")
+    assert conversation.estimated_tokens() <= 400 < before
+    print(f"✅ Over budget: {conversation.summarized_turns} messages summarized "
+          f"({before} -> {conversation.estimated_tokens()} estimated tokens)")
+
+    # Test 3: The next compaction folds the old summary into the new one
+    summarized = conversation.summarized_turns
+    chat(conversation, 6, start=10)
+    conversation.maybe_compact(background=False)
+    assert conversation.summarized_turns > summarized and server.stats["requests"] == 2
+    assert conversation.estimated_tokens() <= 400
+    print("✅ Summary rolled forward on the next compaction")
+
+    # Test 4: When the summary call fails, a local summary is used instead
+    server.error_rate, server.error_statuses = 1.0, (400,)
+    conversation = Conversation("engineering", token_budget=400)
+    chat(conversation, 10)
+    conversation.maybe_compact(background=False)
+    server.error_rate = 0.0
+    assert conversation.summary.startswith("- user: Question 0") and len(conversation) < 20
+    assert len(conversation.summary) <= config.HISTORY_SUMMARY_MAX_TOKENS * 4
+    print("✅ Summary model failed -> local fallback summary")
+
+    # Test 5: Background compaction doesn't block the turn; the agent sends the summary
+    agent = EngineeringAI()
+    agent.conversation.token_budget = 400
+    chat(agent.conversation, 9)
+    server.latency = 0.3
+    started = time.perf_counter()
+    agent.conversation.add("user", "Question 9: and for push notifications?")
+    agent._finish_turn("Use the same queue.")
+    assert time.perf_counter() - started < 0.2 and agent.conversation.busy
+    time.sleep(0.5)
+    server.latency = 0.0
+    assert not agent.conversation.busy and agent.conversation.summary
+    system = agent._build_request()["system"]
+    assert "SUMMARY OF EARLIER CONVERSATION" in str(system)
+    print(f"✅ Summarized in the background, then sent with the system prompt\n\n📊 Memory: {agent.conversation.get_status()}")
+
+    server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 CONVERSATION MEMORY TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_memory()
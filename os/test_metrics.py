@@ -0,0 +1,89 @@
+"""
+Test script for call metrics (runs offline, no API calls)
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.metrics import Metrics
+
+
+MODEL = "claude-sonnet-4-20250514"
+
+
+def test_metrics():
+    """Test call tracking, token counting and the Prometheus export"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING CALL METRICS")
+    print("="*60 + "\n")
+
+    metrics = Metrics()
+
+    # Test 1: A successful streamed call records latency, TTFT and tokens
+    with metrics.track("engineering", MODEL) as call:
+        assert metrics.get_metrics()["beechwood_requests_in_flight"][0]["value"] == 1
+        metrics.finish(call, {
+            "success": True, "model": MODEL, "input_tokens": 1200, "output_tokens": 300,
+            "cache_creation_input_tokens": 0, "cache_read_input_tokens": 900,
+            "time_to_first_token": 0.4,
+        })
+    snapshot = metrics.get_metrics()
+    assert snapshot["beechwood_requests_in_flight"][0]["value"] == 0
+    tokens = {row["type"]: row["value"] for row in snapshot["beechwood_tokens_total"]}
+    assert tokens == {"input": 1200, "output": 300, "cache_read": 900}
+    assert snapshot["beechwood_time_to_first_token_seconds"][0]["count"] == 1
+    print("✅ Success recorded with tokens and time-to-first-token")
+
+    # Test 2: Errors are counted by type; cache hits add no tokens
+    with metrics.track("security", MODEL) as call:
+        metrics.finish(call, {"success": False, "error_type": "RateLimitError"})
+    with metrics.track("security", MODEL) as call:
+        metrics.finish(call, {"success": True, "model": MODEL, "cached": True, "input_tokens": 0})
+    try:
+        with metrics.track("security", MODEL):
+            raise TimeoutError("too slow")
+    except TimeoutError:
+        pass
+    errors = {row["error"]: row["value"] for row in metrics.get_metrics()["beechwood_errors_total"]}
+    assert errors == {"RateLimitError": 1, "TimeoutError": 1}
+    statuses = {
+        row["status"]: row["value"] for row in metrics.get_metrics()["beechwood_requests_total"]
+        if row["agent"] == "security"
+    }
+    assert statuses == {"error": 2, "cached": 1}
+    print("✅ Errors by type, cache hits counted separately")
+
+    # Test 3: Abandoned streams count as cancelled, not as provider errors
+    def stream():
+        with metrics.track("pulse", MODEL) as call:
+            yield "chunk"
+            metrics.finish(call, {"success": True, "model": MODEL})
+    chunks = stream()
+    next(chunks)
+    chunks.close()
+    assert {"agent": "pulse", "model": MODEL, "error": "Cancelled", "value": 1} in metrics.get_metrics()["beechwood_errors_total"]
+    print("✅ Closed streams recorded as cancelled")
+
+    # Test 4: Prometheus text format
+    metrics.record_resilience_event("engineering", "retries")
+    text = metrics.render()
+    assert "# TYPE beechwood_request_duration_seconds histogram" in text
+    assert f'beechwood_request_duration_seconds_bucket{{agent="engineering",model="{MODEL}",le="+Inf"}} 1' in text
+    assert 'beechwood_resilience_events_total{agent="engineering",event="retries"} 1' in text
+    assert text.endswith("\n")
+    print(f"✅ Prometheus export ({len(text.splitlines())} lines)")
+
+    latency = metrics.get_metrics()["beechwood_request_duration_seconds"][0]
+    print(f"\n📊 Engineering latency: {latency}")
+
+    print("\n" + "="*60)
+    print("🎉 CALL METRICS TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_metrics()
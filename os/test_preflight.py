@@ -0,0 +1,91 @@
+"""
+Test script for local token estimation and request preflight (runs offline against the local fake model server)
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+server = FakeModelServer(output_tokens=20).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_ENABLED": "False",
+    "PROMPT_CACHING": "False",
+})
+
+from agents.engineering_ai import EngineeringAI
+from core.tokens import (
+    MODEL_CONTEXT_WINDOWS, RequestTooLargeError, estimate_tokens, preflight_request,
+)
+
+
+def test_preflight():
+    """Test estimates, trimming oversized history and rejecting oversized turns"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING TOKEN PREFLIGHT")
+    print("="*60 + "\n")
+
+    # Test 1: Estimates (punctuation-heavy code costs more per character)
+    prose = "Plan the alert API for Beacon"
+    code = "if (a.b(c)) { d[e] = f; }"
+    assert estimate_tokens("") == 0 and estimate_tokens(prose) == 8
+    assert estimate_tokens(code) / len(code) > estimate_tokens(prose) / len(prose)
+    print(f"✅ Estimates: prose {estimate_tokens(prose)}, code {estimate_tokens(code)} tokens")
+
+    # Test 2: Over the window, the oldest turns are left out of the request
+    MODEL_CONTEXT_WINDOWS["tiny-model"] = 500
+    turn = "Keep the alert queue durable and retry with backoff. " * 10
+    messages = [
+        {"role": role, "content": f"{n}: {turn}"}
+        for n in range(8) for role in ("user", "assistant")
+    ] + [{"role": "user", "content": "And now?"}]
+    params, estimate = preflight_request({"model": "tiny-model", "max_tokens": 100, "system": "", "messages": messages})
+    assert estimate["trimmed_messages"] > 0 and params["messages"][0]["role"] == "user"
+    assert params["messages"][-1]["content"] == "And now?" and len(messages) == 17
+    assert estimate["input_tokens"] * 1.1 + 100 <= 500
+    print(f"✅ Trimmed {estimate['trimmed_messages']} old messages to fit ({estimate['input_tokens']} tokens)")
+
+    # Test 3: A single turn that can't fit is rejected
+    try:
+        preflight_request({"model": "tiny-model", "max_tokens": 100, "messages": [{"role": "user", "content": turn * 5}]})
+        assert False, "should not fit"
+    except RequestTooLargeError:
+        pass
+    print("✅ Oversized single turn -> RequestTooLargeError")
+
+    # Test 4: The agent's estimate is close to what the server bills
+    agent = EngineeringAI()
+    estimate = agent.estimate_task("Plan the alert API")
+    assert agent.conversation_history == []  # estimating doesn't touch memory
+    result = agent.execute_task("Plan the alert API", use_cache=False)
+    billed = result["input_tokens"]
+    assert result["estimated_input_tokens"] == estimate["input_tokens"]
+    assert abs(estimate["input_tokens"] - billed) / billed < 0.3
+    print(f"✅ Estimated {estimate['input_tokens']} input tokens, server billed {billed}")
+
+    # Test 5: An oversized task fails before any network call, and isn't remembered
+    requests = server.stats["requests"]
+    history = agent.conversation_history
+    result = agent.execute_task("Review this log:\n" + "GET /v1/alerts 200\n" * 60000, use_cache=False)
+    assert not result["success"] and "too large" in result["output"]
+    assert server.stats["requests"] == requests and agent.conversation_history == history
+    print("✅ Oversized task rejected locally (no request sent, memory unchanged)")
+
+    server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 TOKEN PREFLIGHT TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_preflight()
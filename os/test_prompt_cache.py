@@ -0,0 +1,87 @@
+"""
+Test script for prompt-cache-aware requests (runs offline against the local fake model server)
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+# (a low cache minimum, so the short test prompts are cacheable)
+server = FakeModelServer(output_tokens=20, min_cache_tokens=256).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_ENABLED": "False",
+})
+
+from agents.engineering_ai import EngineeringAI
+from core.config import config
+from core.prompt_cache import CACHE_CONTROL, cacheable_messages, cacheable_system
+
+
+def test_prompt_cache():
+    """Test cache breakpoints and that later turns read the prefix from cache"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING PROMPT CACHING")
+    print("="*60 + "\n")
+
+    # Test 1: Breakpoints on the system prompt and the newest message only
+    history = [
+        {"role": "user", "content": "Plan the alert API"},
+        {"role": "assistant", "content": "Queue, retry, fall back to SMS."},
+        {"role": "user", "content": "Now the map view"},
+    ]
+    assert cacheable_system("You are Engineering AI")[0]["cache_control"] == CACHE_CONTROL
+    marked = cacheable_messages(history)
+    assert marked[:2] == history[:2]
+    assert marked[2]["content"] == [{"type": "text", "text": "Now the map view", "cache_control": CACHE_CONTROL}]
+    assert history[2]["content"] == "Now the map view"  # history itself untouched
+    print("✅ Breakpoints on the system prompt and the newest turn (history unchanged)")
+
+    # Test 2: Each turn reads the previous turns' prefix from cache
+    agent = EngineeringAI()
+    results = [
+        agent.execute_task(task, use_cache=False)
+        for task in ("Plan the alert API", "Now plan the map view", "And push notifications?")
+    ]
+    assert all(result["success"] for result in results)
+    assert results[0]["cache_read_input_tokens"] == 0 and results[0]["cache_creation_input_tokens"] > 0
+    for previous, result in zip(results, results[1:]):
+        # Everything the previous call sent (and cached) is read back
+        sent = previous["cache_read_input_tokens"] + previous["cache_creation_input_tokens"]
+        assert result["cache_read_input_tokens"] >= sent
+    print(f"✅ Cached prefix grows turn by turn: "
+          f"{[result['cache_read_input_tokens'] for result in results]} tokens read from cache")
+
+    # Test 3: The running summary goes after the cached system prompt
+    agent.conversation._summary = "Earlier: agreed on a queue for alerts."
+    system = agent._build_request()["system"]
+    assert system[0]["text"] == agent.system_prompt and "cache_control" in system[0]
+    assert "agreed on a queue" in system[1]["text"] and "cache_control" not in system[1]
+    print("✅ Summary appended after the cached system prompt")
+
+    # Test 4: PROMPT_CACHING off sends plain strings
+    config.PROMPT_CACHING = False
+    params = agent._build_request()
+    config.PROMPT_CACHING = True
+    assert isinstance(params["system"], str) and "agreed on a queue" in params["system"]
+    assert params["messages"] == agent.conversation_history
+    print("✅ PROMPT_CACHING=False -> no cache_control anywhere")
+
+    server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 PROMPT CACHING TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_prompt_cache()
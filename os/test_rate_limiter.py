@@ -0,0 +1,105 @@
+"""
+Test script for the shared rate limiter (runs offline, no API calls)
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.rate_limiter import RateLimiter
+
+
+def test_rate_limiter():
+    """Test queuing, fair sharing and usage settlement"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING RATE LIMITER")
+    print("="*60 + "\n")
+
+    # 600 RPM = 10 requests per second once the initial burst is used up
+    limiter = RateLimiter(
+        requests_per_minute=600,
+        input_tokens_per_minute=60000,
+        output_tokens_per_minute=60000,
+    )
+
+    # Test 1: Usage settles the reservation (unused output is returned)
+    with limiter.reserve("engineering", 1000, 8000) as ticket:
+        ticket.usage = SimpleNamespace(input_tokens=900, output_tokens=500, cache_creation_input_tokens=0)
+    available = limiter.get_stats()["available"]
+    assert 58900 <= available["input_tokens"] <= 60000
+    assert 59000 <= available["output_tokens"] <= 60000
+    print("✅ Reservations settled against real usage")
+
+    # Test 2: An empty bucket queues work instead of failing it
+    limiter.buckets["requests"].tokens = 0
+    order = []
+
+    def call(agent):
+        with limiter.reserve(agent, 10, 10):
+            order.append(agent)
+
+    threads = [threading.Thread(target=call, args=("engineering",)) for _ in range(4)]
+    threads[0].start()
+    time.sleep(0.02)  # engineering is first in line
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.02)
+    threads.append(threading.Thread(target=call, args=("security",)))
+    threads[-1].start()
+
+    stats = limiter.get_stats()
+    print(f"   Queue depth while saturated: {stats['queue_depth']}")
+    assert stats["queue_depth"] == 5
+
+    for thread in threads:
+        thread.join()
+    print(f"   Grant order: {order}")
+    assert len(order) == 5
+
+    # Test 3: Security didn't wait behind all of engineering's backlog
+    assert order.index("security") <= 2
+    print("✅ Agents take turns")
+
+    stats = limiter.get_stats()
+    print(f"\n📊 Stats: queue_depth={stats['queue_depth']} waited={stats['waited']} "
+          f"avg_wait={stats['avg_wait']}s max_wait={stats['max_wait']}s")
+    assert stats["queue_depth"] == 0
+    assert stats["waited"] >= 5
+
+    # Test 4: Calls reserve their expected output, not all of max_tokens
+    limiter = RateLimiter(requests_per_minute=0, input_tokens_per_minute=0, output_tokens_per_minute=8000)
+    first = limiter.acquire("engineering", 100, 8192)
+    second = limiter.acquire("security", 100, 8192)  # would wait a minute if 8192 were reserved
+    first.usage = second.usage = SimpleNamespace(input_tokens=100, output_tokens=300, cache_creation_input_tokens=0)
+    limiter.settle(first)
+    limiter.settle(second)
+    assert limiter.expected_output("engineering", 8192) == 300
+    print(f"✅ Two 8192-max_tokens calls ran side by side (next reservation: "
+          f"{limiter.expected_output('engineering', 8192)} tokens)")
+
+    # Test 5: Limits that aren't configured are learned from response headers
+    limiter = RateLimiter(requests_per_minute=0, input_tokens_per_minute=0, output_tokens_per_minute=0)
+    assert limiter.buckets == {}
+    limiter.observe_headers({"anthropic-ratelimit-output-tokens-limit": "80000", "anthropic-ratelimit-requests-limit": "1000"})
+    limits = limiter.get_stats()["limits_per_minute"]
+    assert limits == {"output_tokens": 80000, "requests": 1000}
+    limiter.observe_headers({"anthropic-ratelimit-output-tokens-limit": "160000"})
+    assert limiter.get_stats()["limits_per_minute"]["output_tokens"] == 160000
+    configured = RateLimiter(requests_per_minute=50, input_tokens_per_minute=0, output_tokens_per_minute=0)
+    configured.observe_headers({"anthropic-ratelimit-requests-limit": "1000"})
+    assert configured.get_stats()["limits_per_minute"]["requests"] == 50
+    print(f"✅ Limits learned from headers: {limits} (configured limits win)")
+
+    print("\n" + "="*60)
+    print("🎉 RATE LIMITER TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_rate_limiter()
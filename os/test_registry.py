@@ -0,0 +1,115 @@
+"""
+Test script for the agent registry and plugin discovery (runs offline against the local fake model server)
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+server = FakeModelServer(output_tokens=10).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_ENABLED": "False",
+    "INTENT_ROUTER_LLM_FALLBACK": "False",
+})
+
+import agents
+from core.lazy import lazy_singleton
+from core.registry import AgentRegistry, agent_registry
+from pulse.coordinator import get_pulse
+
+# A new department, dropped in as a module (what a plugin looks like)
+MARKETING_MODULE = '''
+from core.agent import BaseAgent
+from core.lazy import lazy_singleton
+from core.registry import agent_registry
+
+
+class MarketingAI(BaseAgent):
+    agent_key = "marketing"
+    name = "Marketing AI"
+    department = "Marketing"
+    specialty = "Launch campaigns, press releases, positioning"
+    aliases = ["mkt", "growth"]
+    capabilities = ["campaign", "press release", "blog post", "positioning", "newsletter"]
+
+    def _create_system_prompt(self) -> str:
+        return "You are the Marketing AI employee at Beechwood Corporation."
+
+
+agent_registry.register(MarketingAI, lazy_singleton(MarketingAI))
+'''
+
+
+class CountingAgent:
+    """Just enough of an agent class to register"""
+
+    agent_key = "counting"
+    name = "Counting AI"
+    department = "Testing"
+    specialty = "Counting instances"
+    created = 0
+
+    def __init__(self):
+        CountingAgent.created += 1
+
+
+def test_registry():
+    """Test lookups, lazy instances and dropping in a new department"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING AGENT REGISTRY")
+    print("="*60 + "\n")
+
+    # Test 1: Discovery fills the directory; any name for an agent finds it
+    assert {"engineering", "security"} <= set(agent_registry.names())
+    for name in ("security", "SEC", "Security AI", "security & safety", " privacy "):
+        assert agent_registry.resolve(name).key == "security", name
+    assert agent_registry.resolve("eng").key == "engineering" and agent_registry.resolve("legal") is None
+    print("✅ Agents found by key, alias, display name and department")
+
+    # Test 2: Describing agents creates none; get() creates one, once
+    registry = AgentRegistry(package="agents")
+    registry.register(CountingAgent, lazy_singleton(CountingAgent))
+    registry._discovered = True  # only the agent registered above
+    assert registry.describe()[0]["name"] == "Counting AI" and CountingAgent.created == 0
+    assert registry.get("counting") is registry.get("Counting AI") and CountingAgent.created == 1
+    print("✅ Directory listed without creating agents; instances made on first use")
+
+    # Test 3: A module dropped into the agents package becomes a department
+    plugin_dir = tempfile.mkdtemp()
+    Path(plugin_dir, "marketing_ai.py").write_text(MARKETING_MODULE)
+    agents.__path__.append(plugin_dir)
+    version = agent_registry.version
+    agent_registry.discover(force=True)
+    assert "marketing" in agent_registry.names() and agent_registry.version > version
+    assert agent_registry.resolve("growth").key == "marketing"
+    print("✅ New module discovered and registered")
+
+    # Test 4: PULSE routes to it with no coordinator changes
+    pulse = get_pulse()
+    routing = pulse.classify_request("Draft the press release and newsletter campaign")
+    assert routing["agent"] == "marketing"
+    result = pulse.route_to_agent("mkt", "Draft the press release")
+    assert result["success"] and result["agent"] == "Marketing AI"
+    print(f"✅ PULSE routed to the new department ({routing['confidence']:.2f} confidence)")
+
+    agents.__path__.remove(plugin_dir)
+    server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 AGENT REGISTRY TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_registry()
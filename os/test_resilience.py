@@ -0,0 +1,170 @@
+"""
+Test script for retries and circuit breakers (runs offline, no API calls)
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Keep the test fast: tiny backoff delays
+os.environ.setdefault("RETRY_BASE_DELAY", "0.01")
+os.environ.setdefault("HEDGE_DELAY", "0.05")
+
+import asyncio
+import time
+
+from core.rate_limiter import is_urgent, urgent
+from core.resilience import CircuitBreaker, CircuitOpenError, Resilience, retry_after
+from core.sessions import current_session, use_session
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeAPIError(Exception):
+    """Looks like an anthropic.APIStatusError"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse(headers or {})
+
+
+def flaky(failures):
+    """A call that raises the given errors first, then succeeds"""
+    errors = list(failures)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    return call, calls
+
+
+def test_resilience():
+    """Test retries, retry-after and breaker transitions"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING RESILIENCE LAYER")
+    print("="*60 + "\n")
+
+    # Test 1: Transient errors are retried until the call succeeds
+    layer = Resilience()
+    call, calls = flaky([FakeAPIError(529), FakeAPIError(429)])
+    assert layer.call("engineering", call) == "ok"
+    assert len(calls) == 3
+    assert layer.get_status("engineering")["retries"] == 2
+    print("✅ 529/429 retried")
+
+    # Test 2: A bad request is not retried
+    call, calls = flaky([FakeAPIError(400)])
+    try:
+        layer.call("engineering", call)
+        assert False, "400 should be raised"
+    except FakeAPIError:
+        pass
+    assert len(calls) == 1
+    print("✅ 400 raised immediately")
+
+    # Test 3: retry-after headers are understood
+    assert retry_after(FakeAPIError(429, {"retry-after": "2"})) == 2.0
+    assert retry_after(FakeAPIError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after(FakeAPIError(429)) is None
+    print("✅ retry-after parsed")
+
+    # Test 4: Breaker opens, fails fast, then recovers through a probe
+    breaker = CircuitBreaker("security", failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker._state == CircuitBreaker.OPEN
+
+    breaker.before_call()  # reset timeout passed: this is the probe
+    try:
+        breaker.before_call()
+        assert False, "only one probe allowed"
+    except CircuitOpenError:
+        pass
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    print("✅ Breaker open -> half-open -> closed")
+
+    # Test 5: An open breaker short-circuits calls
+    layer = Resilience()
+    layer.breaker("pulse")._failure_threshold = 1
+    layer.breaker("pulse")._reset_timeout = 60
+    call, calls = flaky([FakeAPIError(503)])
+    try:
+        layer.call("pulse", call)
+    except FakeAPIError:
+        pass
+    try:
+        layer.call("pulse", call)
+        assert False, "breaker should be open"
+    except CircuitOpenError:
+        pass
+    assert len(calls) == 1
+
+    status = layer.get_status("pulse")
+    print(f"\n📊 Status: {status}")
+    assert status["circuit"]["state"] == "open"
+    assert status["short_circuited"] == 1
+
+    # Test 6: Both hedged attempts keep the caller's urgency and session
+    layer = Resilience()
+    seen = []
+
+    def slow():
+        seen.append((is_urgent(), current_session()))
+        time.sleep(0.1)
+        return "ok"
+
+    with urgent(), use_session("ceo:pulse"):
+        assert layer.call("pulse", slow) == "ok"
+    assert seen == [(True, "ceo:pulse")] * 2
+    assert layer.get_status("pulse")["hedges"] == 1
+    print("✅ Hedged attempts ran with the caller's urgent() and session")
+
+    # Test 7: A cancelled half-open probe doesn't leave the breaker stuck
+    layer = Resilience()
+    layer.breaker("security")._failure_threshold = 1
+    layer.breaker("security")._reset_timeout = 0.01
+    call, _ = flaky([FakeAPIError(503)])
+    try:
+        layer.call("security", call)
+    except FakeAPIError:
+        pass
+    time.sleep(0.02)
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    async def answer():
+        return "ok"
+
+    async def _probe_then_retry():
+        try:
+            await asyncio.wait_for(layer.call_async("security", hang, hedge=False), timeout=0.05)
+        except asyncio.TimeoutError:
+            pass
+        return await layer.call_async("security", answer, hedge=False)
+
+    assert asyncio.run(_probe_then_retry()) == "ok"
+    assert layer.breaker("security").state == CircuitBreaker.CLOSED
+    print("✅ Cancelled half-open probe released; the next call probed and closed the breaker")
+
+    print("\n" + "="*60)
+    print("🎉 RESILIENCE TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_resilience()
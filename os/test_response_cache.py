@@ -0,0 +1,77 @@
+"""
+Test script for the response cache (runs offline, no API calls)
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.response_cache import ResponseCache
+
+
+class LocalRedis:
+    """Tiny in-process stand-in for a Redis server"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def test_response_cache():
+    """Test keys, tiers and hit/miss counters"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING RESPONSE CACHE")
+    print("="*60 + "\n")
+
+    redis = LocalRedis()
+    cache = ResponseCache(redis_client=redis)
+
+    params = {
+        "model": "claude-sonnet-4-20250514",
+        "max_tokens": 8192,
+        "system": "You are the Security AI employee",
+        "messages": [{"role": "user", "content": "Assess the threat model for location sharing"}],
+    }
+
+    # Test 1: Same request -> same key, different request -> different key
+    key = cache.make_key("security", params)
+    assert key == cache.make_key("security", dict(params))
+    assert key != cache.make_key("engineering", params)
+    assert key != cache.make_key("security", {**params, "max_tokens": 4096})
+    print("✅ Keys are content-addressed")
+
+    # Test 2: Miss, then hit from memory
+    assert cache.get(key) is None
+    cache.set(key, "Threat model...", params["model"])
+    hit = cache.get(key)
+    assert hit is not None and hit.content[0].text == "Threat model..."
+    assert hit.usage.input_tokens == 0
+    print("✅ Memory tier hit")
+
+    # Test 3: Memory cleared -> served from the Redis tier
+    cache.clear()
+    assert cache.get(key) is not None
+    print("✅ Redis tier hit")
+
+    stats = cache.get_stats()
+    print(f"\n📊 Stats: {stats}")
+    assert stats["hits"] == 2
+    assert stats["memory_hits"] == 1
+    assert stats["redis_hits"] == 1
+    assert stats["misses"] == 1
+
+    print("\n" + "="*60)
+    print("🎉 RESPONSE CACHE TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_response_cache()
@@ -0,0 +1,91 @@
+"""
+Test script for multi-agent fan-out (runs offline against the local fake model server)
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+server = FakeModelServer(latency=0.2, output_tokens=20).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_ENABLED": "False",
+})
+
+from pulse.coordinator import get_pulse
+
+TASKS = [
+    ("engineering", "Plan the alert API"),
+    ("engineering", "Plan the map view"),
+    ("security", "Threat model location sharing"),
+    ("marketing", "Write a launch post"),
+]
+
+
+def test_route_many():
+    """Test parallel fan-out, memory isolation and timeouts"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING MULTI-AGENT FAN-OUT")
+    print("="*60 + "\n")
+
+    pulse = get_pulse()
+    engineering = pulse._get_agent("engineering")[0]
+
+    # Test 1: Tasks run in parallel and come back with their index
+    list(pulse.route_many(TASKS[:3]))  # warm up: agents and connection pool
+    started = time.perf_counter()
+    results = list(pulse.route_many(TASKS, max_concurrency=4))
+    elapsed = time.perf_counter() - started
+    by_index = {result["task_index"]: result for result in results}
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert all(by_index[index]["success"] for index in range(3))
+    assert by_index[3]["error"] == "Unknown agent: marketing"
+    assert elapsed < 0.35
+    print(f"✅ 3 model calls in {elapsed * 1000:.0f}ms (unknown agent reported, not raised)")
+
+    # Test 2: Two tasks for one agent don't mix turns into its conversation
+    assert engineering.conversation_history == []
+    print("✅ Fan-out left the agents' conversations alone")
+
+    # Test 3: A timed-out task is reported at once and its late answer is dropped
+    server.latency = 0.5
+    started = time.perf_counter()
+    results = list(pulse.route_many(TASKS[:1], timeout=0.1))
+    assert not results[0]["success"] and "timed out" in results[0]["error"]
+    assert time.perf_counter() - started < 0.4
+    time.sleep(0.6)  # the abandoned call finishes in the background
+    assert engineering.conversation_history == []
+    print("✅ Timed-out task reported on time; its late answer never reached memory")
+
+    # Test 4: Async fan-out cancels the timed-out task
+    async def _fan_out():
+        return [result async for result in pulse.route_many_async(TASKS[:3], timeout=0.1)]
+
+    server.latency = 0.2
+    results = asyncio.run(_fan_out())
+    assert all(not result["success"] for result in results)
+    server.latency = 0.0
+    results = asyncio.run(_fan_out())
+    assert all(result["success"] for result in results) and engineering.conversation_history == []
+    print("✅ Async fan-out: timeouts cancelled, results independent of memory")
+
+    server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 MULTI-AGENT FAN-OUT TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_route_many()
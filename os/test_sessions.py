@@ -0,0 +1,182 @@
+"""
+Test script for per-session agent memory (runs offline against the local fake model server)
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+server = FakeModelServer(latency=0.1, output_tokens=300).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "sqlite",
+    "STORE_SQLITE_PATH": str(Path(tempfile.mkdtemp()) / "sessions.db"),
+    "RESPONSE_CACHE_REDIS": "False",
+    "RATE_LIMIT_RPM": "0",
+    "RATE_LIMIT_INPUT_TPM": "0",
+    "RATE_LIMIT_OUTPUT_TPM": "0",
+})
+
+import core.memory
+import core.sessions
+from agents.engineering_ai import EngineeringAI
+from core.config import config
+from core.sessions import sessions, use_session
+from core.task_queue import task_queue
+
+
+def test_sessions():
+    """Test session isolation, accounting and eviction"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING PER-SESSION MEMORY")
+    print("="*60 + "\n")
+
+    agent = EngineeringAI()
+    core.sessions.SWEEP_INTERVAL = 0  # look for idle sessions after every turn
+
+    # Test 1: Two sessions on one agent, at the same time, keep their own history
+    async def _turn(session_id: str, task: str):
+        with use_session(session_id):
+            return await agent.execute_task_async(task, use_cache=False)
+
+    async def _both():
+        await _turn("warmup", "Hello")  # opens the connection pool
+        started = time.perf_counter()
+        await asyncio.gather(_turn("alice", "Plan the login API"), _turn("bob", "Plan the map view"))
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(_both())
+    sessions.drop("warmup")
+    with use_session("alice"):
+        alice = agent.conversation_history
+    with use_session("bob"):
+        bob = agent.conversation_history
+    assert [m["content"] for m in alice if m["role"] == "user"] == ["Plan the login API"]
+    assert [m["content"] for m in bob if m["role"] == "user"] == ["Plan the map view"]
+    assert agent.conversation_history == []  # the agent's own memory is untouched
+    assert elapsed < 0.19
+    print(f"✅ Two sessions ran in parallel ({elapsed * 1000:.0f}ms) with separate histories")
+
+    # Test 2: Work queued from a session stays in that session
+    with use_session("alice"):
+        task_queue.submit(agent.execute_task, "Add rate limiting", use_cache=False).result()
+        assert len(agent.conversation_history) == 4
+    print("✅ Queued task kept its session")
+
+    # Test 3: Per-session accounting
+    status = sessions.get_session_status("alice")
+    assert status["agents"]["engineering"]["messages"] == 4 and status["memory_bytes"] > 0
+    overall = sessions.get_status()
+    assert overall["resident_sessions"] == 2 and overall["largest"][0]["session_id"] == "alice"
+    print(f"✅ alice holds {status['memory_bytes']} bytes across {len(status['agents'])} agent(s)")
+
+    # Test 4: Idle sessions are frozen (compressed) and unpacked on use
+    core.sessions.EVICTION_GRACE_SECONDS = 0
+    config.SESSION_COLD_AFTER = 0.05
+    time.sleep(0.1)
+    with use_session("carol"):
+        agent.execute_task("Plan the settings page", use_cache=False)
+    frozen = sessions.get_session_status("alice")
+    assert frozen["cold"] and frozen["memory_bytes"] < status["memory_bytes"]
+    with use_session("alice"):
+        assert len(agent.conversation_history) == 4
+    assert not sessions.get_session_status("alice")["cold"] and sessions.stats["thawed"] == 1
+    print(f"✅ Idle session frozen ({status['memory_bytes']} -> {frozen['memory_bytes']} bytes) and thawed on use")
+    config.SESSION_COLD_AFTER = 0
+
+    # Test 5: Over the memory limit, the least recently used sessions are
+    # frozen first, then evicted
+    carol = sessions.get_session_status("carol")["memory_bytes"]
+    config.SESSION_MEMORY_LIMIT_MB = (carol + 100) / (1024 * 1024)
+    time.sleep(0.01)
+    with use_session("carol"):
+        agent.execute_task("Add dark mode", use_cache=False)
+    resident = {session["session_id"]: session["cold"] for session in sessions.get_status()["largest"]}
+    assert resident == {"alice": True, "carol": False}  # bob was frozen already, so evicted
+    with use_session("carol"):
+        agent.execute_task("Add a settings search", use_cache=False)
+    resident = {session["session_id"] for session in sessions.get_status()["largest"]}
+    assert resident == {"carol"} and sessions.stats["evicted_lru"] == 2
+    print("✅ Memory cap froze, then evicted the least recently used sessions")
+
+    # Test 6: An evicted session is read back from the store on return
+    with use_session("alice"):
+        contents = [m["content"] for m in agent.conversation_history if m["role"] == "user"]
+    assert contents == ["Plan the login API", "Add rate limiting"]
+    print("✅ Evicted session reloaded from the store")
+
+    # Test 7: Idle sessions are evicted
+    config.SESSION_MEMORY_LIMIT_MB = 0
+    config.SESSION_IDLE_TIMEOUT = 0.05
+    time.sleep(0.1)
+    with use_session("dave"):
+        agent.execute_task("Plan the onboarding", use_cache=False)
+    resident = {session["session_id"] for session in sessions.get_status()["largest"]}
+    assert resident == {"dave"}
+    print("✅ Idle sessions evicted")
+
+    # Test 8: A failed turn leaves nothing behind, so its session can still be evicted
+    server.error_rate, server.error_statuses = 1.0, (400,)
+    with use_session("erin"):
+        assert not agent.execute_task("Plan the billing page", use_cache=False)["success"]
+        assert agent.conversation_history == []
+    assert not sessions.get_session_status("erin") or not sessions._sessions["erin"].busy
+    server.error_rate = 0.0
+    time.sleep(0.1)
+    with use_session("dave"):
+        agent.execute_task("Plan the invite flow", use_cache=False)
+    resident = {session["session_id"] for session in sessions.get_status()["largest"]}
+    assert resident == {"dave"}
+    print(f"✅ Session with a failed turn evicted\n\n📊 Sessions: { {k: v for k, v in sessions.get_status().items() if k != 'largest'} }")
+
+    # Test 9: An async handler returning to an evicted session reads it off the event loop
+    backend = core.memory.conversation_store.backend
+    load_session = backend.load_session
+
+    def slow_load_session(session_id):
+        time.sleep(0.3)  # a slow store
+        return load_session(session_id)
+
+    async def _return_to_alice():
+        ticks = []
+
+        async def _ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(_ticker())
+        await asyncio.sleep(0.02)
+        with use_session("alice"):
+            result = await agent.execute_task_async("And the audit log?", use_cache=False)
+            history = agent.conversation_history
+        ticker.cancel()
+        return result, history, max(b - a for a, b in zip(ticks, ticks[1:]))
+
+    backend.load_session = slow_load_session
+    result, history, longest_stall = asyncio.run(_return_to_alice())
+    backend.load_session = load_session
+    assert result["success"] and history[0]["content"] == "Plan the login API"
+    assert longest_stall < 0.15
+    print(f"✅ Saved memory loaded off the event loop (longest stall {longest_stall * 1000:.0f}ms)")
+
+    server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 PER-SESSION MEMORY TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_sessions()
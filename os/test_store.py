@@ -0,0 +1,135 @@
+"""
+Test script for the conversation store (runs offline, SQLite in a temp dir)
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import core.memory
+from core.memory import Conversation
+from core.config import config
+from core.metrics import metrics
+from core.resilience import resilience
+from core.store import STORE_KEY, ConversationStore, SQLiteBackend
+
+
+class FlakyBackend:
+    """A backend whose first `failures` writes fail as if the database were locked"""
+
+    def __init__(self, backend, failures: int):
+        self.backend = backend
+        self.failures = failures
+        self.attempts = 0
+
+    def write_batch(self, sessions, turns, results):
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        self.backend.write_batch(sessions, turns, results)
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+
+def test_store():
+    """Test write-behind batching and lazy reload after a "restart" """
+
+    print("\n" + "="*60)
+    print("🧪 TESTING CONVERSATION STORE")
+    print("="*60 + "\n")
+
+    path = str(Path(tempfile.mkdtemp()) / "beechwood.db")
+    store = ConversationStore(SQLiteBackend(path))
+    core.memory.conversation_store = store
+
+    # Test 1: Writes don't block - adding turns only queues them
+    memory = Conversation("engineering", token_budget=0, session_id="ceo:engineering")
+    started = time.perf_counter()
+    for turn in range(200):
+        memory.add("user", f"Question {turn}")
+        memory.add("assistant", f"Answer {turn}")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    store.flush()
+    stats = store.get_stats()
+    assert stats["written"] == 400 and stats["errors"] == 0
+    assert stats["batches"] < 400
+    print(f"✅ 400 turns queued in {elapsed_ms:.1f}ms, written in {stats['batches']} batches")
+
+    # Test 2: A new process (fresh store + memory) lazily reloads recent history
+    reopened = ConversationStore(SQLiteBackend(path))
+    core.memory.conversation_store = reopened
+    restarted = Conversation("engineering", token_budget=0, session_id="ceo:engineering")
+    assert restarted._loaded is False
+    assert len(restarted.messages) == 50  # STORE_HISTORY_LOAD_LIMIT
+    assert restarted.messages[0] == {"role": "user", "content": "Question 175"}
+    assert restarted.messages[-1] == {"role": "assistant", "content": "Answer 199"}
+    print("✅ Recent history reloaded on first use")
+
+    # Test 3: New turns continue the sequence; an unanswered turn isn't saved
+    restarted.add("user", "Question 200")
+    restarted.add("assistant", "Answer 200")
+    restarted.add("user", "Never answered")
+    reopened.flush()
+    history = reopened.load_history("ceo:engineering")
+    assert history["turns"][-1]["content"] == "Answer 200"
+    assert history["next_seq"] == 402
+    print("✅ Only completed turns are saved")
+
+    # Test 4: Clearing memory survives a restart
+    restarted.clear()
+    reopened.flush()
+    core.memory.conversation_store = ConversationStore(SQLiteBackend(path))
+    assert Conversation("engineering", token_budget=0, session_id="ceo:engineering").messages == []
+    print("✅ Cleared memory stays cleared")
+
+    # Test 5: Memory outside of a session is never saved or reloaded
+    unsaved = Conversation("engineering", token_budget=0)
+    unsaved.add("user", "Scratch question")
+    unsaved.add("assistant", "Scratch answer")
+    core.memory.conversation_store.flush()
+    assert Conversation("engineering", token_budget=0).messages == []
+    assert core.memory.conversation_store.get_stats()["queued"] == 0
+    print("✅ Memory outside of a session stays in memory")
+
+    # Test 6: Task results are kept per session
+    reopened.record_result("engineering", "engineering", "Review app.tsx", {"success": True, "output": "LGTM"})
+    results = reopened.load_results("engineering")
+    assert results[0]["task"] == "Review app.tsx" and results[0]["result"]["output"] == "LGTM"
+    print("✅ Task results saved")
+
+    # Test 7: A failed batch is retried with backoff, and dropped (and counted) only when retries run out
+    config.RETRY_BASE_DELAY = 0.01
+    flaky = FlakyBackend(SQLiteBackend(path), failures=2)
+    store = ConversationStore(flaky)
+    store.record_turns("ceo:security", "security", [(0, "user", "Audit the SOS flow"), (1, "assistant", "On it")])
+    store.flush()
+    assert flaky.attempts == 3 and store.get_stats()["written"] == 2
+    assert len(store.load_history("ceo:security")["turns"]) == 2
+    assert resilience.get_status(STORE_KEY)["retries"] == 2
+    print("✅ Write retried twice after 'database is locked', then saved")
+
+    flaky.failures = 100
+    store.record_turns("ceo:security", "security", [(2, "user", "And the map?"), (3, "assistant", "Next")])
+    store.flush()
+    stats = store.get_stats()
+    assert flaky.attempts == 3 + 1 + config.RETRY_MAX_RETRIES
+    assert stats["dropped"] == 2 and stats["errors"] == 1 and stats["written"] == 2
+    dropped = metrics.resilience_events.snapshot()
+    assert {"agent": STORE_KEY, "event": "dropped", "value": 1} in dropped
+    resilience.breaker(STORE_KEY).reset()
+    print(f"✅ Dropped after {config.RETRY_MAX_RETRIES} retries, counted\n\n📊 Store: {stats}")
+
+    print("\n" + "="*60)
+    print("🎉 CONVERSATION STORE TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_store()
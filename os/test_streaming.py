@@ -0,0 +1,108 @@
+"""
+Test script for token streaming (runs offline against the local fake model server)
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmarks.fake_server import FakeModelServer
+
+# Talk to a local server only - never the real API
+# (0.1s to the first token, then 20 tokens at 100/s)
+server = FakeModelServer(latency=0.1, tokens_per_second=100, output_tokens=20).start()
+os.environ.update({
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_BASE_URL": server.url,
+    "STORE_BACKEND": "none",
+    "RESPONSE_CACHE_ENABLED": "False",
+})
+
+from pulse.coordinator import get_pulse
+
+
+def collect(events):
+    """Text chunks and the final result"""
+    texts, result = [], None
+    for event in events:
+        if event["type"] == "text":
+            texts.append(event["text"])
+        else:
+            result = event["result"]
+    return texts, result
+
+
+async def collect_async(events):
+    texts, result = [], None
+    async for event in events:
+        if event["type"] == "text":
+            texts.append(event["text"])
+        else:
+            result = event["result"]
+    return texts, result
+
+
+def test_streaming():
+    """Test streamed agent and PULSE answers, sync and async"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING TOKEN STREAMING")
+    print("="*60 + "\n")
+
+    pulse = get_pulse()
+    engineering = pulse._get_agent("engineering")[0]
+    engineering.client  # build the shared client up front, so timings are the stream's own
+
+    # Test 1: Text arrives well before the whole answer; the result comes last
+    texts, result = collect(engineering.stream_task("Plan the alert API"))
+    assert len(texts) == 20 and result["success"] and result["streamed"]
+    assert result["output"] == "".join(texts) and result["output_tokens"] == 20
+    first = result["time_to_first_token"]
+    assert first < result["total_time"] - 0.1
+    assert engineering.conversation_history[-1]["content"] == result["output"]
+    print(f"✅ First token after {first * 1000:.0f}ms, whole answer after {result['total_time'] * 1000:.0f}ms")
+
+    # Test 2: PULSE streams its own answers and routed tasks
+    texts, result = collect(pulse.stream_request("What's the Beacon status?"))
+    assert len(texts) == 20 and result["success"] and pulse.conversation_history[-1]["role"] == "assistant"
+    texts, result = collect(pulse.route_to_agent("security", "Threat model location sharing", stream=True))
+    assert len(texts) == 20 and result["agent"] == "Security AI"
+    texts, result = collect(pulse.route_to_agent("marketing", "Write a launch post", stream=True))
+    assert texts == [] and not result["success"]
+    print("✅ stream_request and route_to_agent(stream=True) (unknown agent -> one result event)")
+
+    # Test 3: Async streams, two at once
+    async def _both():
+        return await asyncio.gather(
+            collect_async(engineering.stream_task_async("Now plan the map view")),
+            collect_async(pulse.stream_request_async("And the launch date?")),
+        )
+
+    started = time.perf_counter()
+    streams = asyncio.run(_both())
+    assert all(len(texts) == 20 and result["success"] for texts, result in streams)
+    assert time.perf_counter() - started < 0.5
+    print("✅ Two async streams ran side by side")
+
+    # Test 4: A failed stream ends with an error result and takes back the turn
+    history = engineering.conversation_history
+    server.error_rate, server.error_statuses = 1.0, (400,)
+    texts, result = collect(engineering.stream_task("Plan the billing page"))
+    server.error_rate = 0.0
+    assert texts == [] and not result["success"] and engineering.conversation_history == history
+    print("✅ Failed stream -> error result, memory unchanged")
+
+    server.stop()
+
+    print("\n" + "="*60)
+    print("🎉 TOKEN STREAMING TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_streaming()
@@ -0,0 +1,108 @@
+"""
+Test script for the priority task queue (runs offline, no API calls)
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.task_queue import Priority, TaskQueue, TaskRejectedError, detect_priority
+
+
+def test_task_queue():
+    """Test ordering, reserved capacity and load shedding"""
+
+    print("\n" + "="*60)
+    print("🧪 TESTING PRIORITY TASK QUEUE")
+    print("="*60 + "\n")
+
+    # Test 1: Priority detection from task wording (only live incidents are emergencies)
+    assert detect_priority("Production is down!") == Priority.EMERGENCY
+    assert detect_priority("Users can't send SOS alerts in Chicago") == Priority.EMERGENCY
+    assert detect_priority("SOS messages are not going out since the deploy") == Priority.EMERGENCY
+    assert detect_priority("Triage the data leak incident") == Priority.HIGH
+    assert detect_priority("Review this React component") == Priority.NORMAL
+    for routine in (
+        "Refactor the emergency contacts screen",
+        "Design the emergency SOS alert flow",
+        "Write onboarding docs for the rescue team partners",
+        "Add crash detection to the Android app",
+        "Rename the sos_button component",
+    ):
+        assert detect_priority(routine) == Priority.NORMAL, routine
+    print("✅ Priorities detected from wording (mentioning SOS isn't an emergency)")
+
+    # One general worker + one emergency-only worker, overload at 4 queued
+    queue = TaskQueue(workers=2, reserved_workers=1, max_depth=4)
+    release = threading.Event()
+    order = []
+
+    def blocker():
+        release.wait()
+
+    def job(label):
+        order.append(label)
+        return label
+
+    # Test 2: The general worker is busy, yet an emergency runs right away
+    queue.submit(blocker, name="blocker")
+    time.sleep(0.05)
+    started = time.monotonic()
+    assert queue.submit(job, "sos", priority=Priority.EMERGENCY).result(timeout=1) == "sos"
+    print(f"✅ Emergency ran on reserved capacity in {(time.monotonic() - started) * 1000:.1f}ms")
+
+    # Test 3: Queued work runs by class, then earliest deadline
+    futures = [
+        queue.submit(job, "normal", priority=Priority.NORMAL),
+        queue.submit(job, "high-late", priority=Priority.HIGH, deadline=60),
+        queue.submit(job, "high-soon", priority=Priority.HIGH, deadline=30),
+    ]
+
+    # Test 4: LOW is shed once the queue passes its share under overload
+    shed = queue.submit(job, "low", priority=Priority.LOW)
+    try:
+        shed.result(timeout=1)
+        assert False, "LOW should have been shed"
+    except TaskRejectedError as e:
+        print(f"✅ Shed under overload: {e.reason}")
+
+    release.set()
+    for future in futures:
+        future.result(timeout=1)
+    print(f"   Run order: {order}")
+    assert order == ["sos", "high-soon", "high-late", "normal"]
+    print("✅ Priority + deadline ordering")
+
+    stats = queue.get_stats()
+    print(f"\n📊 Stats: {stats['classes']['EMERGENCY']}")
+    assert stats["classes"]["LOW"]["shed"] == 1
+    queue.shutdown()
+
+    # Test 5: Cancelled tasks neither break submit() nor get rejected later
+    queue = TaskQueue(workers=1, reserved_workers=0, max_depth=4)
+    release.clear()
+    queue.submit(blocker, name="blocker")
+    time.sleep(0.05)
+    lows = [queue.submit(job, f"low-{n}", priority=Priority.LOW) for n in range(2)]
+    expiring = queue.submit(job, "expiring", priority=Priority.HIGH, deadline=0.01)
+    assert all(future.cancel() for future in lows + [expiring])
+    highs = [queue.submit(job, f"high-{n}", priority=Priority.HIGH) for n in range(4)]
+    time.sleep(0.05)
+    release.set()
+    assert [future.result(timeout=1) for future in highs] == [f"high-{n}" for n in range(4)]
+    stats = queue.get_stats()["classes"]
+    assert stats["LOW"]["shed"] == 0 and stats["HIGH"]["expired"] == 0
+    queue.shutdown()
+    print("✅ Cancelled tasks give their place back (no displacement or expiry errors)")
+
+    print("\n" + "="*60)
+    print("🎉 PRIORITY TASK QUEUE TEST COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    test_task_queue()